@@ -72,10 +72,19 @@ def initialize_components(app):
     """Initialize AI model and utilities"""
     try:
         # Initialize model loader
-        from utils.model_loader import initialize_model_and_data
-        model_success = initialize_model_and_data(app.config)
+        from utils.model_loader import initialize_model_and_data, preload_model_and_data
+        background = app.config.get('MODEL_BACKGROUND_LOAD', True)
 
-        if model_success:
+        if app.config.get('MODEL_PRELOAD', False):
+            # gunicorn master: share data + model bytes, build runtime post-fork
+            if preload_model_and_data(app.config):
+                app.logger.info("Model data preloaded in master - workers finish loading after fork")
+            else:
+                app.logger.warning("Model data preload failed")
+        elif background:
+            initialize_model_and_data(app.config, background=True)
+            app.logger.info("AI Model loading in background - /api/predict returns 503 until ready")
+        elif initialize_model_and_data(app.config):
             app.logger.info("AI Model loaded successfully")
         else:
             app.logger.warning("AI Model loading failed - will retry on requests")
@@ -2,7 +2,7 @@
 FIXED ROUTES - Correct JSON structure + Marathi translations
 Chordz Technologies - Sugarcane Disease Detection
 """
-import logging, os, json, base64, io
+import logging, os, json, base64
 from datetime import datetime
 from flask import Blueprint, render_template, request, jsonify, current_app
 import traceback
@@ -40,6 +40,70 @@ def home():
 def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
 
+@main_bp.route('/api/health/live')
+def liveness_check():
+    """Liveness: the worker process is up and serving requests"""
+    return jsonify({'status': 'alive', 'timestamp': datetime.now().isoformat()})
+
+@main_bp.route('/api/health/ready')
+def readiness_check():
+    """Readiness: model loaded, warmed up and inference queue not overloaded"""
+    from utils.model_loader import get_model_loader
+    ml = get_model_loader(current_app.config)
+    if not ml:
+        return jsonify({'status': 'not_ready', 'error': 'Model loader not initialized',
+                        'timestamp': datetime.now().isoformat()}), 503
+
+    ready, details = ml.get_readiness()
+    details['status'] = 'ready' if ready else 'not_ready'
+    details['timestamp'] = datetime.now().isoformat()
+    return jsonify(details), 200 if ready else 503
+
+@main_bp.route('/api/metrics')
+def inference_metrics():
+    """Inference metrics (batch-size histogram, queue depth, latencies)"""
+    from utils.model_loader import get_model_loader
+    ml = get_model_loader(current_app.config)
+    if not ml:
+        return jsonify({'success': False, 'error': 'Model not loaded'}), 503
+    return jsonify({'success': True, 'metrics': ml.get_inference_stats(), 'timestamp': datetime.now().isoformat()})
+
+def _admin_authorized():
+    """Admin endpoints need ADMIN_TOKEN configured and sent as X-Admin-Token"""
+    import hmac
+    token = current_app.config.get('ADMIN_TOKEN')
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+@main_bp.route('/api/admin/reload', methods=['POST'])
+def admin_reload_model():
+    """
+    Hot-swap the model: load + warm up + smoke test in the background, then
+    activate; the other workers follow via the published active-version marker
+    """
+    if not _admin_authorized():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    from utils.model_loader import get_model_loader
+    ml = get_model_loader(current_app.config)
+    if not ml:
+        return jsonify({'success': False, 'error': 'Model loader not initialized'}), 503
+
+    payload = request.get_json(silent=True) or {}
+    result = ml.reload_model(payload.get('version'))
+    status = 202 if result.get('accepted') else (409 if 'in progress' in result.get('error', '') else 404)
+    return jsonify(dict(result, success=result.get('accepted', False))), status
+
+@main_bp.route('/api/admin/models')
+def admin_model_versions():
+    """Loaded / available model versions and last reload outcome"""
+    if not _admin_authorized():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    from utils.model_loader import get_model_loader
+    ml = get_model_loader(current_app.config)
+    if not ml:
+        return jsonify({'success': False, 'error': 'Model loader not initialized'}), 503
+    return jsonify({'success': True, **ml.get_model_versions()})
+
 @main_bp.route('/BingSiteAuth.xml')
 def bing_site_auth():
     """Serve Bing Webmaster Tools verification file."""
@@ -91,66 +155,130 @@ def get_severity(disease_name):
     }
     return severity_map.get(disease_name, "Medium")
 
+def read_body(req):
+    """
+    Request body in one buffer: read straight into a bytearray sized from
+    Content-Length (get_data() joins chunks, briefly holding two copies)
+    """
+    stream = req.stream  # raises 413 before allocating if over MAX_CONTENT_LENGTH
+    if not req.content_length:
+        return req.get_data()
+    body = bytearray(req.content_length)
+    view = memoryview(body)
+    filled = 0
+    while filled < len(body):
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    view.release()
+    del body[filled:]
+    return body
+
+
+def extract_upload(req):
+    """
+    Image source from a predict request without copying the upload:
+    multipart file -> Werkzeug FileStorage (spooled stream), JSON base64 ->
+    decoded bytes, hand-built multipart / raw body -> memoryview of the body
+    """
+    for key in req.files:
+        return req.files[key]
+
+    raw = read_body(req)
+    logger.info(f"{len(raw)} bytes")
+    if not raw:
+        return None
+
+    if req.is_json or raw[:1] == b'{':
+        try:
+            d = json.loads(raw)
+            if 'image' in d:
+                b64 = d['image'].split('base64,')[1] if 'base64,' in d['image'] else d['image']
+                return base64.b64decode(b64)
+        except Exception:
+            pass
+
+    body = memoryview(raw)
+    if raw.startswith(b'--'):
+        # Multipart without a usable Content-Type: first part, sliced in place
+        start = raw.find(b'\r\n\r\n')
+        if start != -1:
+            end = raw.find(b'\r\n--', start + 4)
+            return body[start + 4:end if end != -1 else len(raw)]
+    return body
+
+
 @main_bp.route('/api/predict', methods=['POST'])
 def predict_disease():
     try:
         logger.info("="*70)
         logger.info("PREDICT")
 
-        img = None
-
-        if request.files:
-            for key in request.files:
-                img = request.files[key]
-                break
-
-        if not img:
-            raw = request.get_data()
-            logger.info(f"{len(raw)} bytes")
-
-            try:
-                d = json.loads(raw.decode('utf-8'))
-                if 'image' in d:
-                    b64 = d['image'].split('base64,')[1] if 'base64,' in d['image'] else d['image']
-                    img = io.BytesIO(base64.b64decode(b64))
-            except Exception:
-                if raw.startswith(b'--'):
-                    try:
-                        parts = raw.split(b'\r\n\r\n')
-                        if len(parts) >= 2:
-                            img_data = parts[1].split(b'\r\n--')[0]
-                            img = io.BytesIO(img_data)
-                    except Exception:
-                        pass
-                if not img:
-                    img = io.BytesIO(raw)
-
-        if not img:
-            return jsonify({'success': False, 'error': 'No image'}), 400
-
-        from utils.model_loader import get_model_loader
+        from utils.model_loader import get_model_loader, STATE_LOADING
         from utils.image_processor import get_image_processor
 
         ml = get_model_loader(current_app.config)
         ip = get_image_processor(current_app.config)
 
+        # Model still loading in the background - fail fast and ask the client to retry
+        if ml and ml.state == STATE_LOADING:
+            retry_after = current_app.config.get('MODEL_LOADING_RETRY_AFTER', 5)
+            response = jsonify({
+                'success': False,
+                'error': 'Model is loading, please retry',
+                'message': 'मॉडेल लोड होत आहे, कृपया थोड्या वेळाने पुन्हा प्रयत्न करा'
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 503
+
         # Check if any model is loaded
-        if not ml or (not ml.model and not ml.paligemma):
+        if not ml or not ml.backend:
             return jsonify({'success': False, 'error': 'Model not loaded'}), 503
 
-        # Process image for prediction
-        proc = ip.process_image_for_prediction(img)
-        if proc is None:
-            return jsonify({'success': False, 'error': 'Processing failed'}), 400
+        img = extract_upload(request)
 
-        # Make prediction (automatically uses PaliGemma if available, falls back to CNN)
-        res = ml.predict(proc)
-        
-        # Handle validation failures from PaliGemma
+        if not img:
+            return jsonify({'success': False, 'error': 'No image'}), 400
+
+        # Header-only check: reject unsupported formats and absurd dimensions before decoding
+        from utils.image_processor import ImageValidationError, ImageQualityError
+        try:
+            header = ip.validate_image_header(img)
+        except ImageValidationError as e:
+            logger.warning(f"Upload rejected: {e} ({e.detail})")
+            return jsonify({'success': False, 'error': str(e), 'message': e.marathi}), 400
+
+        # Same photo uploaded again? Skip decode, resize and inference entirely
+        from utils.prediction_cache import hash_upload
+        upload_key = hash_upload(img) if ml.prediction_cache is not None else None
+        res = ml.get_cached_prediction(upload_key)
+
+        if res is None:
+            # Process image for prediction; unusable photos (blurry, dark, no leaf) skip inference
+            try:
+                proc = ip.process_image_for_prediction(img, check_quality=True, header=header)
+            except ImageQualityError as e:
+                return jsonify({'success': False, 'error': str(e), 'message': e.marathi,
+                                'quality': e.report}), 400
+            if proc is None:
+                return jsonify({'success': False, 'error': 'Processing failed'}), 400
+
+            # Make prediction (non-sugarcane photos are rejected by the open-set check)
+            res = ml.predict(proc)
+            ml.cache_prediction(upload_key, res)
+        else:
+            logger.info("Prediction cache hit (upload bytes)")
+
+        # Inference queue saturated - tell the client to retry shortly
+        if res and res.get('busy'):
+            return jsonify({'success': False, 'error': 'Server busy, please retry'}), 503
+
+        # Handle validation failures (open-set rejection)
         if not res or not res.get('success'):
             error_msg = res.get('message', {})
             if isinstance(error_msg, dict):
-                # PaliGemma validation error with Marathi message
+                # Validation error with Marathi message
                 marathi_msg = error_msg.get('marathi', 'निदान अपयशी')
                 return jsonify({
                     'success': False,
@@ -216,6 +344,7 @@ def predict_disease():
                     ]
                 }
             },
+            'model_version': res.get('model_version'),
             'timestamp': datetime.now().isoformat()
         }
 
@@ -35,11 +35,144 @@ class Config:
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'bmp', 'gif'}
     UPLOAD_FOLDER = BASE_DIR / "uploads"
 
+    # Header-only pre-validation before decode (decompression-bomb guard;
+    # never above PIL's own Image.MAX_IMAGE_PIXELS, ~89 MP)
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 50_000_000))
+    IMAGE_MAX_DIMENSION = int(os.environ.get('IMAGE_MAX_DIMENSION', 16384))
+    IMAGE_MIN_DIMENSION = int(os.environ.get('IMAGE_MIN_DIMENSION', 32))
+
+    # Quality gate on the resized photo: blurry / dark / leafless shots skip inference.
+    # Off until the thresholds are calibrated on real field photos
+    IMAGE_QUALITY_CHECK = os.environ.get('IMAGE_QUALITY_CHECK', 'false').lower() == 'true'
+    IMAGE_QUALITY_MIN_SHARPNESS = float(os.environ.get('IMAGE_QUALITY_MIN_SHARPNESS', 15.0))
+    IMAGE_QUALITY_MIN_BRIGHTNESS = float(os.environ.get('IMAGE_QUALITY_MIN_BRIGHTNESS', 40.0))
+    IMAGE_QUALITY_MAX_OVEREXPOSED = float(os.environ.get('IMAGE_QUALITY_MAX_OVEREXPOSED', 0.5))
+    # Low on purpose: Dried Leaves / Red Rot photos carry little green
+    IMAGE_QUALITY_MIN_LEAF_RATIO = float(os.environ.get('IMAGE_QUALITY_MIN_LEAF_RATIO', 0.02))
+
+    # Decode large photos at reduced size (JPEG draft mode / Image.reduce),
+    # keeping at least IMAGE_PREDOWNSCALE_MARGIN x 128 px for the final LANCZOS
+    IMAGE_FAST_DECODE = os.environ.get('IMAGE_FAST_DECODE', 'true').lower() == 'true'
+    IMAGE_PREDOWNSCALE_MARGIN = int(os.environ.get('IMAGE_PREDOWNSCALE_MARGIN', 2))
+    # Threads decoding/resizing images for process_images_for_prediction (bulk surveys)
+    IMAGE_DECODE_WORKERS = int(os.environ.get('IMAGE_DECODE_WORKERS', 4))
+    # Decode/resize library: 'pil' (LANCZOS) or 'opencv' (imdecode + INTER_AREA)
+    IMAGE_BACKEND = os.environ.get('IMAGE_BACKEND', 'pil').lower()
+
     # Model Paths
+    MODEL_DIR = BASE_DIR / "models"
     MODEL_PATH = BASE_DIR / "models" / "Final_Model.keras"
     CLASS_MAPPING_PATH = BASE_DIR / "models" / "class_mapping.json"
     DISEASE_SOLUTIONS_PATH = BASE_DIR / "models" / "disease_solutions.json"
 
+    # Load the model on a background thread so workers start serving immediately
+    MODEL_BACKGROUND_LOAD = os.environ.get('MODEL_BACKGROUND_LOAD', 'true').lower() == 'true'
+    MODEL_LOADING_RETRY_AFTER = int(os.environ.get('MODEL_LOADING_RETRY_AFTER', 5))
+
+    # Prefer the inference-only frozen graph (scripts/export_frozen.py) over
+    # deserializing the .keras file when it exists, its checksum matches and it
+    # was exported from the current .keras (retrained model -> Keras path + warning)
+    MODEL_PREFER_FROZEN = os.environ.get('MODEL_PREFER_FROZEN', 'true').lower() == 'true'
+
+    # Keras weight storage: float32 | float16 | bfloat16 (about half the weight
+    # memory per worker; check accuracy with scripts/precision_parity.py)
+    MODEL_WEIGHT_DTYPE = os.environ.get('MODEL_WEIGHT_DTYPE', 'float32')
+
+    # Set by gunicorn.conf.py when preload_app is on: the master only preloads
+    # shared data and each worker builds the inference runtime after fork
+    MODEL_PRELOAD = os.environ.get('MODEL_PRELOAD', 'false').lower() == 'true'
+
+    # Inference backend: keras | tflite_float32 | tflite_float16 | tflite_int8 | onnx
+    # (artifacts are produced by scripts/convert_tflite.py and scripts/export_onnx.py)
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'keras')
+    TFLITE_NUM_THREADS = int(os.environ.get('TFLITE_NUM_THREADS', 2))
+    ONNX_INTRA_OP_THREADS = int(os.environ.get('ONNX_INTRA_OP_THREADS', 2))
+
+    # TensorFlow thread pools per model process. 'auto' = cores available to
+    # the container (cgroup CPU quota aware) / model processes (WORKERS, times
+    # INFERENCE_POOL_WORKERS in process_pool mode). Tune with
+    # scripts/tune_threads.py
+    WEB_WORKERS = int(os.environ.get('WORKERS', 2))
+    TF_INTRA_OP_THREADS = os.environ.get('TF_INTRA_OP_THREADS', 'auto')
+    TF_INTER_OP_THREADS = os.environ.get('TF_INTER_OP_THREADS', '1')
+
+    # Inference mode: local (engine runs in the web process) | process_pool
+    # (engine runs in INFERENCE_POOL_WORKERS separate processes fed through
+    # shared memory; requests get 503 when all INFERENCE_POOL_SLOTS are busy)
+    INFERENCE_MODE = os.environ.get('INFERENCE_MODE', 'local')
+    INFERENCE_POOL_WORKERS = int(os.environ.get('INFERENCE_POOL_WORKERS', 2))
+    INFERENCE_POOL_SLOTS = int(os.environ.get('INFERENCE_POOL_SLOTS', 16))
+    INFERENCE_POOL_ACQUIRE_TIMEOUT = float(os.environ.get('INFERENCE_POOL_ACQUIRE_TIMEOUT', 0.5))
+    INFERENCE_POOL_START_TIMEOUT = float(os.environ.get('INFERENCE_POOL_START_TIMEOUT', 300))
+
+    # Inference batching (coalesces concurrent predictions into one forward pass)
+    INFERENCE_BATCHING_ENABLED = os.environ.get('INFERENCE_BATCHING_ENABLED', 'true').lower() == 'true'
+    INFERENCE_BATCH_MAX_SIZE = int(os.environ.get('INFERENCE_BATCH_MAX_SIZE', 8))
+    INFERENCE_BATCH_MAX_WAIT_MS = float(os.environ.get('INFERENCE_BATCH_MAX_WAIT_MS', 5))
+    INFERENCE_QUEUE_MAX_SIZE = int(os.environ.get('INFERENCE_QUEUE_MAX_SIZE', 64))
+    INFERENCE_TIMEOUT_SECONDS = float(os.environ.get('INFERENCE_TIMEOUT_SECONDS', 30))
+
+    # Prediction cache keyed by upload-bytes hash and preprocessed-tensor hash
+    PREDICTION_CACHE_ENABLED = os.environ.get('PREDICTION_CACHE_ENABLED', 'true').lower() == 'true'
+    PREDICTION_CACHE_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', 2048))
+    PREDICTION_CACHE_TTL_SECONDS = float(os.environ.get('PREDICTION_CACHE_TTL_SECONDS', 3600))
+
+    # Versioned model registry: models/versions/<version>/ holds one model
+    # (Final_Model.keras or the backend's converted artifact). POST
+    # /api/admin/reload with X-Admin-Token hot-swaps after warm-up + smoke test
+    MODEL_VERSIONS_DIR = BASE_DIR / "models" / "versions"
+    MODEL_REGISTRY_MAX_VERSIONS = int(os.environ.get('MODEL_REGISTRY_MAX_VERSIONS', 2))
+    # A successful reload is published to MODEL_ACTIVE_MARKER (default
+    # MODEL_VERSIONS_DIR/active.json; must be writable - docker-compose uses
+    # /app/state/active.json); every gunicorn worker polls it and swaps too
+    # (and loads it when it (re)starts)
+    MODEL_ACTIVE_MARKER = os.environ.get('MODEL_ACTIVE_MARKER')
+    MODEL_VERSION_SYNC_INTERVAL = float(os.environ.get('MODEL_VERSION_SYNC_INTERVAL', 5))
+    MODEL_RELOAD_SAMPLE_DIR = os.environ.get('MODEL_RELOAD_SAMPLE_DIR')
+    MODEL_RELOAD_MIN_AGREEMENT = (float(os.environ['MODEL_RELOAD_MIN_AGREEMENT'])
+                                  if os.environ.get('MODEL_RELOAD_MIN_AGREEMENT') else None)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+    # Test-time augmentation: predictions below this confidence (the "कमी"
+    # level) are re-run once as a batch of flips/rotations/crops and averaged
+    TTA_ENABLED = os.environ.get('TTA_ENABLED', 'true').lower() == 'true'
+    TTA_CONFIDENCE_THRESHOLD = float(os.environ.get('TTA_CONFIDENCE_THRESHOLD', 0.7))
+
+    # Pooled backbone embedding of every processed image, appended to a
+    # memory-mapped float16 store (same forward pass as the prediction) by a
+    # background writer. Off by default; the store stops growing at
+    # FEATURE_STORE_MAX_ROWS (~2.5 KB per row for a 1280-dim backbone)
+    FEATURE_STORE_ENABLED = os.environ.get('FEATURE_STORE_ENABLED', 'false').lower() == 'true'
+    FEATURE_STORE_DIR = BASE_DIR / "data" / "feature_store"
+    FEATURE_STORE_MAX_ROWS = int(os.environ.get('FEATURE_STORE_MAX_ROWS', 50000))
+
+    # Open-set rejection: uploads whose embedding is not similar enough to the
+    # reference index (scripts/build_open_set_index.py) get a Marathi "not a
+    # sugarcane leaf" reply instead of a diagnosis. Off when the index is missing.
+    # Mode / k / threshold default to the values stored in the index file
+    OPEN_SET_ENABLED = os.environ.get('OPEN_SET_ENABLED', 'true').lower() == 'true'
+    OPEN_SET_INDEX_PATH = BASE_DIR / "models" / "open_set_index.npz"
+    OPEN_SET_MODE = os.environ.get('OPEN_SET_MODE')
+    OPEN_SET_K = int(os.environ['OPEN_SET_K']) if os.environ.get('OPEN_SET_K') else None
+    OPEN_SET_MIN_SIMILARITY = (float(os.environ['OPEN_SET_MIN_SIMILARITY'])
+                               if os.environ.get('OPEN_SET_MIN_SIMILARITY') else None)
+
+    # Two-stage cascade: a colour-statistics gate (scripts/train_healthy_gate.py)
+    # answers confident Healthy leaves without running the CNN. Threshold
+    # defaults to the one chosen at training time
+    CASCADE_ENABLED = os.environ.get('CASCADE_ENABLED', 'false').lower() == 'true'
+    CASCADE_GATE_PATH = BASE_DIR / "models" / "healthy_gate.npz"
+    CASCADE_HEALTHY_THRESHOLD = (float(os.environ['CASCADE_HEALTHY_THRESHOLD'])
+                                 if os.environ.get('CASCADE_HEALTHY_THRESHOLD') else None)
+
+    # /api/health/ready reports not-ready when this many requests are queued
+    READINESS_MAX_QUEUE_DEPTH = int(os.environ.get('READINESS_MAX_QUEUE_DEPTH', 32))
+
+    # Compiled serving function is traced and warmed up with these batch sizes
+    SERVING_WARMUP_BATCH_SIZES = [
+        int(size) for size in os.environ.get('SERVING_WARMUP_BATCH_SIZES', '1,2,4,8').split(',')
+    ]
+
     # Data Paths
     EMERGENCY_CONTACTS_PATH = BASE_DIR / "data" / "emergency_contacts.json"
     SEASONAL_ADVICE_PATH = BASE_DIR / "data" / "seasonal_advice.json"
@@ -0,0 +1,50 @@
+"""
+Gunicorn Configuration
+ऊस एकरी १०० टन - Sugarcane Disease Detection System
+Chordz Technologies
+
+With preload_app the master imports wsgi:app once and reads the class
+mapping, disease solutions and model file into memory; forked workers share
+those pages copy-on-write. TensorFlow / TFLite / ONNX Runtime and their
+thread pools are only initialized in post_fork(), inside each worker.
+
+Usage: gunicorn --config gunicorn.conf.py wsgi:app
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WORKERS', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+accesslog = '-'
+errorlog = '-'
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Tell the app factory (via Config.MODEL_PRELOAD) to only preload in the master
+os.environ['MODEL_PRELOAD'] = 'true' if preload_app else 'false'
+
+
+def when_ready(server):
+    """Master finished preloading: freeze those objects so the cyclic GC
+    never touches (and un-shares) their pages in the workers"""
+    if preload_app:
+        gc.freeze()
+        server.log.info(f"Preloaded app frozen for copy-on-write sharing ({gc.get_freeze_count()} objects)")
+
+
+def post_fork(server, worker):
+    """Build the inference runtime inside the worker"""
+    if not preload_app:
+        return
+
+    from utils.model_loader import get_model_loader
+    loader = get_model_loader()
+    if loader is None:
+        server.log.warning("No preloaded model loader found in worker")
+        return
+
+    background = os.getenv('MODEL_BACKGROUND_LOAD', 'true').lower() == 'true'
+    loader.load_after_fork(background=background)
+    server.log.info(f"Worker {worker.pid}: model runtime initializing after fork")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Image Backend Benchmark
+Throughput of the PIL (LANCZOS) and OpenCV (imdecode + INTER_AREA)
+preprocessing backends on synthetic phone-photo sizes, and - with a folder
+of real leaf photos - input deltas and model top-1 agreement of OpenCV
+against the PIL pipeline.
+
+Usage: python scripts/benchmark_image_backends.py [--megapixels 2,8,12,48] [--samples path/to/photos] [--no-model]
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.image_processor import FarmerFriendlyImageProcessor
+from utils.model_parity import find_sample_images, run_in_batches, compare_predictions, format_parity
+
+
+def make_processor(backend):
+    return FarmerFriendlyImageProcessor({'IMAGE_BACKEND': backend,
+                                         'IMAGE_FAST_DECODE': Config.IMAGE_FAST_DECODE,
+                                         'IMAGE_PREDOWNSCALE_MARGIN': Config.IMAGE_PREDOWNSCALE_MARGIN})
+
+
+def synthetic_photo(megapixels):
+    """4:3 JPEG with photo-like texture (upscaled noise)"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(height // 16, width // 16, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).resize((width, height), Image.Resampling.BILINEAR).save(buffer, format='JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def images_per_second(processor, photo, repeat):
+    processor.process_image_for_prediction(photo)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        processor.process_image_for_prediction(photo)
+    return repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PIL and OpenCV preprocessing backends")
+    parser.add_argument('--megapixels', default='2,8,12,48')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--samples', help="Folder of real leaf photos for the parity report")
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--no-model', action='store_true', help="Only compare preprocessed inputs")
+    args = parser.parse_args()
+
+    pil, opencv = make_processor('pil'), make_processor('opencv')
+    if opencv.backend != 'opencv':
+        print("OpenCV is not installed (pip install opencv-python)")
+        return 1
+
+    print(f"{'photo':<8} {'PIL img/s':>10} {'OpenCV img/s':>13} {'speed-up':>9}")
+    print("-" * 43)
+    for megapixels in (float(mp) for mp in args.megapixels.split(',')):
+        photo = synthetic_photo(megapixels)
+        pil_rate = images_per_second(pil, photo, args.repeat)
+        opencv_rate = images_per_second(opencv, photo, args.repeat)
+        print(f"{megapixels:>5.0f} MP {pil_rate:>10.1f} {opencv_rate:>13.1f} {opencv_rate / pil_rate:>8.1f}x")
+
+    if not args.samples:
+        return 0
+
+    paths = [str(path) for path in find_sample_images(args.samples, args.count)]
+    reference, reference_errors = pil.process_images_for_prediction(paths)
+    candidate, candidate_errors = opencv.process_images_for_prediction(paths)
+    usable = [i for i, (a, b) in enumerate(zip(reference_errors, candidate_errors)) if a is None and b is None]
+    reference, candidate = reference[usable], candidate[usable]
+
+    # One uint8 step is 2/255 in the [-1, 1] input range
+    pixel_deltas = np.abs(reference - candidate) * 127.5
+    print(f"\nParity sample: {len(usable)} of {len(paths)} photos")
+    print(f"Input delta (uint8 steps): max {pixel_deltas.max():.1f}, mean {pixel_deltas.mean():.2f}")
+
+    if not args.no_model:
+        import tensorflow as tf
+        from utils.inference_backends import KerasBackend
+
+        backend = KerasBackend(tf.keras.models.load_model(args.model, compile=False))
+        report = compare_predictions(run_in_batches(backend.predict_batch, reference),
+                                     run_in_batches(backend.predict_batch, candidate))
+        print(format_parity('opencv vs pil', report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
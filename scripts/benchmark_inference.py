@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Inference Latency / Throughput Benchmark
+Compares Keras model.predict, the compiled Keras serving path, the frozen
+inference graph, TFLite and ONNX Runtime backends on CPU
+Usage: python scripts/benchmark_inference.py [--iterations 200] [--batch-sizes 1,4,8]
+                                             [--backends keras,tflite_float16,onnx]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.frozen_model import read_manifest
+from utils.inference_backends import BACKEND_NAMES, FrozenGraphBackend, create_backend, frozen_model_path
+from utils.model_loader import SugarcaneModelLoader
+
+
+class BenchmarkConfig(Config):
+    """Keras config with the batching queue disabled so we time raw model calls"""
+    INFERENCE_BACKEND = 'keras'
+    INFERENCE_BATCHING_ENABLED = False
+    MODEL_PREFER_FROZEN = False
+    FEATURE_STORE_ENABLED = False
+
+
+def time_calls(fn, batch, iterations, warmup=5):
+    """Call fn(batch) repeatedly and return latency statistics in milliseconds"""
+    for _ in range(warmup):
+        fn(batch)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    return {
+        'mean_ms': float(timings.mean()),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'per_image_ms': float(timings.mean() / len(batch)),
+        'images_per_sec': float(len(batch) * 1000 / timings.mean())
+    }
+
+
+def print_row(name, batch_size, stats):
+    print(f"{name:<22} {batch_size:>5} {stats['mean_ms']:>10.2f} {stats['p50_ms']:>10.2f} "
+          f"{stats['p95_ms']:>10.2f} {stats['per_image_ms']:>12.2f} {stats['images_per_sec']:>10.1f}")
+
+
+def load_backends(names, loader, threads):
+    """Keras comes from the loader; other engines are built from their artifacts"""
+    backends = {}
+    for name in names:
+        if name == 'keras':
+            backends[name] = loader.backend
+            continue
+        if name == 'frozen':
+            path = frozen_model_path(Config.MODEL_DIR)
+            manifest = read_manifest(path)
+            if manifest is None:
+                print(f"⚠️ Skipping frozen: {path} not found (run scripts/export_frozen.py)")
+                continue
+            backends[name] = FrozenGraphBackend(path, manifest['input'], manifest['output'],
+                                                embedding_name=manifest.get('embedding_output'))
+            continue
+        try:
+            backends[name] = create_backend(name, model_dir=Config.MODEL_DIR, num_threads=threads)
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}")
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model inference paths")
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--batch-sizes', default='1,4,8')
+    parser.add_argument('--backends', default='keras', help=f"Comma list of {', '.join(BACKEND_NAMES)}, frozen")
+    parser.add_argument('--threads', type=int, default=Config.TFLITE_NUM_THREADS,
+                        help="Threads for TFLite / ONNX Runtime backends")
+    parser.add_argument('--skip-legacy', action='store_true', help="Skip the model.predict baseline")
+    args = parser.parse_args()
+
+    loader = SugarcaneModelLoader(BenchmarkConfig)
+    if not loader.load_all_components():
+        print("❌ Model could not be loaded")
+        return 1
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    backends = load_backends(args.backends.split(','), loader, args.threads)
+    for backend in backends.values():
+        backend.warm_up(batch_sizes)
+    rng = np.random.default_rng(0)
+
+    print(f"\n{'path':<22} {'batch':>5} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} "
+          f"{'ms / image':>12} {'img / s':>10}")
+    print("-" * 85)
+    for batch_size in batch_sizes:
+        batch = rng.uniform(-1, 1, size=(batch_size, 128, 128, 3)).astype(np.float32)
+
+        if not args.skip_legacy:
+            legacy = time_calls(lambda x: loader.model.predict(x, verbose=0), batch, args.iterations)
+            print_row('keras model.predict', batch_size, legacy)
+
+        for name, backend in backends.items():
+            stats = time_calls(backend.predict_batch, batch, args.iterations)
+            print_row(name, batch_size, stats)
+            if not args.skip_legacy:
+                print(f"{'  vs model.predict':<22} {batch_size:>5} {legacy['mean_ms'] / stats['mean_ms']:>9.1f}x")
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
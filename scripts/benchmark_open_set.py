@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Open-Set Check Benchmark
+Times the per-request similarity check against reference indexes of
+increasing size (synthetic embeddings - the cost only depends on the index
+size and embedding dim), for both k-NN and centroid modes.
+
+Usage: python scripts/benchmark_open_set.py [--dim 1280] [--sizes 13,1000,2600,10000,100000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.open_set import OpenSetRejector
+
+NUM_CLASSES = 13
+
+
+def time_checks(rejector, queries, repeats):
+    timings = []
+    for query in queries[:repeats]:
+        start = time.perf_counter()
+        rejector.scores(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the open-set similarity check")
+    parser.add_argument('--dim', type=int, default=1280)
+    parser.add_argument('--sizes', default='13,1000,2600,10000,100000')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=8, help="Also time one batched call of this size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((max(args.repeats, args.batch), args.dim)).astype(np.float32)
+
+    print(f"dim {args.dim}, k {args.k}, {args.repeats} single-image checks per row")
+    print(f"{'references':>11} {'mode':<9} {'MB':>8} {'mean ms':>9} {'p95 ms':>9} {f'batch{args.batch} ms':>11}")
+    print("-" * 62)
+    for size in (int(s) for s in args.sizes.split(',')):
+        references = rng.standard_normal((size, args.dim)).astype(np.float32)
+        labels = np.arange(size) % NUM_CLASSES
+        for mode in ('knn', 'centroid'):
+            rejector = OpenSetRejector(references, labels, NUM_CLASSES, threshold=0.0, mode=mode, k=args.k)
+            time_checks(rejector, queries, 10)
+            timings = time_checks(rejector, queries, args.repeats)
+            start = time.perf_counter()
+            rejector.scores(queries[:args.batch])
+            batch_ms = (time.perf_counter() - start) * 1000
+            print(f"{size:>11} {mode:<9} {rejector.references.nbytes / 1e6:>8.1f} {timings.mean():>9.3f} "
+                  f"{np.percentile(timings, 95):>9.3f} {batch_ms:>11.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
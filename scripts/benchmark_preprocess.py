@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Preprocessing Kernel Benchmark
+Times the uint8 → [-1, 1] step for a resized 128x128 image: the previous
+float32 / 255 / scale pipeline with min/max logging and NaN/inf scans versus
+the PIXEL_LUT lookup into a reused buffer, and checks both agree bit for bit.
+
+Usage: python scripts/benchmark_preprocess.py [--repeat 2000] [--batch 32]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.image_processor import IMG_SIZE, normalize_pixels
+
+
+def legacy_preprocess(pixels):
+    """Steps 3-6 of the pipeline before the lookup table"""
+    img_array = np.array(pixels, dtype=np.float32)
+    img_array = img_array / 255.0
+    f"[{np.min(img_array):.3f}, {np.max(img_array):.3f}]"
+    img_array = (img_array - 0.5) * 2.0
+    f"[{np.min(img_array):.3f}, {np.max(img_array):.3f}]"
+    img_array = np.expand_dims(img_array, axis=0)
+    if np.isnan(img_array).any():
+        raise ValueError("Image contains NaN values")
+    if not np.isfinite(img_array).all():
+        raise ValueError("Image contains infinite values")
+    return img_array
+
+
+def time_per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fused preprocessing kernel")
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+    out = np.empty((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+    batch = np.empty((args.batch, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+
+    np.testing.assert_array_equal(legacy_preprocess(pixels), normalize_pixels(pixels)[None])
+
+    legacy_us = time_per_call(lambda: legacy_preprocess(pixels), args.repeat)
+    fresh_us = time_per_call(lambda: normalize_pixels(pixels), args.repeat)
+    reused_us = time_per_call(lambda: normalize_pixels(pixels, out=out[0]), args.repeat)
+    slot_us = time_per_call(lambda: normalize_pixels(pixels, out=batch[args.batch // 2]), args.repeat)
+
+    print(f"{'kernel':<28} {'us / image':>11} {'speed-up':>9}")
+    print("-" * 50)
+    for name, us in (('legacy float pipeline', legacy_us), ('lookup, new array', fresh_us),
+                     ('lookup, reused buffer', reused_us), ('lookup, batch slot', slot_us)):
+        print(f"{name:<28} {us:>11.1f} {legacy_us / us:>8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Image Quality Gate Benchmark
+Times assess_quality() on a resized 128x128 photo against a single-image
+model forward pass and, given a folder of photos, prints the metrics and
+the share rejected per issue so the IMAGE_QUALITY_* thresholds can be tuned.
+
+Usage: python scripts/benchmark_quality_gate.py [--samples path/to/photos] [--repeat 2000] [--no-model]
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.image_processor import FarmerFriendlyImageProcessor, IMG_SIZE
+from utils.model_parity import find_sample_images
+
+
+def time_per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image quality gate")
+    parser.add_argument('--samples', help="Folder of photos to report quality metrics for")
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--no-model', action='store_true', help="Skip the model latency comparison")
+    args = parser.parse_args()
+
+    processor = FarmerFriendlyImageProcessor(Config)
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+
+    gate_ms = time_per_call(lambda: processor.assess_quality(pixels), args.repeat) * 1000
+    print(f"Quality gate: {gate_ms * 1000:.1f} us / image")
+
+    if not args.no_model:
+        import tensorflow as tf
+        from utils.inference_backends import KerasBackend
+
+        backend = KerasBackend(tf.keras.models.load_model(args.model, compile=False))
+        batch = rng.uniform(-1, 1, size=(1, IMG_SIZE, IMG_SIZE, 3)).astype(np.float32)
+        model_ms = time_per_call(lambda: backend.predict_batch(batch), max(1, args.repeat // 100)) * 1000
+        print(f"Model forward pass: {model_ms:.2f} ms / image (gate is {gate_ms / model_ms:.2%} of it)")
+
+    if args.samples:
+        rejected, total = Counter(), 0
+        print(f"\n{'photo':<40} {'sharp':>8} {'bright':>7} {'over':>6} {'leaf':>6}  issues")
+        for path in find_sample_images(args.samples, args.count):
+            image = processor._load_and_convert_rgb(str(path))
+            if image is None:
+                continue
+            report = processor.assess_quality(np.asarray(processor._resize_image(image)))
+            total += 1
+            rejected.update(report['issues'])
+            print(f"{path.name[:40]:<40} {report['sharpness']:>8.1f} {report['brightness']:>7.1f} "
+                  f"{report['overexposed_ratio']:>6.2f} {report['leaf_ratio']:>6.2f}  {','.join(report['issues'])}")
+        print(f"\n{total} photos; flagged: " + (', '.join(f"{issue} {count / total:.1%}"
+                                                   for issue, count in rejected.items()) or 'none'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
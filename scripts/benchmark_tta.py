@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Adaptive TTA Benchmark
+Runs every sample through predict() with test-time augmentation off and on
+and reports how many requests were escalated and the latency it added.
+Use a folder of real leaf photos - synthetic inputs are almost all
+low-confidence and overstate the escalation rate.
+
+Usage: python scripts/benchmark_tta.py --samples path/to/photos [--count 200]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.model_loader import SugarcaneModelLoader
+from utils.model_parity import load_sample_batch
+
+
+class BenchmarkConfig(Config):
+    """Single-request path without batching queue or cache"""
+    INFERENCE_BATCHING_ENABLED = False
+    PREDICTION_CACHE_ENABLED = False
+    FEATURE_STORE_ENABLED = False
+
+
+def run(loader, samples, tta_enabled):
+    loader.config.TTA_ENABLED = tta_enabled
+    timings, results = [], []
+    for sample in samples:
+        start = time.perf_counter()
+        results.append(loader.predict(sample[None]))
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark adaptive test-time augmentation")
+    parser.add_argument('--samples', help="Folder of leaf photos")
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--threshold', type=float, default=Config.TTA_CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    BenchmarkConfig.TTA_CONFIDENCE_THRESHOLD = args.threshold
+    loader = SugarcaneModelLoader(BenchmarkConfig)
+    if not loader.load_all_components():
+        print("❌ Model could not be loaded")
+        return 1
+
+    samples = load_sample_batch(args.samples, args.count)
+    single, single_results = run(loader, samples, tta_enabled=False)
+    adaptive, results = run(loader, samples, tta_enabled=True)
+
+    escalated = [(s, r) for s, r in zip(single_results, results) if r and r.get('tta')]
+    changed = sum(s['predicted_class'] != r['predicted_class'] for s, r in escalated)
+    added = adaptive - single
+
+    print(f"\nsamples: {len(samples)}   threshold: {args.threshold:.2f}")
+    print(f"escalated to TTA: {len(escalated)} ({len(escalated) / len(samples):.1%}), "
+          f"top-1 changed by TTA: {changed}")
+    print(f"{'mode':<16} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    print("-" * 50)
+    for name, timings in (('single pass', single), ('adaptive TTA', adaptive)):
+        print(f"{name:<16} {timings.mean():>10.2f} {np.percentile(timings, 50):>10.2f} "
+              f"{np.percentile(timings, 95):>10.2f}")
+    print(f"\nadded p95 (all requests): {np.percentile(added, 95):.2f} ms")
+    print(f"added p95 (escalated only): {loader.tta_stats.get_stats()['added_ms_p95']:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Upload Ingestion Memory Benchmark
+Runs request parsing + image load for a large photo sent as a multipart
+form, a raw body and a hand-built multipart body (no Content-Type), and
+reports peak Python allocation per request (tracemalloc) for the previous
+copy-heavy ingestion and the current zero-copy path. Decoded pixel buffers
+live in PIL's C allocator and are not counted - this measures upload copies.
+
+Usage: python scripts/benchmark_upload_memory.py [--photo path/to/large.jpg] [--megapixels 12]
+"""
+import argparse
+import io
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.image_processor import FarmerFriendlyImageProcessor
+
+
+def legacy_extract(req):
+    """Ingestion as it was before: buffer, decode, split and re-wrap the body"""
+    for key in req.files:
+        return req.files[key]
+    raw = req.get_data()
+    try:
+        json.loads(raw.decode('utf-8'))
+    except Exception:
+        if raw.startswith(b'--'):
+            parts = raw.split(b'\r\n\r\n')
+            if len(parts) >= 2:
+                return io.BytesIO(parts[1].split(b'\r\n--')[0])
+        return io.BytesIO(raw)
+
+
+def legacy_load(image_file):
+    image_data = image_file.read()
+    image_file.seek(0)
+    return Image.open(io.BytesIO(image_data)).convert('RGB')
+
+
+def synthetic_photo(megapixels):
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(height // 8, width // 8, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).resize((width, height)).save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def request_kwargs(kind, photo):
+    if kind == 'multipart':
+        return {'data': {'image': (io.BytesIO(photo), 'leaf.jpg')}, 'content_type': 'multipart/form-data'}
+    if kind == 'raw':
+        return {'data': photo, 'content_type': 'image/jpeg'}
+    body = (b'--x\r\nContent-Disposition: form-data; name="image"; filename="leaf.jpg"\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + photo + b'\r\n--x--\r\n')
+    return {'data': body, 'content_type': 'application/octet-stream'}
+
+
+def peak_megabytes(app, kind, photo, ingest):
+    with app.test_request_context('/api/predict', method='POST', **request_kwargs(kind, photo)):
+        tracemalloc.start()
+        ingest()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak allocation per request for upload ingestion")
+    parser.add_argument('--photo', help="Large phone JPEG (default: synthetic)")
+    parser.add_argument('--megapixels', type=float, default=12)
+    args = parser.parse_args()
+
+    from flask import Flask, request
+    from app.routes import extract_upload
+
+    photo = Path(args.photo).read_bytes() if args.photo else synthetic_photo(args.megapixels)
+    app = Flask(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+    processor = FarmerFriendlyImageProcessor(Config)
+
+    print(f"Upload: {len(photo) / 1e6:.1f} MB")
+    print(f"{'body':<12} {'legacy MB':>10} {'zero-copy MB':>13}")
+    for kind in ('multipart', 'raw', 'handmade'):
+        legacy = peak_megabytes(app, kind, photo, lambda: legacy_load(legacy_extract(request)))
+        current = peak_megabytes(app, kind, photo,
+                                 lambda: processor._load_and_convert_rgb(extract_upload(request)))
+        print(f"{kind:<12} {legacy:>10.1f} {current:>13.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Open-Set Index Builder
+Builds models/open_set_index.npz from embeddings cached in the feature store:
+rows with a 'label' (corrections or labeled photos embedded by
+scripts/retrain_head.py --images) and, optionally, confident served
+predictions. At most --per-class references are kept per class so the index
+stays small enough for every worker to hold in memory.
+
+Thresholds are calibrated leave-one-out on the references: the given
+percentile of in-distribution scores (default 1%, i.e. ~1% of real leaves
+would be rejected).
+
+Usage:
+    python scripts/retrain_head.py --images path/to/labeled --embed-only
+    python scripts/build_open_set_index.py [--min-confidence 0.95] [--per-class 200]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.feature_store import FeatureStore
+from utils.open_set import OpenSetRejector
+
+
+def select_rows(records, classes, min_confidence=None):
+    """(rows, class indices): labeled rows first, then confident predictions of unlabeled rows"""
+    rows, labels = [], []
+    for record in records:
+        label = record.get('label')
+        if label is None and min_confidence is not None and record.get('confidence', 0.0) >= min_confidence:
+            label = record.get('predicted_class')
+        if label in classes:
+            rows.append(record['row'])
+            labels.append(classes.index(label))
+    return np.array(rows, dtype=int), np.array(labels, dtype=int)
+
+
+def cap_per_class(rows, labels, per_class, seed=0):
+    rng = np.random.default_rng(seed)
+    keep = []
+    for label in np.unique(labels):
+        idx = np.flatnonzero(labels == label)
+        keep.extend(rng.choice(idx, size=min(per_class, len(idx)), replace=False))
+    keep = np.sort(np.array(keep, dtype=int))
+    return rows[keep], labels[keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the open-set reference index")
+    parser.add_argument('--store', default=str(Config.FEATURE_STORE_DIR))
+    parser.add_argument('--output', default=str(Config.OPEN_SET_INDEX_PATH))
+    parser.add_argument('--min-confidence', type=float,
+                        help="Also use unlabeled rows predicted with at least this confidence")
+    parser.add_argument('--per-class', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--mode', choices=('knn', 'centroid'), default='knn')
+    parser.add_argument('--percentile', type=float, default=1.0)
+    args = parser.parse_args()
+
+    classes = json.loads(Path(Config.CLASS_MAPPING_PATH).read_text(encoding='utf-8'))['classes']
+    store = FeatureStore(args.store)
+    rows, labels = select_rows(store.records(), classes, args.min_confidence)
+    if len(rows) < 2:
+        print("❌ Not enough labeled embeddings in the feature store "
+              "(add some with scripts/retrain_head.py --images path/to/labeled --embed-only)")
+        return 1
+
+    rows, labels = cap_per_class(rows, labels, args.per_class)
+    embeddings = np.asarray(store.embeddings()[rows], dtype=np.float32)
+    selected = set(rows.tolist())
+    versions = {record.get('model_version') for record in store.records() if record['row'] in selected} - {None}
+    if len(versions) > 1:
+        print(f"⚠️ Embeddings come from several model versions: {sorted(versions)}")
+
+    thresholds = OpenSetRejector.save(args.output, embeddings, labels, len(classes), classes,
+                                      k=args.k, percentile=args.percentile, mode=args.mode,
+                                      model_version=next(iter(versions), None))
+
+    print(f"References: {len(rows)} ({embeddings.shape[1]}-dim, {embeddings.nbytes / 1e6:.1f} MB in memory)")
+    for label, count in zip(*np.unique(labels, return_counts=True)):
+        print(f"   {classes[label]:<20} {count}")
+    for name, value in thresholds.items():
+        print(f"{name}: {value:.4f}")
+    print(f"✅ Open-set index: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
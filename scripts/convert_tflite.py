@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+TFLite Converter + Parity Check
+Converts models/Final_Model.keras to float32 / float16 / dynamic-range int8
+TFLite artifacts and compares them with the Keras model on a sample set.
+Artifacts output class probabilities plus the pooled backbone embedding.
+
+Usage:
+    python scripts/convert_tflite.py --variant float16
+    python scripts/convert_tflite.py --variant all --sample-dir path/to/leaf/photos
+"""
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.inference_backends import (KerasBackend, TFLiteBackend, TFLITE_VARIANTS, tflite_model_path,
+                                     build_dual_output_model)
+from utils.model_parity import load_sample_batch, run_in_batches, compare_predictions, format_parity
+
+
+def convert(model, variant: str, output_path: Path):
+    """Convert a Keras model to a TFLite flatbuffer"""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(build_dual_output_model(model) or model)
+    if variant == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'int8':
+        # Dynamic-range quantization: int8 weights, float activations
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    output_path.write_bytes(converter.convert())
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"✅ {variant}: {output_path} ({size_mb:.2f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the Keras model to TFLite")
+    parser.add_argument('--variant', default='float16', choices=list(TFLITE_VARIANTS) + ['all'])
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--output-dir', default=str(Config.MODEL_DIR))
+    parser.add_argument('--sample-dir', help="Folder of leaf photos for the parity check")
+    parser.add_argument('--samples', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=Config.TFLITE_NUM_THREADS)
+    parser.add_argument('--skip-parity', action='store_true')
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(args.model, compile=False)
+    variants = TFLITE_VARIANTS if args.variant == 'all' else (args.variant,)
+
+    outputs = {}
+    for variant in variants:
+        outputs[variant] = tflite_model_path(args.output_dir, variant)
+        convert(model, variant, outputs[variant])
+
+    if args.skip_parity:
+        return 0
+
+    print("\n🔍 Parity check against Keras:")
+    samples = load_sample_batch(args.sample_dir, args.samples)
+    reference = run_in_batches(KerasBackend(model).predict_batch, samples)
+    for variant, path in outputs.items():
+        candidate = TFLiteBackend(path, variant=variant, num_threads=args.threads)
+        report = compare_predictions(reference, run_in_batches(candidate.predict_batch, samples))
+        print(f"   {format_parity(candidate.name, report)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
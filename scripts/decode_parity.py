@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fast-Decode Parity Report
+Preprocesses every sample photo with the full decode pipeline and with JPEG
+draft mode / Image.reduce pre-downscaling, then compares decode time, decoded
+buffer size, input pixel deltas and model top-1 agreement.
+
+Usage: python scripts/decode_parity.py --samples path/to/photos [--count 100] [--no-model]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.image_processor import FarmerFriendlyImageProcessor
+from utils.model_parity import find_sample_images, run_in_batches, compare_predictions, format_parity
+
+
+def preprocess(processor, paths):
+    """Preprocessed (N, 128, 128, 3) batch, ms per image and mean decoded megabytes"""
+    images, timings, decoded = [], [], []
+    for path in paths:
+        start = time.perf_counter()
+        image = processor._load_and_convert_rgb(str(path))
+        image.load()
+        decoded.append(image.width * image.height * 3 / 1e6)
+        processed = processor.process_image_for_prediction(str(path))
+        timings.append((time.perf_counter() - start) * 1000)
+        images.append(processed[0])
+    return np.stack(images), float(np.mean(timings)), float(np.mean(decoded))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fast JPEG/reduce decoding against full decoding")
+    parser.add_argument('--samples', required=True, help="Folder of leaf photos (ideally full-size phone JPEGs)")
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--no-model', action='store_true', help="Only compare preprocessed inputs")
+    args = parser.parse_args()
+
+    paths = find_sample_images(args.samples, args.count)
+    if not paths:
+        print(f"No images found in {args.samples}")
+        return 1
+
+    full = FarmerFriendlyImageProcessor({'IMAGE_FAST_DECODE': False})
+    fast = FarmerFriendlyImageProcessor({'IMAGE_FAST_DECODE': True,
+                                         'IMAGE_PREDOWNSCALE_MARGIN': Config.IMAGE_PREDOWNSCALE_MARGIN})
+    reference, reference_ms, reference_mb = preprocess(full, paths)
+    candidate, candidate_ms, candidate_mb = preprocess(fast, paths)
+
+    # One uint8 step is 2/255 in the [-1, 1] input range
+    pixel_deltas = np.abs(reference - candidate) * 127.5
+    print(f"Samples: {len(paths)}")
+    print(f"{'pipeline':<10} {'ms / image':>11} {'decoded MB':>11}")
+    print(f"{'full':<10} {reference_ms:>11.1f} {reference_mb:>11.1f}")
+    print(f"{'fast':<10} {candidate_ms:>11.1f} {candidate_mb:>11.1f}")
+    print(f"Input delta (uint8 steps): max {pixel_deltas.max():.1f}, mean {pixel_deltas.mean():.2f}")
+
+    if not args.no_model:
+        import tensorflow as tf
+        from utils.inference_backends import KerasBackend
+
+        backend = KerasBackend(tf.keras.models.load_model(args.model, compile=False))
+        report = compare_predictions(run_in_batches(backend.predict_batch, reference),
+                                     run_in_batches(backend.predict_batch, candidate))
+        print(format_parity('fast decode', report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
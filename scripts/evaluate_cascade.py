@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cascade Evaluation
+Runs a labeled held-out set (<dir>/<class name>/*.jpg) through the gate and
+the full classifier one image at a time and reports, for a sweep of gate
+thresholds, the accuracy lost versus the full classifier alone and the
+average latency saved.
+
+Usage: python scripts/evaluate_cascade.py --samples path/to/labeled_holdout [--thresholds 0.8,0.9,0.95,0.99]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.cascade import HealthyGate
+from utils.model_loader import HEALTHY_CLASS, SugarcaneModelLoader
+from utils.model_parity import load_labeled_samples
+
+
+class EvaluationConfig(Config):
+    """Single-request path: no batching queue, cache, TTA or cascade"""
+    INFERENCE_BATCHING_ENABLED = False
+    PREDICTION_CACHE_ENABLED = False
+    TTA_ENABLED = False
+    CASCADE_ENABLED = False
+    FEATURE_STORE_ENABLED = False
+
+
+def timed(fn, images):
+    outputs, timings = [], []
+    for image in images:
+        start = time.perf_counter()
+        outputs.append(fn(image[None])[0])
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(outputs), np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the two-stage cascade")
+    parser.add_argument('--samples', required=True, help="Class-folder directory of labeled photos")
+    parser.add_argument('--gate', default=str(Config.CASCADE_GATE_PATH))
+    parser.add_argument('--per-class', type=int)
+    parser.add_argument('--thresholds', help="Comma-separated gate thresholds (default: the gate's own)")
+    args = parser.parse_args()
+
+    loader = SugarcaneModelLoader(EvaluationConfig)
+    if not loader.load_all_components():
+        print("❌ Model could not be loaded")
+        return 1
+    gate = HealthyGate.from_file(args.gate)
+    thresholds = ([float(t) for t in args.thresholds.split(',')] if args.thresholds
+                  else [gate.threshold])
+
+    images, labels, _ = load_labeled_samples(args.samples, loader.classes, args.per_class)
+    healthy = loader.classes.index(HEALTHY_CLASS)
+
+    timed(loader.predict_probabilities, images[:5])
+    full_probs, full_ms = timed(loader.predict_probabilities, images)
+    gate_probs, gate_ms = timed(gate.probability_healthy, images)
+    full_predicted = full_probs.argmax(axis=1)
+    full_accuracy = float(np.mean(full_predicted == labels))
+
+    print(f"\nimages: {len(labels)} ({int(np.sum(labels == healthy))} Healthy)")
+    print(f"full classifier: {full_accuracy:.2%} accuracy, {full_ms.mean():.2f} ms mean")
+    print(f"gate: {gate_ms.mean():.3f} ms mean")
+    print(f"\n{'threshold':>9} {'gated':>8} {'accuracy':>9} {'loss':>7} {'mean ms':>9} {'saved':>7} {'missed disease':>15}")
+    print("-" * 72)
+    for threshold in thresholds:
+        gated = gate_probs >= threshold
+        predicted = np.where(gated, healthy, full_predicted)
+        accuracy = float(np.mean(predicted == labels))
+        latency = gate_ms + np.where(gated, 0.0, full_ms)
+        missed = int(np.sum(gated & (labels != healthy)))
+        print(f"{threshold:>9.3f} {gated.mean():>8.1%} {accuracy:>9.2%} {full_accuracy - accuracy:>7.2%} "
+              f"{latency.mean():>9.2f} {1 - latency.mean() / full_ms.mean():>7.1%} {missed:>15}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Inference-Only Model Export
+Writes models/Final_Model_frozen.pb (frozen, constant-folded graph without
+optimizer state) and Final_Model_frozen.json (tensor names, class list,
+SHA-256), checks parity against the Keras model and, with --measure,
+compares cold load time and resident memory of both loader paths in fresh
+interpreters.
+
+Usage:
+    python scripts/export_frozen.py [--sample-dir path/to/leaf/photos] [--measure]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.inference_backends import FrozenGraphBackend, KerasBackend
+from utils.model_parity import load_sample_batch, run_in_batches, compare_predictions, format_parity
+
+PROBE = r'''
+import json, resource, time
+t0 = time.perf_counter()
+from config import Config
+from utils.model_loader import SugarcaneModelLoader
+
+class ProbeConfig(Config):
+    INFERENCE_BACKEND = 'keras'
+    INFERENCE_BATCHING_ENABLED = False
+    SERVING_WARMUP_BATCH_SIZES = [1]
+
+loader = SugarcaneModelLoader(ProbeConfig)
+ok = loader.load_all_components()
+elapsed = time.perf_counter() - t0
+rss_kb = next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmRSS'))
+print(json.dumps({'ok': ok, 'backend': loader.backend.name if loader.backend else None,
+                  'load_s': elapsed, 'rss_mb': rss_kb / 1024,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+'''
+
+
+def measure(prefer_frozen: bool):
+    """Cold start of the loader in a fresh interpreter"""
+    env = dict(os.environ, MODEL_PREFER_FROZEN='true' if prefer_frozen else 'false', TF_CPP_MIN_LOG_LEVEL='2')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, timeout=600)
+    lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+    if not lines:
+        print(result.stderr[-2000:])
+        raise RuntimeError("Probe produced no result")
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an inference-only frozen graph")
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--output-dir', default=None, help="Default: next to --model")
+    parser.add_argument('--sample-dir', help="Folder of leaf photos for the parity check")
+    parser.add_argument('--samples', type=int, default=64)
+    parser.add_argument('--skip-parity', action='store_true')
+    parser.add_argument('--measure', action='store_true', help="Compare load time / RSS of both paths")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    from utils.frozen_model import write_frozen_artifact
+
+    with open(Config.CLASS_MAPPING_PATH, 'r', encoding='utf-8') as f:
+        classes = json.load(f).get('classes', [])
+
+    model = tf.keras.models.load_model(args.model, compile=False)
+    output_dir = Path(args.output_dir) if args.output_dir else Path(args.model).parent
+    model_path, manifest = write_frozen_artifact(model, output_dir, classes, source_model=args.model)
+    print(f"✅ Frozen graph: {model_path} ({manifest['size_bytes'] / (1024 * 1024):.2f} MB, "
+          f"{len(classes)} classes, sha256 {manifest['sha256'][:12]})")
+
+    if not args.skip_parity:
+        print("\n🔍 Parity check against Keras:")
+        samples = load_sample_batch(args.sample_dir, args.samples)
+        reference = run_in_batches(KerasBackend(model).predict_batch, samples)
+        candidate = FrozenGraphBackend(model_path, manifest['input'], manifest['output'],
+                                       embedding_name=manifest.get('embedding_output'))
+        report = compare_predictions(reference, run_in_batches(candidate.predict_batch, samples))
+        print(f"   {format_parity(candidate.name, report)}")
+
+    if args.measure:
+        print(f"\n{'path':<10} {'backend':<8} {'load s':>8} {'RSS MB':>9} {'peak MB':>9}")
+        print("-" * 48)
+        for name, prefer_frozen in (('keras', False), ('frozen', True)):
+            r = measure(prefer_frozen)
+            print(f"{name:<10} {str(r['backend']):<8} {r['load_s']:>8.2f} {r['rss_mb']:>9.1f} {r['peak_rss_mb']:>9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+ONNX Exporter + Parity Check
+Exports models/Final_Model.keras (MobileNetV2 backbone + pooling + softmax head)
+to ONNX with a dynamic batch dimension and compares ONNX Runtime against Keras.
+The graph outputs class probabilities plus the pooled backbone embedding.
+
+Requires tf2onnx (pip install -r requirements-export.txt).
+
+Usage:
+    python scripts/export_onnx.py [--opset 13] [--sample-dir path/to/leaf/photos]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.inference_backends import KerasBackend, OnnxRuntimeBackend, onnx_model_path, build_dual_output_model
+from utils.model_parity import load_sample_batch, run_in_batches, compare_predictions, format_parity
+
+
+def export(model, output_path: Path, opset: int):
+    """Convert the Keras model to ONNX via tf2onnx"""
+    import tensorflow as tf
+    try:
+        import tf2onnx
+    except ImportError:
+        sys.exit("tf2onnx is not installed: pip install -r requirements-export.txt")
+
+    signature = [tf.TensorSpec((None, 128, 128, 3), tf.float32, name='input')]
+    tf2onnx.convert.from_keras(build_dual_output_model(model) or model, input_signature=signature, opset=opset, output_path=str(output_path))
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"✅ ONNX export: {output_path} ({size_mb:.2f} MB, opset {opset})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Keras model to ONNX")
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--output-dir', default=str(Config.MODEL_DIR))
+    parser.add_argument('--opset', type=int, default=13)
+    parser.add_argument('--sample-dir', help="Folder of leaf photos for the parity check")
+    parser.add_argument('--samples', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=Config.ONNX_INTRA_OP_THREADS)
+    parser.add_argument('--skip-parity', action='store_true')
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(args.model, compile=False)
+    output_path = onnx_model_path(args.output_dir)
+    export(model, output_path, args.opset)
+
+    if args.skip_parity:
+        return 0
+
+    print("\n🔍 Parity check against Keras:")
+    samples = load_sample_batch(args.sample_dir, args.samples)
+    reference = run_in_batches(KerasBackend(model).predict_batch, samples)
+    candidate = OnnxRuntimeBackend(output_path, intra_op_threads=args.threads)
+    report = compare_predictions(reference, run_in_batches(candidate.predict_batch, samples))
+    print(f"   {format_parity(candidate.name, report)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
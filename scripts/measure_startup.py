@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Worker Startup Measurement
+Measures import time, time until the app can serve requests and
+time-to-first-prediction, for background vs synchronous model loading.
+Each mode runs in a fresh interpreter so imports are not cached.
+
+Usage: python scripts/measure_startup.py [--timeout 300]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+PROBE = r'''
+import io, json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+t_import = time.perf_counter()
+tf_imported_at_import = 'tensorflow' in sys.modules
+
+app = create_app('development')
+t_serving = time.perf_counter()
+
+from PIL import Image
+buffer = io.BytesIO()
+Image.new('RGB', (640, 480), color=(40, 140, 40)).save(buffer, format='JPEG')
+payload = buffer.getvalue()
+
+client = app.test_client()
+health_status = client.get('/api/health').status_code
+t_first = None
+deadline = t_serving + TIMEOUT
+while time.perf_counter() < deadline:
+    response = client.post('/api/predict', data={'image': (io.BytesIO(payload), 'leaf.jpg')},
+                           content_type='multipart/form-data')
+    if response.status_code == 200:
+        t_first = time.perf_counter()
+        break
+    if response.status_code != 503 or 'Retry-After' not in response.headers:
+        break
+    time.sleep(0.05)
+
+print(json.dumps({
+    'import_s': t_import - t0,
+    'tensorflow_imported_at_import': tf_imported_at_import,
+    'time_to_serving_s': t_serving - t0,
+    'health_status': health_status,
+    'time_to_first_prediction_s': (t_first - t0) if t_first else None,
+}))
+'''
+
+
+def run_mode(background: bool, timeout: float):
+    env = dict(os.environ)
+    env['MODEL_BACKGROUND_LOAD'] = 'true' if background else 'false'
+    # The flat-colour probe image would be rejected as blurry before inference
+    env['IMAGE_QUALITY_CHECK'] = 'false'
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.replace('TIMEOUT', str(timeout))],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=timeout + 60
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+    if not lines:
+        print(result.stderr[-2000:])
+        raise RuntimeError("Probe produced no result")
+    return json.loads(lines[-1])
+
+
+def fmt(value):
+    return f"{value:8.2f}s" if value is not None else "     n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker startup and first prediction time")
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14} {'import':>9} {'serving':>9} {'1st pred':>9}  tensorflow at import")
+    print("-" * 66)
+    for background in (False, True):
+        result = run_mode(background, args.timeout)
+        name = 'background' if background else 'synchronous'
+        print(f"{name:<14} {fmt(result['import_s'])} {fmt(result['time_to_serving_s'])} "
+              f"{fmt(result['time_to_first_prediction_s'])}  {result['tensorflow_imported_at_import']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Per-Worker Memory Report
+Reads /proc/<pid>/smaps_rollup for a gunicorn master and its workers and
+prints RSS, PSS (proportional share) and shared/private memory, so preload
+on/off can be compared:
+
+    GUNICORN_PRELOAD=false gunicorn -c gunicorn.conf.py wsgi:app &
+    python scripts/measure_worker_memory.py
+    GUNICORN_PRELOAD=true  gunicorn -c gunicorn.conf.py wsgi:app &
+    python scripts/measure_worker_memory.py
+
+Linux only. Wait for /api/health/ready before measuring.
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def read_rollup(pid: int):
+    """Memory fields (kB) from smaps_rollup"""
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        parts = line.split()
+        if parts and parts[0].rstrip(':') in FIELDS:
+            values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def find_master_pid() -> int:
+    """Oldest gunicorn process is the master"""
+    output = subprocess.run(['pgrep', '-o', '-f', 'gunicorn'], capture_output=True, text=True).stdout
+    if not output.strip():
+        raise RuntimeError("No gunicorn process found")
+    return int(output.split()[0])
+
+
+def child_pids(pid: int):
+    children = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(p) for p in children.read_text().split()] if children.exists() else []
+
+
+def mb(kb: int) -> str:
+    return f"{kb / 1024:9.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report gunicorn per-worker memory")
+    parser.add_argument('--pid', type=int, help="gunicorn master pid (default: auto-detect)")
+    args = parser.parse_args()
+
+    master = args.pid or find_master_pid()
+    workers = child_pids(master)
+
+    print(f"{'process':<16} {'RSS MB':>9} {'PSS MB':>9} {'shared MB':>9} {'private MB':>10}")
+    print("-" * 58)
+    total_pss = 0
+    worker_rss = []
+    for label, pid in [('master', master)] + [(f"worker {p}", p) for p in workers]:
+        m = read_rollup(pid)
+        shared = m.get('Shared_Clean', 0) + m.get('Shared_Dirty', 0)
+        private = m.get('Private_Clean', 0) + m.get('Private_Dirty', 0)
+        total_pss += m.get('Pss', 0)
+        if pid != master:
+            worker_rss.append(m.get('Rss', 0))
+        print(f"{label:<16} {mb(m.get('Rss', 0))} {mb(m.get('Pss', 0))} {mb(shared)} {mb(private):>10}")
+
+    print("-" * 58)
+    if worker_rss:
+        print(f"average worker RSS: {sum(worker_rss) / len(worker_rss) / 1024:.1f} MB")
+    print(f"total PSS (real footprint): {total_pss / 1024:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
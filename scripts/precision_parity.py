@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Reduced-Precision Parity Report
+Loads the Keras model in float32 and in each reduced weight dtype and
+compares accuracy, top-1 agreement, probability deltas, weight memory and
+latency on a labeled sample (one sub-folder per class name).
+
+Usage: python scripts/precision_parity.py --sample-dir path/to/labeled [--dtypes float16,bfloat16]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.inference_backends import KerasBackend
+from utils.model_parity import load_labeled_samples, accuracy, run_in_batches, compare_predictions
+from utils.reduced_precision import to_reduced_precision, weight_bytes
+
+
+def timed_predictions(backend, samples):
+    backend.warm_up([8])
+    start = time.perf_counter()
+    probabilities = run_in_batches(backend.predict_batch, samples)
+    return probabilities, (time.perf_counter() - start) * 1000 / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reduced-precision weights against float32")
+    parser.add_argument('--model', default=str(Config.MODEL_PATH))
+    parser.add_argument('--sample-dir', required=True, help="Labeled photos: <dir>/<class name>/*.jpg")
+    parser.add_argument('--per-class', type=int, default=50)
+    parser.add_argument('--dtypes', default='float16,bfloat16')
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    with open(Config.CLASS_MAPPING_PATH, 'r', encoding='utf-8') as f:
+        classes = json.load(f).get('classes', [])
+    samples, labels, _ = load_labeled_samples(args.sample_dir, classes, args.per_class)
+    print(f"Labeled sample: {len(samples)} images, {len(set(labels.tolist()))} classes\n")
+
+    model = tf.keras.models.load_model(args.model, compile=False)
+    reference, reference_ms = timed_predictions(KerasBackend(model), samples)
+
+    print(f"{'dtype':<10} {'weights MB':>10} {'accuracy':>9} {'top-1 agree':>12} {'max delta':>10} {'ms / image':>11}")
+    print("-" * 68)
+    print(f"{'float32':<10} {weight_bytes(model) / 1e6:>10.1f} {accuracy(reference, labels):>9.2%} "
+          f"{'-':>12} {'-':>10} {reference_ms:>11.2f}")
+    for dtype in args.dtypes.split(','):
+        try:
+            reduced = to_reduced_precision(model, dtype)
+        except Exception as e:
+            print(f"{dtype:<10} failed: {e}")
+            continue
+        candidate, candidate_ms = timed_predictions(KerasBackend(reduced), samples)
+        report = compare_predictions(reference, candidate)
+        print(f"{dtype:<10} {weight_bytes(reduced) / 1e6:>10.1f} {accuracy(candidate, labels):>9.2%} "
+              f"{report['top1_agreement']:>12.2%} {report['max_probability_delta']:>10.4f} {candidate_ms:>11.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
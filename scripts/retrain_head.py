@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Head-Only Retraining CLI
+Fine-tunes only the final Dense softmax layer on cached backbone embeddings
+from the feature store, validates on a held-out split and writes a new model
+version to models/versions/<version>/ that the loader can hot-swap to.
+
+Labels come from a CSV of corrections (columns: key or row, label = class
+name) and/or a class-folder directory of photos (<dir>/<class name>/*.jpg),
+whose embeddings are computed once and cached in the feature store.
+The version directory also gets the converted artifact for --backend
+(default INFERENCE_BACKEND), so TFLite/ONNX deployments can reload it.
+
+Usage:
+    python scripts/retrain_head.py --labels corrections.csv
+    python scripts/retrain_head.py --images path/to/labeled --version 2025-01-farmer-fixes
+    python scripts/retrain_head.py --images path/to/labeled --embed-only
+    curl -X POST -H "X-Admin-Token: $ADMIN_TOKEN" -d '{"version": "<version>"}' \\
+         -H "Content-Type: application/json" http://localhost:5000/api/admin/reload
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.feature_store import FeatureStore
+from utils.head_training import evaluate_head, stratified_split, train_softmax_head
+from utils.inference_backends import TFLITE_VARIANTS, backend_artifact_path
+from utils.model_loader import SugarcaneModelLoader
+from utils.model_parity import find_sample_images
+from utils.prediction_cache import hash_tensor
+
+
+class RetrainConfig(Config):
+    """Direct Keras model access: no batching, cache, TTA or frozen fast path"""
+    INFERENCE_BACKEND = 'keras'
+    INFERENCE_MODE = 'local'
+    INFERENCE_BATCHING_ENABLED = False
+    PREDICTION_CACHE_ENABLED = False
+    MODEL_PREFER_FROZEN = False
+    MODEL_WEIGHT_DTYPE = 'float32'
+    FEATURE_STORE_ENABLED = False
+
+
+def labels_from_csv(path, store, classes):
+    """(rows, class indices) from a corrections CSV"""
+    rows, labels = [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for line in csv.DictReader(f):
+            label = (line.get('label') or '').strip()
+            if label not in classes:
+                print(f"⚠️ Skipping unknown label: {label!r}")
+                continue
+            row = store.row_for_key(line['key']) if line.get('key') else None
+            if row is None and line.get('row', '').strip().isdigit():
+                row = int(line['row'])
+            if row is None or row >= len(store):
+                print(f"⚠️ Skipping entry without a stored embedding: {dict(line)}")
+                continue
+            rows.append(row)
+            labels.append(classes.index(label))
+    return rows, labels
+
+
+def labels_from_images(image_dir, store, loader, batch_size=16):
+    """Embed class-folder photos once (cached in the store) -> (rows, class indices)"""
+    from utils.image_processor import FarmerFriendlyImageProcessor
+
+    processor = FarmerFriendlyImageProcessor(Config)
+    rows, labels, pending = [], [], []
+
+    def flush():
+        batch = np.stack([image for image, _ in pending])
+        _, embeddings = loader.predict_with_embeddings(batch)
+        for (image, label), embedding in zip(pending, embeddings):
+            rows.append(store.append(embedding, key=hash_tensor(image[None]),
+                                     metadata={'label': loader.classes[label], 'source': 'retrain_head'}))
+            labels.append(label)
+        pending.clear()
+
+    for class_dir in sorted(p for p in Path(image_dir).iterdir() if p.is_dir()):
+        if class_dir.name not in loader.classes:
+            print(f"⚠️ Skipping folder {class_dir.name}: not a known class")
+            continue
+        label = loader.classes.index(class_dir.name)
+        for path in find_sample_images(class_dir):
+            processed = processor.process_image_for_prediction(str(path))
+            if processed is None:
+                continue
+            key = hash_tensor(processed)
+            row = store.row_for_key(key)
+            if row is not None:
+                rows.append(row)
+                labels.append(label)
+                continue
+            pending.append((processed[0], label))
+            if len(pending) == batch_size:
+                flush()
+    if pending:
+        flush()
+    return rows, labels
+
+
+BACKENDS = ('keras',) + tuple(f"tflite_{variant}" for variant in TFLITE_VARIANTS) + ('onnx',)
+
+
+def write_version(model, kernel, bias, version_dir: Path, metadata, backend='keras'):
+    """Serving model with the new head weights (+ the backend's converted artifact) + training report"""
+    head = model.layers[-1]
+    head.set_weights([kernel.astype(np.float32), bias.astype(np.float32)])
+    version_dir.mkdir(parents=True, exist_ok=False)
+    model.save(version_dir / 'Final_Model.keras')
+    artifact = backend_artifact_path(backend, version_dir)
+    if backend.startswith('tflite_'):
+        from scripts.convert_tflite import convert
+        convert(model, backend[len('tflite_'):], artifact)
+    elif backend == 'onnx':
+        from scripts.export_onnx import export
+        export(model, artifact, opset=13)
+    (version_dir / 'metadata.json').write_text(json.dumps(metadata, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the softmax head from cached embeddings")
+    parser.add_argument('--labels', help="CSV with columns key|row,label")
+    parser.add_argument('--images', help="Class-folder directory of labeled photos")
+    parser.add_argument('--store', default=str(Config.FEATURE_STORE_DIR))
+    parser.add_argument('--version', default=time.strftime('head-%Y%m%d-%H%M%S'))
+    parser.add_argument('--embed-only', action='store_true',
+                        help="Only cache the --images embeddings in the feature store; no training")
+    parser.add_argument('--backend', default=Config.INFERENCE_BACKEND, choices=BACKENDS,
+                        help="Serving backend to export the new version for")
+    parser.add_argument('--val-fraction', type=float, default=0.2)
+    parser.add_argument('--epochs', type=int, default=300)
+    parser.add_argument('--learning-rate', type=float, default=0.01)
+    parser.add_argument('--l2', type=float, default=1e-4)
+    parser.add_argument('--min-val-accuracy-gain', type=float, default=0.0,
+                        help="Refuse to write a version that does not beat the current head by this much")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.labels and not args.images:
+        parser.error("give --labels and/or --images")
+    if args.embed_only and not args.images:
+        parser.error("--embed-only needs --images")
+    if args.backend == 'onnx' and not args.embed_only:
+        try:
+            import tf2onnx  # noqa: F401
+        except ImportError:
+            print("❌ --backend onnx needs tf2onnx: pip install -r requirements-export.txt")
+            return 1
+
+    loader = SugarcaneModelLoader(RetrainConfig)
+    if not loader.load_all_components() or loader.model is None:
+        print("❌ Model could not be loaded")
+        return 1
+    if not loader.backend.supports_embeddings:
+        print("❌ Model has no pooled embedding layer to train a head on")
+        return 1
+
+    store = FeatureStore(args.store, dim=loader.model.layers[-1].get_weights()[0].shape[0])
+    rows, labels = [], []
+    if args.labels:
+        r, l = labels_from_csv(args.labels, store, loader.classes)
+        rows += r
+        labels += l
+    if args.images:
+        r, l = labels_from_images(args.images, store, loader)
+        rows += r
+        labels += l
+    if args.embed_only:
+        print(f"✅ {len(set(rows))} labeled embeddings in {args.store}")
+        return 0
+    if len(rows) < 2:
+        print("❌ Not enough labeled embeddings")
+        return 1
+
+    features = np.asarray(store.embeddings()[rows], dtype=np.float32)
+    labels = np.array(labels)
+    train_idx, val_idx = stratified_split(labels, args.val_fraction, args.seed)
+    print(f"Labeled embeddings: {len(labels)} (train {len(train_idx)}, validation {len(val_idx)})")
+
+    old_kernel, old_bias = loader.model.layers[-1].get_weights()
+    started = time.perf_counter()
+    kernel, bias, report = train_softmax_head(
+        features[train_idx], labels[train_idx], len(loader.classes),
+        init_kernel=old_kernel, init_bias=old_bias,
+        epochs=args.epochs, learning_rate=args.learning_rate, l2=args.l2
+    )
+    train_s = time.perf_counter() - started
+
+    before = evaluate_head(old_kernel, old_bias, features[val_idx], labels[val_idx])
+    after = evaluate_head(kernel, bias, features[val_idx], labels[val_idx])
+    print(f"Trained in {train_s:.2f}s")
+    if before['accuracy'] is not None:
+        print(f"Validation accuracy: current head {before['accuracy']:.2%} -> new head {after['accuracy']:.2%}")
+        if after['accuracy'] - before['accuracy'] < args.min_val_accuracy_gain:
+            print("❌ New head does not improve enough on the held-out split; no version written")
+            return 1
+    else:
+        print("⚠️ No validation samples (too few labels per class)")
+
+    version_dir = Path(Config.MODEL_VERSIONS_DIR) / args.version
+    write_version(loader.model, kernel, bias, version_dir, {
+        'version': args.version,
+        'base_model_version': loader.model_version,
+        'classes': loader.classes,
+        'backend': args.backend,
+        'samples': {'train': int(len(train_idx)), 'validation': int(len(val_idx))},
+        'validation': {'before': before, 'after': after},
+        'training': dict(report, seconds=round(train_s, 3)),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }, backend=args.backend)
+    print(f"✅ New model version: {version_dir}")
+    print(f"   Activate with POST /api/admin/reload {{\"version\": \"{args.version}\"}}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Healthy Gate Trainer
+Fits the first cascade stage (utils/cascade.py) on a class-folder directory
+of labeled photos (<dir>/<class name>/*.jpg): Healthy vs. everything else.
+The threshold is chosen on a held-out split so that at most
+--max-false-healthy of the diseased images would skip the full classifier.
+
+Needs no TensorFlow - only the image preprocessing.
+
+Usage:
+    python scripts/train_healthy_gate.py --samples path/to/labeled [--max-false-healthy 0.01]
+    python scripts/evaluate_cascade.py --samples path/to/labeled_holdout
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import Config
+from utils.cascade import HealthyGate, choose_threshold, gate_features
+from utils.head_training import stratified_split
+from utils.model_loader import HEALTHY_CLASS
+from utils.model_parity import load_labeled_samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the healthy/diseased cascade gate")
+    parser.add_argument('--samples', required=True, help="Class-folder directory of labeled photos")
+    parser.add_argument('--output', default=str(Config.CASCADE_GATE_PATH))
+    parser.add_argument('--per-class', type=int, help="Cap images per class")
+    parser.add_argument('--val-fraction', type=float, default=0.3)
+    parser.add_argument('--max-false-healthy', type=float, default=0.01,
+                        help="Fraction of held-out diseased images allowed past the gate as Healthy")
+    parser.add_argument('--min-threshold', type=float, default=0.9,
+                        help="Never short-circuit below this gate probability")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    classes = json.loads(Path(Config.CLASS_MAPPING_PATH).read_text(encoding='utf-8'))['classes']
+    images, labels, _ = load_labeled_samples(args.samples, classes, args.per_class)
+    is_healthy = labels == classes.index(HEALTHY_CLASS)
+    if is_healthy.all() or not is_healthy.any():
+        print("❌ Need both Healthy and diseased images")
+        return 1
+
+    features = gate_features(images)
+    train_idx, val_idx = stratified_split(is_healthy.astype(int), args.val_fraction, args.seed)
+    gate = HealthyGate.train(features[train_idx], is_healthy[train_idx])
+
+    probabilities = gate.probability_healthy(images[val_idx])
+    gate.threshold = max(args.min_threshold,
+                         choose_threshold(probabilities, is_healthy[val_idx], args.max_false_healthy))
+    passed = probabilities >= gate.threshold
+    val_healthy = is_healthy[val_idx]
+
+    print(f"Images: {len(labels)} ({int(is_healthy.sum())} Healthy), "
+          f"train {len(train_idx)}, validation {len(val_idx)}")
+    print(f"Threshold: {gate.threshold:.4f}")
+    print(f"Held-out Healthy answered by the gate: {passed[val_healthy].mean():.1%}")
+    print(f"Held-out diseased wrongly answered Healthy: {passed[~val_healthy].mean():.1%}")
+    print(f"Held-out requests short-circuited: {passed.mean():.1%}")
+    gate.save(args.output)
+    print(f"✅ Gate: {args.output} (enable with CASCADE_ENABLED=true)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
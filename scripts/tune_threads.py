@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+TensorFlow Thread Tuning Sweep
+Runs the real model under each intra/inter-op thread setting with
+--workers processes predicting at the same time (like gunicorn workers
+sharing the VPS) and prints aggregate throughput and latency, so the best
+TF_INTRA_OP_THREADS / TF_INTER_OP_THREADS can be picked per machine size.
+TensorFlow fixes its pools at start-up, so every setting runs in fresh
+processes.
+
+Usage: python scripts/tune_threads.py [--workers 2] [--intra 1,2,4,auto]
+                                      [--inter 1,2] [--iterations 50]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.cpu_threads import available_cpus, resolve_threads
+
+PROBE = r'''
+import json, os, sys, time
+import numpy as np
+from config import Config
+from utils.model_loader import SugarcaneModelLoader
+
+class ProbeConfig(Config):
+    INFERENCE_BACKEND = 'keras'
+    INFERENCE_MODE = 'local'
+    INFERENCE_BATCHING_ENABLED = False
+    PREDICTION_CACHE_ENABLED = False
+    FEATURE_STORE_ENABLED = False
+
+loader = SugarcaneModelLoader(ProbeConfig)
+if not loader.load_all_components():
+    print(json.dumps({'error': loader.load_error}), flush=True)
+    sys.exit(1)
+
+batch_size, iterations = int(os.environ['PROBE_BATCH_SIZE']), int(os.environ['PROBE_ITERATIONS'])
+batch = np.random.default_rng(0).uniform(-1, 1, size=(batch_size, 128, 128, 3)).astype(np.float32)
+print('READY', flush=True)
+sys.stdin.readline()
+
+timings = []
+started = time.perf_counter()
+for _ in range(iterations):
+    t0 = time.perf_counter()
+    loader.predict_probabilities(batch)
+    timings.append((time.perf_counter() - t0) * 1000)
+elapsed = time.perf_counter() - started
+print(json.dumps({'timings_ms': timings, 'elapsed_s': elapsed}), flush=True)
+'''
+
+
+def run_setting(intra, inter, workers, batch_size, iterations):
+    """Start `workers` probes, release them together, collect their timings"""
+    env = dict(os.environ, TF_INTRA_OP_THREADS=str(intra), TF_INTER_OP_THREADS=str(inter),
+               WORKERS=str(workers), TF_CPP_MIN_LOG_LEVEL='2',
+               PROBE_BATCH_SIZE=str(batch_size), PROBE_ITERATIONS=str(iterations))
+    probes = [
+        subprocess.Popen([sys.executable, '-c', PROBE], cwd=PROJECT_ROOT, env=env, text=True,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(workers)
+    ]
+    try:
+        for probe in probes:
+            line = probe.stdout.readline().strip()
+            if line != 'READY':
+                raise RuntimeError(f"Probe failed to load the model: {line}")
+        for probe in probes:
+            probe.stdin.write('GO\n')
+            probe.stdin.flush()
+        results = [json.loads(probe.stdout.readline()) for probe in probes]
+    finally:
+        for probe in probes:
+            try:
+                probe.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                probe.kill()
+
+    timings = np.concatenate([r['timings_ms'] for r in results])
+    images = workers * iterations * batch_size
+    return {
+        'images_per_sec': images / max(r['elapsed_s'] for r in results),
+        'mean_ms': float(timings.mean()),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep TensorFlow thread settings")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', 2)),
+                        help="Concurrent model processes (gunicorn workers)")
+    parser.add_argument('--intra', default='1,2,4,auto', help="Comma list of intra-op values")
+    parser.add_argument('--inter', default='1,2', help="Comma list of inter-op values")
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    print(f"available cores: {cpus}   workers: {args.workers}   "
+          f"auto intra-op: {resolve_threads('auto', args.workers, cpus)}")
+    print(f"\n{'intra':>6} {'inter':>6} {'img / s':>10} {'mean ms':>10} {'p50 ms':>10} "
+          f"{'p95 ms':>10} {'p99 ms':>10}")
+    print("-" * 68)
+
+    best = None
+    for intra in args.intra.split(','):
+        for inter in args.inter.split(','):
+            try:
+                stats = run_setting(intra, inter, args.workers, args.batch_size, args.iterations)
+            except Exception as e:
+                print(f"{intra:>6} {inter:>6}  failed: {e}")
+                continue
+            print(f"{intra:>6} {inter:>6} {stats['images_per_sec']:>10.1f} {stats['mean_ms']:>10.2f} "
+                  f"{stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} {stats['p99_ms']:>10.2f}")
+            if best is None or stats['p95_ms'] < best[2]['p95_ms']:
+                best = (intra, inter, stats)
+
+    if best:
+        print(f"\nlowest p95: TF_INTRA_OP_THREADS={best[0]} TF_INTER_OP_THREADS={best[1]} "
+              f"({best[2]['p95_ms']:.2f} ms, {best[2]['images_per_sec']:.1f} img/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
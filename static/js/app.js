@@ -631,6 +631,10 @@ const SugarcaneApp = {
         });
         clearTimeout(timeoutId);
         if (!response.ok) {
+          if (response.status === 400) {
+            // Rejected photo (quality, format, not a leaf): show the server's message, no retry
+            return await response.json();
+          }
           if (response.status === 413) {
             throw new Error("छायाचित्र खूप मोठे आहे");
           } else if (response.status === 503) {
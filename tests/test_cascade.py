@@ -0,0 +1,105 @@
+"""
+Tests for the two-stage healthy/diseased cascade
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.cascade import FEATURE_NAMES, HealthyGate, choose_threshold, gate_features
+from utils.inference_backends import InferenceBackend
+from utils.model_loader import ModelVersion, SugarcaneModelLoader
+
+
+class CountingBackend(InferenceBackend):
+    """Stand-in engine that always predicts Rust and counts forward passes"""
+    name = 'counting'
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_batch(self, batch):
+        self.calls += 1
+        return np.tile(np.array([0.2, 0.8], dtype=np.float32), (len(batch), 1))
+
+
+def leaf_images(rng, count, healthy):
+    """Green leaves, or green leaves with brown patches, in [-1, 1]"""
+    images = np.empty((count, 128, 128, 3), dtype=np.float32)
+    images[:] = (-0.6, 0.4, -0.7)
+    if not healthy:
+        for image in images:
+            y, x = rng.integers(0, 64, size=2)
+            image[y:y + 64, x:x + 64] = (0.3, -0.1, -0.8)
+    return images + rng.normal(0, 0.05, size=images.shape).astype(np.float32)
+
+
+class TestCascade(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.images = np.concatenate([leaf_images(rng, 20, True), leaf_images(rng, 20, False)])
+        self.is_healthy = np.repeat([True, False], 20)
+
+    def test_gate_features_and_training(self):
+        features = gate_features(self.images)
+        self.assertEqual(features.shape, (40, len(FEATURE_NAMES)))
+        gate = HealthyGate.train(features, self.is_healthy)
+        probabilities = gate.probability_healthy(self.images)
+        self.assertTrue(np.all(probabilities[:20] > 0.9))
+        self.assertTrue(np.all(probabilities[20:] < 0.1))
+
+    def test_choose_threshold_bounds_false_healthy(self):
+        probabilities = np.array([0.99, 0.97, 0.2, 0.6, 0.95, 0.1])
+        is_healthy = np.array([True, True, False, False, False, False])
+        threshold = choose_threshold(probabilities, is_healthy, max_false_healthy=0.0)
+        self.assertGreater(threshold, 0.95)
+        self.assertLessEqual(threshold, 0.97)
+        self.assertLess(choose_threshold(probabilities, is_healthy, max_false_healthy=0.25), 0.95)
+
+    def test_loader_short_circuits_confident_healthy(self):
+        loader = SugarcaneModelLoader({'INFERENCE_BATCHING_ENABLED': False, 'PREDICTION_CACHE_ENABLED': False,
+                                       'TTA_ENABLED': False, 'FEATURE_STORE_ENABLED': False})
+        loader.classes = ['Healthy', 'Rust']
+        backend = CountingBackend()
+        loader.registry.activate(ModelVersion('test', backend))
+        loader.healthy_gate = HealthyGate.train(gate_features(self.images), self.is_healthy)
+        loader.healthy_gate.threshold = 0.9
+
+        healthy = loader.predict(self.images[:1])
+        self.assertEqual(healthy['predicted_class'], 'Healthy')
+        self.assertEqual(healthy['cascade']['stage'], 'gate')
+        self.assertAlmostEqual(sum(healthy['class_probabilities'].values()), 1.0, places=5)
+        self.assertEqual(healthy['probability_source'], 'healthy_gate')
+        self.assertEqual(backend.calls, 0)
+
+        diseased = loader.predict(self.images[-1:])
+        self.assertEqual(diseased['predicted_class'], 'Rust')
+        self.assertEqual(diseased['cascade']['stage'], 'full')
+        self.assertIn('full_ms', diseased['cascade'])
+        self.assertEqual(backend.calls, 1)
+
+        stats = loader.get_inference_stats()['cascade']
+        self.assertEqual(stats['requests_total'], 2)
+        self.assertEqual(stats['short_circuited_total'], 1)
+
+    def test_open_set_check_disables_short_circuit(self):
+        loader = SugarcaneModelLoader({'INFERENCE_BATCHING_ENABLED': False, 'PREDICTION_CACHE_ENABLED': False,
+                                       'TTA_ENABLED': False, 'FEATURE_STORE_ENABLED': False})
+        loader.classes = ['Healthy', 'Rust']
+        backend = CountingBackend()
+        loader.registry.activate(ModelVersion('test', backend))
+        loader.healthy_gate = HealthyGate.train(gate_features(self.images), self.is_healthy)
+        loader.open_set = object()
+
+        result = loader.predict(self.images[:1])
+        self.assertNotIn('probability_source', result)
+        self.assertEqual(backend.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+Tests for the CPU thread budget helpers
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.cpu_threads import available_cpus, resolve_threads
+
+
+class TestCpuThreads(unittest.TestCase):
+
+    def test_auto_divides_cores_between_processes(self):
+        self.assertEqual(resolve_threads('auto', processes=2, cpus=8), 4)
+        self.assertEqual(resolve_threads('AUTO', processes=4, cpus=2), 1)
+        self.assertEqual(resolve_threads('3', processes=4, cpus=2), 3)
+
+    def test_cgroup_v2_quota_caps_cores(self):
+        with tempfile.TemporaryDirectory() as root:
+            (Path(root) / 'cpu.max').write_text('150000 100000\n')
+            self.assertEqual(available_cpus(Path(root)), min(2, available_cpus(Path(root) / 'none')))
+
+    def test_cgroup_v1_quota_caps_cores(self):
+        with tempfile.TemporaryDirectory() as root:
+            (Path(root) / 'cpu').mkdir()
+            (Path(root) / 'cpu' / 'cpu.cfs_quota_us').write_text('100000\n')
+            (Path(root) / 'cpu' / 'cpu.cfs_period_us').write_text('100000\n')
+            self.assertEqual(available_cpus(Path(root)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the embedding feature store
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils import feature_store
+from utils.feature_store import FeatureStore
+from utils.inference_backends import InferenceBackend
+from utils.model_loader import ModelVersion, SugarcaneModelLoader
+
+
+class EmbeddingBackend(InferenceBackend):
+    """Stand-in engine whose 'embedding' is the per-channel mean"""
+    name = 'embedding'
+    supports_embeddings = True
+
+    def predict_batch(self, batch):
+        return self.predict_with_embeddings(batch)[0]
+
+    def predict_with_embeddings(self, batch):
+        probabilities = np.tile(np.array([0.9, 0.1], dtype=np.float32), (len(batch), 1))
+        return probabilities, batch.mean(axis=(1, 2))
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_dedupes_grows_and_reopens(self):
+        original_capacity = feature_store.INITIAL_CAPACITY
+        feature_store.INITIAL_CAPACITY = 2
+        try:
+            store = FeatureStore(self.tmp.name, dim=4)
+            rows = [store.append(np.full(4, i), key=f"k{i}", metadata={'n': i}) for i in range(5)]
+            self.assertEqual(rows, [0, 1, 2, 3, 4])
+            self.assertEqual(store.append(np.zeros(4), key='k2'), 2)
+            self.assertEqual(store.get_stats()['capacity'], 8)
+        finally:
+            feature_store.INITIAL_CAPACITY = original_capacity
+
+        reopened = FeatureStore(self.tmp.name)
+        self.assertEqual(len(reopened), 5)
+        self.assertEqual(reopened.embeddings().dtype, np.float16)
+        np.testing.assert_array_equal(reopened.embeddings()[3], np.full(4, 3))
+        self.assertEqual([record['n'] for record in reopened.records()], [0, 1, 2, 3, 4])
+
+    def test_full_store_stops_appending(self):
+        store = FeatureStore(self.tmp.name, dim=2, max_rows=2)
+        self.assertEqual([store.append(np.ones(2), key=k) for k in 'abc'], [0, 1, None])
+        self.assertEqual(store.append(np.ones(2), key='a'), 0)
+        self.assertEqual(len(FeatureStore(self.tmp.name)), 2)
+
+    def test_second_writer_sees_other_rows(self):
+        first, second = FeatureStore(self.tmp.name, dim=2), FeatureStore(self.tmp.name, dim=2)
+        first.append(np.ones(2), key='a')
+        self.assertEqual(second.append(np.zeros(2), key='b'), 1)
+        self.assertEqual(second.append(np.ones(2), key='a'), 0)
+        first.refresh()
+        self.assertEqual(len(first), 2)
+
+    def test_loader_stores_embedding_from_prediction_pass(self):
+        loader = SugarcaneModelLoader({'FEATURE_STORE_ENABLED': True, 'FEATURE_STORE_DIR': self.tmp.name,
+                                       'INFERENCE_BATCHING_ENABLED': False})
+        loader.classes = ['Healthy', 'Rust']
+        loader.registry.activate(ModelVersion('test', EmbeddingBackend()))
+
+        image = np.full((1, 128, 128, 3), 0.5, dtype=np.float32)
+        result = loader.predict(image)
+        self.assertTrue(result['embedding_stored'])
+        loader.feature_store.flush()
+        store = loader.feature_store.store
+        self.assertEqual(next(store.records())['predicted_class'], 'Healthy')
+        np.testing.assert_allclose(store.embeddings()[0], [0.5, 0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the inference-only artifact manifest checks
+"""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.frozen_model import MANIFEST_FORMAT, manifest_path, read_manifest, sha256_bytes, stale_reason, validate_artifact
+from utils.inference_backends import frozen_model_path
+from utils.model_loader import SugarcaneModelLoader
+
+CLASSES = ['Healthy', 'Mosaic']
+
+
+class TestFrozenArtifact(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = frozen_model_path(self.tmp.name)
+        self.data = b'graph-bytes'
+        self.model_path.write_bytes(self.data)
+        self.manifest = {'format': MANIFEST_FORMAT, 'input': 'images:0', 'output': 'Identity:0',
+                         'classes': CLASSES, 'sha256': sha256_bytes(self.data)}
+        manifest_path(self.model_path).write_text(json.dumps(self.manifest))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_manifest_round_trip_and_validation(self):
+        manifest = read_manifest(self.model_path)
+        self.assertEqual(manifest['classes'], CLASSES)
+        self.assertIsNone(validate_artifact(self.data, manifest, CLASSES))
+        self.assertEqual(validate_artifact(b'tampered', manifest, CLASSES), 'checksum mismatch')
+        self.assertIn('class list', validate_artifact(self.data, manifest, ['Healthy']))
+
+    def test_loader_skips_artifact_that_fails_checks(self):
+        loader = SugarcaneModelLoader({})
+        loader.classes = ['Healthy', 'Rust']
+        keras_path = Path(self.tmp.name) / 'Final_Model.keras'
+        self.assertIsNone(loader._load_frozen_backend(keras_path))
+
+        loader = SugarcaneModelLoader({'MODEL_PREFER_FROZEN': False})
+        self.assertIsNone(loader._frozen_artifact_path(keras_path))
+
+    def test_artifact_is_skipped_when_source_model_changes(self):
+        keras_path = Path(self.tmp.name) / 'Final_Model.keras'
+        keras_path.write_bytes(b'keras-v1')
+        loader = SugarcaneModelLoader({})
+
+        # Older manifest without the source checksum cannot be trusted
+        self.assertIsNone(loader._frozen_artifact_path(keras_path))
+
+        self.manifest['source_sha256'] = sha256_bytes(b'keras-v1')
+        manifest_path(self.model_path).write_text(json.dumps(self.manifest))
+        self.assertIsNone(stale_reason(self.manifest, keras_path))
+        self.assertEqual(loader._frozen_artifact_path(keras_path), self.model_path)
+
+        keras_path.write_bytes(b'keras-v2 retrained')
+        self.assertIn('changed since export', stale_reason(self.manifest, keras_path))
+        self.assertIsNone(loader._frozen_artifact_path(keras_path))
+
+        # Frozen artifact deployed without its source stays usable
+        keras_path.unlink()
+        self.assertEqual(loader._frozen_artifact_path(keras_path), self.model_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Tests for head-only retraining on cached embeddings
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.head_training import evaluate_head, stratified_split, train_softmax_head
+
+
+class TestHeadTraining(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(0, 1, size=(3, 16))
+        self.labels = np.repeat(np.arange(3), 40)
+        self.features = (centers[self.labels] + rng.normal(0, 0.3, size=(120, 16))).astype(np.float32)
+
+    def test_stratified_split_keeps_every_class(self):
+        train, val = stratified_split(self.labels, 0.25)
+        self.assertEqual(len(train) + len(val), 120)
+        self.assertFalse(set(train) & set(val))
+        self.assertEqual(sorted(np.unique(self.labels[val])), [0, 1, 2])
+
+    def test_training_fixes_a_wrong_head(self):
+        train, val = stratified_split(self.labels, 0.25)
+        wrong_kernel = np.zeros((16, 3), dtype=np.float32)
+        wrong_bias = np.array([5.0, 0.0, 0.0], dtype=np.float32)
+        before = evaluate_head(wrong_kernel, wrong_bias, self.features[val], self.labels[val])
+
+        kernel, bias, report = train_softmax_head(self.features[train], self.labels[train], 3,
+                                                  init_kernel=wrong_kernel, init_bias=wrong_bias, epochs=200)
+        after = evaluate_head(kernel, bias, self.features[val], self.labels[val])
+        self.assertAlmostEqual(before['accuracy'], 1 / 3)
+        self.assertGreater(after['accuracy'], 0.95)
+        self.assertLess(report['history'][-1]['loss'], report['history'][0]['loss'])
+        self.assertEqual(wrong_bias[0], 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
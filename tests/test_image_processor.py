@@ -0,0 +1,286 @@
+"""
+Tests for the image preprocessing pipeline
+"""
+import io
+import struct
+import sys
+import unittest
+import zlib
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from utils.image_processor import (FarmerFriendlyImageProcessor, BufferReader, ImageQualityError,
+                                   ImageValidationError, VALIDATION_MESSAGES, normalize_pixels)
+
+
+def leaf_photo(size, image_format='JPEG'):
+    """Smooth green gradient photo encoded in memory"""
+    width, height = size
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    pixels = np.stack([60 + 80 * x * y, 120 + 100 * x + 0 * y, 40 + 60 * y + 0 * x], axis=-1)
+    buffer = io.BytesIO()
+    image = Image.fromarray(pixels.astype(np.uint8))
+    if image_format == 'MPO':
+        # Phone-camera layout: main picture plus a small second frame
+        image.save(buffer, format='MPO', save_all=True, append_images=[image.resize((160, 120))])
+    else:
+        image.save(buffer, format=image_format)
+    buffer.seek(0)
+    return buffer
+
+
+def png_header(width, height):
+    """PNG signature + IHDR claiming width x height, followed by an empty IDAT"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', ihdr) + chunk(b'IDAT', b'')
+
+
+class TestFastDecode(unittest.TestCase):
+
+    def setUp(self):
+        self.full = FarmerFriendlyImageProcessor({'IMAGE_FAST_DECODE': False})
+        self.fast = FarmerFriendlyImageProcessor({'IMAGE_FAST_DECODE': True, 'IMAGE_PREDOWNSCALE_MARGIN': 2})
+
+    def test_jpeg_is_draft_decoded_but_not_below_margin(self):
+        image = self.fast._load_and_convert_rgb(leaf_photo((2048, 1536)))
+        self.assertEqual(image.size, (512, 384))
+        self.assertEqual(image.mode, 'RGB')
+
+        image = self.full._load_and_convert_rgb(leaf_photo((2048, 1536)))
+        self.assertEqual(image.size, (2048, 1536))
+
+    def test_mpo_phone_photo_is_draft_decoded(self):
+        photo = leaf_photo((4000, 3000), 'MPO')
+        self.assertEqual(Image.open(photo).format, 'MPO')
+        self.assertEqual(self.fast._load_and_convert_rgb(photo).size, (500, 375))
+
+    def test_png_is_reduced_before_resize(self):
+        image = self.fast._load_and_convert_rgb(leaf_photo((1024, 1024), 'PNG'))
+        self.assertEqual(image.size, (1024, 1024))
+        self.assertEqual(self.fast._reduce(image).size, (256, 256))
+        self.assertEqual(self.fast._reduce(image.resize((300, 300))).size, (300, 300))
+
+    def test_output_matches_full_decode(self):
+        for image_format in ('JPEG', 'PNG'):
+            reference = self.full.process_image_for_prediction(leaf_photo((2048, 1536), image_format))
+            candidate = self.fast.process_image_for_prediction(leaf_photo((2048, 1536), image_format))
+            self.assertEqual(candidate.shape, (1, 128, 128, 3))
+            # Within a few uint8 steps of the full decode
+            self.assertLess(np.abs(reference - candidate).max(), 8 / 127.5)
+
+    def test_small_images_are_untouched(self):
+        reference = self.full.process_image_for_prediction(leaf_photo((200, 150)))
+        candidate = self.fast.process_image_for_prediction(leaf_photo((200, 150)))
+        np.testing.assert_array_equal(reference, candidate)
+
+
+class TestUploadIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FarmerFriendlyImageProcessor({})
+        self.photo = leaf_photo((320, 240), 'PNG').getvalue()
+        self.reference = self.processor.process_image_for_prediction(io.BytesIO(self.photo))
+
+    def test_buffer_reader_reads_and_seeks(self):
+        reader = BufferReader(bytearray(b'0123456789'))
+        self.assertEqual(reader.read(4), b'0123')
+        reader.seek(-2, io.SEEK_END)
+        self.assertEqual(reader.read(), b'89')
+        reader.seek(1)
+        self.assertEqual(reader.tell(), 1)
+
+    def test_bytes_like_uploads(self):
+        body = b'--x\r\n\r\n' + self.photo + b'\r\n--x--'
+        for source in (self.photo, bytearray(self.photo), memoryview(body)[7:7 + len(self.photo)]):
+            np.testing.assert_array_equal(self.processor.process_image_for_prediction(source), self.reference)
+
+    def test_stream_is_decoded_in_place_and_rewound(self):
+        stream = io.BytesIO(self.photo)
+        stream.seek(10)
+        np.testing.assert_array_equal(self.processor.process_image_for_prediction(stream), self.reference)
+        self.assertEqual(stream.tell(), 10)
+
+
+class TestPixelKernel(unittest.TestCase):
+
+    def test_lookup_matches_float_pipeline(self):
+        pixels = np.arange(256, dtype=np.uint8).repeat(3).reshape(16, 16, 3)
+        expected = (np.array(pixels, dtype=np.float32) / 255.0 - 0.5) * 2.0
+        np.testing.assert_array_equal(normalize_pixels(pixels), expected)
+        np.testing.assert_array_equal(normalize_pixels(pixels.astype(np.float64)), expected)
+
+    def test_non_finite_float_input_is_rejected(self):
+        with self.assertRaises(ValueError):
+            normalize_pixels(np.full((2, 2, 3), np.nan))
+
+    def test_result_is_written_into_batch_slot(self):
+        processor = FarmerFriendlyImageProcessor({})
+        reference = processor.process_image_for_prediction(leaf_photo((300, 200)))
+
+        batch = np.zeros((3, 128, 128, 3), dtype=np.float32)
+        result = processor.process_image_for_prediction(leaf_photo((300, 200)), out=batch[1])
+        self.assertTrue(np.shares_memory(result, batch))
+        self.assertEqual(result.shape, (1, 128, 128, 3))
+        np.testing.assert_array_equal(batch[1], reference[0])
+        self.assertFalse(batch[0].any() or batch[2].any())
+
+
+class TestBatchProcessing(unittest.TestCase):
+
+    def test_batch_matches_single_and_reports_failures(self):
+        processor = FarmerFriendlyImageProcessor({'IMAGE_DECODE_WORKERS': 3})
+        sizes = [(300, 200), (640, 480), (128, 128), (1024, 768)]
+        files = [leaf_photo(size) for size in sizes]
+        files.insert(2, io.BytesIO(b'not an image'))
+
+        batch, errors = processor.process_images_for_prediction(files)
+        self.assertEqual(batch.shape, (5, 128, 128, 3))
+        self.assertEqual(batch.dtype, np.float32)
+        self.assertEqual([error is None for error in errors], [True, True, False, True, True])
+        self.assertFalse(batch[2].any())
+
+        for index, size in zip((0, 1, 3, 4), sizes):
+            single = processor.process_image_for_prediction(leaf_photo(size))
+            np.testing.assert_array_equal(batch[index], single[0])
+
+    def test_empty_batch(self):
+        batch, errors = FarmerFriendlyImageProcessor({}).process_images_for_prediction([])
+        self.assertEqual(batch.shape, (0, 128, 128, 3))
+        self.assertEqual(errors, [])
+
+
+@unittest.skipIf(cv2 is None, "opencv-python not installed")
+class TestOpenCVBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.pil = FarmerFriendlyImageProcessor({})
+        self.opencv = FarmerFriendlyImageProcessor({'IMAGE_BACKEND': 'opencv'})
+
+    def test_close_to_pil_pipeline(self):
+        for size, image_format in (((2048, 1536), 'JPEG'), ((300, 200), 'PNG')):
+            reference = self.pil.process_image_for_prediction(leaf_photo(size, image_format))
+            candidate = self.opencv.process_image_for_prediction(leaf_photo(size, image_format))
+            self.assertEqual(candidate.shape, (1, 128, 128, 3))
+            self.assertLess(np.abs(reference - candidate).max(), 4 / 127.5)
+
+    def test_jpeg_reduce_factor_keeps_margin(self):
+        encoded = np.frombuffer(leaf_photo((2048, 1536)).getvalue(), dtype=np.uint8)
+        self.assertEqual(self.opencv._jpeg_reduce_factor(encoded), 4)
+        encoded = np.frombuffer(leaf_photo((2048, 1536), 'MPO').getvalue(), dtype=np.uint8)
+        self.assertEqual(self.opencv._jpeg_reduce_factor(encoded), 4)
+        encoded = np.frombuffer(leaf_photo((2048, 1536), 'PNG').getvalue(), dtype=np.uint8)
+        self.assertEqual(self.opencv._jpeg_reduce_factor(encoded), 1)
+
+    def test_undecodable_input_falls_back_to_pil(self):
+        self.assertIsNone(self.opencv._load_resize_opencv(b'not an image'))
+        self.assertIsNone(self.opencv.process_image_for_prediction(b'not an image'))
+
+
+class TestHeaderValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FarmerFriendlyImageProcessor({'ALLOWED_EXTENSIONS': {'png', 'jpg', 'jpeg'}})
+
+    def assertRejected(self, source, reason):
+        with self.assertRaises(ImageValidationError) as ctx:
+            self.processor.validate_image_header(source)
+        self.assertEqual(ctx.exception.reason, reason)
+        self.assertTrue(ctx.exception.marathi)
+        self.assertEqual(str(ctx.exception), VALIDATION_MESSAGES[reason][0])
+
+    def test_accepts_allowed_formats_and_rewinds(self):
+        stream = leaf_photo((640, 480))
+        self.assertEqual(self.processor.validate_image_header(stream), ('JPEG', (640, 480)))
+        self.assertEqual(stream.tell(), 0)
+        self.assertEqual(self.processor.validate_image_header(png_header(4000, 3000)), ('PNG', (4000, 3000)))
+
+    def test_rejects_formats_outside_allowed_extensions(self):
+        self.assertRejected(leaf_photo((64, 64), 'BMP'), 'unsupported')
+        self.assertRejected(b'<html>not an image</html>', 'unsupported')
+
+    def test_rejects_decompression_bombs_without_decoding(self):
+        self.assertRejected(png_header(10000, 10000), 'too_large')
+        self.assertRejected(png_header(65000, 65000), 'too_large')
+        self.assertRejected(png_header(20000, 100), 'too_large')
+        self.assertIsNone(self.processor.process_image_for_prediction(png_header(10000, 10000)))
+
+    def test_shipped_pixel_limit_stays_below_pil_bomb_limit(self):
+        from config import Config
+        processor = FarmerFriendlyImageProcessor(Config)
+        self.assertLessEqual(processor.max_pixels, Image.MAX_IMAGE_PIXELS)
+        with self.assertRaises(ImageValidationError) as ctx:
+            processor.validate_image_header(png_header(10000, 10000))
+        self.assertEqual(ctx.exception.reason, 'too_large')
+        capped = FarmerFriendlyImageProcessor({'IMAGE_MAX_PIXELS': 500_000_000})
+        self.assertEqual(capped.max_pixels, Image.MAX_IMAGE_PIXELS)
+
+    def test_rejects_tiny_images(self):
+        self.assertRejected(png_header(16, 16), 'too_small')
+
+    def test_prevalidated_header_is_not_parsed_again(self):
+        stream = leaf_photo((640, 480))
+        header = self.processor.validate_image_header(stream)
+        with patch.object(self.processor, 'validate_image_header') as validate:
+            self.assertIsNotNone(self.processor.process_image_for_prediction(stream, header=header))
+        validate.assert_not_called()
+
+
+class TestQualityGate(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = FarmerFriendlyImageProcessor({'IMAGE_QUALITY_CHECK': True})
+        rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:128, 0:128]
+        leaf = np.stack([60 + 40 * np.sin(x / 3), 140 + 50 * np.sin(x / 3 + y / 20), 50 + 0 * x], axis=-1)
+        self.leaf = np.clip(leaf + rng.normal(0, 10, leaf.shape), 0, 255).astype(np.uint8)
+
+    def encoded(self, pixels):
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def test_sharp_leaf_is_usable(self):
+        report = self.processor.assess_quality(self.leaf)
+        self.assertTrue(report['usable'], report)
+        self.assertGreater(report['leaf_ratio'], 0.5)
+
+    def test_flags_dark_overexposed_blurry_and_leafless(self):
+        dark = (self.leaf * 0.1).astype(np.uint8)
+        white = np.full_like(self.leaf, 255)
+        flat = np.full_like(self.leaf, (70, 140, 50))
+        # Brown with the leaf's luma texture on every channel
+        soil = np.clip(self.leaf[..., 1:2].astype(np.int16) - 140 + (140, 100, 60), 0, 255).astype(np.uint8)
+        self.assertEqual(self.processor.assess_quality(dark)['issues'][0], 'too_dark')
+        self.assertEqual(self.processor.assess_quality(white)['issues'][0], 'overexposed')
+        self.assertEqual(self.processor.assess_quality(flat)['issues'], ['blurry'])
+        self.assertEqual(self.processor.assess_quality(soil)['issues'], ['no_leaf'])
+
+    def test_gate_only_applies_when_requested(self):
+        dark = self.encoded((self.leaf * 0.1).astype(np.uint8))
+        self.assertEqual(self.processor.process_image_for_prediction(dark).shape, (1, 128, 128, 3))
+        with self.assertRaises(ImageQualityError) as ctx:
+            self.processor.process_image_for_prediction(dark, check_quality=True)
+        self.assertEqual(ctx.exception.reason, 'too_dark')
+        self.assertTrue(ctx.exception.marathi)
+        self.assertFalse(ctx.exception.report['usable'])
+
+        disabled = FarmerFriendlyImageProcessor({})
+        self.assertIsNotNone(disabled.process_image_for_prediction(dark, check_quality=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the micro-batching inference queue
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.inference_batcher import InferenceBatcher, InferenceQueueFullError
+
+
+def fake_model(batch):
+    """Return one row per sample that encodes the sample's mean pixel"""
+    return np.stack([np.full(3, sample.mean(), dtype=np.float32) for sample in batch])
+
+
+class TestInferenceBatcher(unittest.TestCase):
+
+    def test_concurrent_requests_are_coalesced(self):
+        seen_sizes = []
+
+        def predict_fn(batch):
+            seen_sizes.append(len(batch))
+            return fake_model(batch)
+
+        batcher = InferenceBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+        # Queue everything before the worker starts so it all lands in one window
+        futures = [
+            batcher.submit(np.full((128, 128, 3), float(i), dtype=np.float32))
+            for i in range(8)
+        ]
+        batcher.start()
+        results = {i: future.result(timeout=5) for i, future in enumerate(futures)}
+
+        batcher.stop()
+        for i in range(8):
+            self.assertAlmostEqual(float(results[i][0]), float(i))
+        self.assertEqual(seen_sizes, [8])
+        self.assertEqual(batcher.get_metrics()['requests_total'], 8)
+
+    def test_model_errors_propagate_to_every_request(self):
+        def predict_fn(batch):
+            raise ValueError("boom")
+
+        batcher = InferenceBatcher(predict_fn, max_batch_size=4, max_wait_ms=1)
+        batcher.start()
+        future = batcher.submit(np.zeros((128, 128, 3), dtype=np.float32))
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        batcher.stop()
+
+    def test_full_queue_rejects(self):
+        batcher = InferenceBatcher(fake_model, max_queue_size=1)
+        batcher.submit(np.zeros((128, 128, 3), dtype=np.float32))
+        with self.assertRaises(InferenceQueueFullError):
+            batcher.submit(np.zeros((128, 128, 3), dtype=np.float32))
+        self.assertEqual(batcher.get_metrics()['rejected_total'], 1)
+        batcher.stop()
+
+    def test_multiple_outputs_are_split_per_request(self):
+        def predict_fn(batch):
+            return fake_model(batch), batch.mean(axis=(1, 2))
+
+        batcher = InferenceBatcher(predict_fn, max_batch_size=4, max_wait_ms=20)
+        futures = [batcher.submit(np.full((128, 128, 3), float(i), dtype=np.float32)) for i in range(3)]
+        batcher.start()
+        try:
+            for i, future in enumerate(futures):
+                probabilities, embedding = future.result(timeout=5)
+                self.assertEqual(probabilities[0], float(i))
+                np.testing.assert_array_equal(embedding, [float(i)] * 3)
+        finally:
+            batcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Tests for the shared-memory inference process pool
+"""
+import json
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.inference_backends import InferenceBackend
+from utils.inference_pool import InferencePool, InferencePoolBusyError
+
+
+class MeanPixelBackend(InferenceBackend):
+    """Stand-in engine: each class probability is the sample's mean pixel"""
+    name = 'mean_pixel'
+
+    def predict_batch(self, batch):
+        return np.repeat(batch.mean(axis=(1, 2, 3))[:, None], 3, axis=1).astype(np.float32)
+
+
+def mean_pixel_factory(settings):
+    return MeanPixelBackend()
+
+
+class HangingBackend(MeanPixelBackend):
+    """Batches starting with a pixel above 1 never finish (until the process is killed)"""
+
+    def predict_batch(self, batch):
+        if batch[0, 0, 0, 0] > 1:
+            time.sleep(60)
+        return super().predict_batch(batch)
+
+
+def hanging_factory(settings):
+    return HangingBackend()
+
+
+class StartupPathBackend(MeanPixelBackend):
+    """Reports the model file a loader in the model process would load"""
+
+    def __init__(self, settings):
+        from utils.model_loader import SugarcaneModelLoader
+        loader = SugarcaneModelLoader(settings)
+        self.model_path = str(loader._startup_artifact()[0])
+        self.sync_interval = settings.get('MODEL_VERSION_SYNC_INTERVAL')
+
+    def describe(self):
+        return {'model_path': self.model_path, 'sync_interval': self.sync_interval}
+
+
+class TestInferencePool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = InferencePool({'INFERENCE_TIMEOUT_SECONDS': 10}, num_classes=3, num_workers=2,
+                                 num_slots=4, acquire_timeout=0.05, backend_factory=mean_pixel_factory)
+        cls.pool.start(timeout=60)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.stop()
+
+    def test_batch_round_trip_through_shared_memory(self):
+        batch = np.stack([np.full((128, 128, 3), v, dtype=np.float32) for v in (0.1, 0.5, -0.25)])
+        result = self.pool.predict_batch(batch)
+        np.testing.assert_allclose(result[:, 0], [0.1, 0.5, -0.25], rtol=1e-5)
+        self.assertEqual(self.pool.free_slots, 4)
+
+    def test_batches_larger_than_ring_are_split(self):
+        batch = np.zeros((10, 128, 128, 3), dtype=np.float32)
+        self.assertEqual(self.pool.predict_batch(batch).shape, (10, 3))
+
+    def test_busy_when_all_slots_taken(self):
+        taken = self.pool._acquire_slots(4)
+        try:
+            with self.assertRaises(InferencePoolBusyError):
+                self.pool.predict_batch(np.zeros((1, 128, 128, 3), dtype=np.float32))
+        finally:
+            for slot in taken:
+                self.pool._free_slots.put(slot)
+
+
+class TestInferencePoolRecovery(unittest.TestCase):
+
+    def test_dead_process_fails_requests_frees_slots_and_is_replaced(self):
+        pool = InferencePool({'INFERENCE_TIMEOUT_SECONDS': 30}, num_classes=3, num_workers=1,
+                             num_slots=2, backend_factory=hanging_factory)
+        pool.start(timeout=60)
+        try:
+            with ThreadPoolExecutor(1) as executor:
+                hung = executor.submit(pool.predict_batch, np.full((1, 128, 128, 3), 5, dtype=np.float32))
+                deadline = time.monotonic() + 10
+                while not pool._pending and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                pool._processes[0].kill()
+                with self.assertRaisesRegex(RuntimeError, 'died'):
+                    hung.result(timeout=10)
+            self.assertEqual(pool.free_slots, 2)
+
+            deadline = time.monotonic() + 15
+            while 0 not in pool._ready and time.monotonic() < deadline:
+                time.sleep(0.05)
+            result = pool.predict_batch(np.full((1, 128, 128, 3), 0.5, dtype=np.float32))
+            np.testing.assert_allclose(result[:, 0], [0.5], rtol=1e-5)
+            self.assertEqual(pool.describe()['restarts'], 1)
+        finally:
+            pool.stop()
+
+
+class TestInferencePoolModelPath(unittest.TestCase):
+
+    def test_model_process_loads_parent_path_not_marker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            versions_dir = Path(tmp)
+            for version in ('v2', 'v3'):
+                (versions_dir / version).mkdir()
+                (versions_dir / version / 'Final_Model.keras').write_bytes(b'')
+            (versions_dir / 'active.json').write_text(json.dumps({'id': 'x', 'version': 'v2'}))
+            requested = versions_dir / 'v3' / 'Final_Model.keras'
+
+            pool = InferencePool({'MODEL_VERSIONS_DIR': str(versions_dir), 'INFERENCE_BACKEND': 'keras',
+                                  'MODEL_PATH': str(requested), 'MODEL_VERSION_SYNC_INTERVAL': 5},
+                                 num_classes=3, num_workers=1, num_slots=1, backend_factory=StartupPathBackend)
+            pool.start(timeout=60)
+            try:
+                self.assertEqual(pool._worker_info[0], {'model_path': str(requested), 'sync_interval': 0})
+            finally:
+                pool.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
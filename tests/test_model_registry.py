@@ -0,0 +1,147 @@
+"""
+Tests for the versioned model registry and hot swap
+"""
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.inference_backends import InferenceBackend
+from utils.model_loader import ModelRegistry, ModelVersion, SugarcaneModelLoader, STATE_READY
+
+CLASSES = ['Healthy', 'Mosaic', 'Rust']
+
+
+class FixedBackend(InferenceBackend):
+    """Stand-in engine that always answers with the same probability row"""
+    name = 'fixed'
+
+    def __init__(self, row):
+        self.row = np.asarray(row, dtype=np.float32)
+        self.stopped = False
+
+    def predict_batch(self, batch):
+        return np.tile(self.row, (len(batch), 1))
+
+    def stop(self):
+        self.stopped = True
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def test_activate_swaps_and_retires_old_versions(self):
+        registry = ModelRegistry(max_versions=2)
+        versions = [ModelVersion(f"v{i}", FixedBackend([1, 0, 0])) for i in range(3)]
+        for version in versions:
+            registry.activate(version, retire_after=0)
+
+        self.assertIs(registry.active, versions[2])
+        self.assertEqual([v['version'] for v in registry.list_versions()], ['v1', 'v2'])
+        deadline = time.monotonic() + 2
+        while not versions[0].backend.stopped and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(versions[0].backend.stopped)
+
+
+class TestHotSwap(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        versions_dir = Path(self.tmp.name) / 'versions'
+        for name in ('v1', 'v2'):
+            (versions_dir / name).mkdir(parents=True)
+            (versions_dir / name / 'Final_Model.keras').write_bytes(name.encode())
+
+        self.rows = {'v1': [0.8, 0.1, 0.1], 'v2': [0.1, 0.8, 0.1]}
+        self.loader = self._worker(versions_dir)
+
+    def _worker(self, versions_dir):
+        """One gunicorn worker's loader; workers share MODEL_VERSIONS_DIR"""
+        loader = SugarcaneModelLoader({
+            'MODEL_VERSIONS_DIR': versions_dir,
+            'INFERENCE_BATCHING_ENABLED': False,
+            'SERVING_WARMUP_BATCH_SIZES': [1],
+            'MODEL_VERSION_SYNC_INTERVAL': 0
+        })
+        loader.classes = CLASSES
+        loader._load_backend = lambda path, content=None: (FixedBackend(self.rows[path.parent.name]), None)
+        return loader
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reload_activates_version_and_tags_predictions(self):
+        self.assertTrue(self.loader.reload_model('v1', background=False)['accepted'])
+        self.assertEqual(self.loader.state, STATE_READY)
+        self.assertEqual(self.loader.predict(np.zeros((1, 128, 128, 3), np.float32))['model_version'], 'v1')
+
+        self.loader.reload_model('v2', background=False)
+        result = self.loader.predict(np.zeros((1, 128, 128, 3), np.float32))
+        self.assertEqual(result['model_version'], 'v2')
+        self.assertEqual(result['predicted_class'], 'Mosaic')
+        self.assertEqual(self.loader.reload_status['previous_version'], 'v1')
+        self.assertEqual(self.loader.registry.active.smoke_test['parity_vs_active']['top1_agreement'], 0.0)
+
+    def test_result_computed_across_a_swap_is_not_cached(self):
+        loader, rows = self.loader, self.rows
+
+        class SwapMidRequest(FixedBackend):
+            def predict_batch(self, batch):
+                loader._activate(ModelVersion('v2', FixedBackend(rows['v2'])))
+                return super().predict_batch(batch)
+
+        loader._activate(ModelVersion('v1', SwapMidRequest(rows['v1'])))
+        result = loader.predict(np.zeros((1, 128, 128, 3), np.float32))
+        self.assertEqual(result['model_version'], 'v1')
+        self.assertEqual(loader.model_version, 'v2')
+        self.assertEqual(loader.prediction_cache.get_stats()['entries'], 0)
+
+    def test_failed_smoke_test_keeps_serving_version(self):
+        self.loader.reload_model('v1', background=False)
+        self.rows['v2'] = [0.5, 0.5, 0.5]
+        self.loader.reload_model('v2', background=False)
+
+        self.assertEqual(self.loader.model_version, 'v1')
+        self.assertEqual(self.loader.reload_status['state'], 'failed')
+
+    def test_unknown_version_is_rejected(self):
+        self.assertFalse(self.loader.reload_model('../v1', background=False)['accepted'])
+        self.assertFalse(self.loader.reload_model('missing', background=False)['accepted'])
+
+    def test_reload_reaches_other_workers_through_marker(self):
+        versions_dir = Path(self.tmp.name) / 'versions'
+        other = self._worker(versions_dir)
+        other.reload_model('v1', background=False, publish=False)
+        self.assertFalse(other.sync_active_version())
+
+        self.loader.reload_model('v2', background=False)
+        self.assertTrue(self.loader.reload_status['published'])
+        self.assertFalse(self.loader.sync_active_version())
+
+        self.assertTrue(other.sync_active_version())
+        self.assertEqual(other.model_version, 'v2')
+        self.assertFalse(other.sync_active_version())
+
+        # A worker started after the swap loads the published version
+        fresh = self._worker(versions_dir)
+        fresh._data_loaded = True
+        fresh._validate_components = lambda candidate: True
+        self.assertTrue(fresh._load_components())
+        self.assertEqual(fresh.model_version, 'v2')
+
+    def test_failed_reload_is_not_published(self):
+        self.loader.reload_model('v1', background=False)
+        marker = self.loader._read_marker()
+        self.rows['v2'] = [0.5, 0.5, 0.5]
+        self.loader.reload_model('v2', background=False)
+        self.assertEqual(self.loader._read_marker(), marker)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests for the open-set (non-sugarcane) rejector
+"""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.inference_backends import InferenceBackend
+from utils.model_loader import ModelVersion, SugarcaneModelLoader
+from utils.open_set import OpenSetRejector, calibrate_threshold
+
+
+class EmbeddingBackend(InferenceBackend):
+    """Stand-in engine whose 'embedding' is the per-channel mean"""
+    name = 'embedding'
+    supports_embeddings = True
+
+    def predict_batch(self, batch):
+        return self.predict_with_embeddings(batch)[0]
+
+    def predict_with_embeddings(self, batch):
+        probabilities = np.tile(np.array([0.9, 0.1], dtype=np.float32), (len(batch), 1))
+        return probabilities, batch.mean(axis=(1, 2))
+
+
+class TestOpenSet(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        centers = np.array([[0.0, 1.0, 0.0], [0.3, 1.0, -0.2]], dtype=np.float32)
+        self.labels = np.repeat([0, 1], 50)
+        self.references = centers[self.labels] + rng.normal(0, 0.05, size=(100, 3)).astype(np.float32)
+
+    def test_scores_separate_in_and_out_of_distribution(self):
+        for mode in ('knn', 'centroid'):
+            rejector = OpenSetRejector(self.references, self.labels, 2, threshold=0.9, mode=mode, k=5)
+            scores = rejector.scores(np.array([[0.0, 2.0, 0.0], [1.0, -1.0, 1.0]]))
+            self.assertGreater(scores[0], 0.95)
+            self.assertLess(scores[1], 0.0)
+            self.assertIsNone(rejector.check(np.array([0.0, 2.0, 0.0])))
+            self.assertIsNotNone(rejector.check(np.array([1.0, -1.0, 1.0])))
+            self.assertEqual(rejector.describe()['rejected_total'], 1)
+
+    def test_calibrated_threshold_keeps_references(self):
+        threshold = calibrate_threshold(self.references, self.labels, 2, 'knn', k=5, percentile=5)
+        rejector = OpenSetRejector(self.references, self.labels, 2, threshold=threshold)
+        kept = rejector.scores(self.references) >= threshold
+        self.assertGreaterEqual(kept.mean(), 0.95)
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'index.npz'
+            thresholds = OpenSetRejector.save(path, self.references, self.labels, 2, ['Healthy', 'Rust'], k=3)
+            loaded = OpenSetRejector.from_file(path, 2, mode='centroid')
+            self.assertEqual(loaded.k, 3)
+            self.assertAlmostEqual(loaded.threshold, thresholds['threshold_centroid'])
+            self.assertEqual(OpenSetRejector.from_file(path, 2, threshold=0.5).threshold, 0.5)
+
+    def test_loader_rejects_non_leaf_images_without_caching(self):
+        loader = SugarcaneModelLoader({'FEATURE_STORE_ENABLED': False, 'INFERENCE_BATCHING_ENABLED': False})
+        loader.classes = ['Healthy', 'Rust']
+        loader.registry.activate(ModelVersion('test', EmbeddingBackend()))
+        loader.open_set = OpenSetRejector(self.references, self.labels, 2, threshold=0.9)
+
+        leaf = np.zeros((1, 128, 128, 3), dtype=np.float32)
+        leaf[..., 1] = 0.6
+        self.assertTrue(loader.predict(leaf)['success'])
+
+        other = np.full((1, 128, 128, 3), 0.5, dtype=np.float32)
+        other[..., 1] = -0.5
+        result = loader.predict(other)
+        self.assertFalse(result['success'])
+        self.assertIn('marathi', result['message'])
+        self.assertLess(result['open_set']['score'], 0.9)
+        self.assertEqual(loader.prediction_cache.get_stats()['entries'], 1)
+
+    def test_index_is_only_used_with_the_backbone_it_was_built_with(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            versions_dir = Path(tmp) / 'versions'
+            for name, base in (('v1', None), ('v1-head', 'v1'), ('v2', None)):
+                (versions_dir / name).mkdir(parents=True)
+                (versions_dir / name / 'Final_Model.keras').write_bytes(name.encode())
+                if base is not None:
+                    (versions_dir / name / 'metadata.json').write_text(json.dumps({'base_model_version': base}))
+            index_path = Path(tmp) / 'index.npz'
+            OpenSetRejector.save(index_path, self.references, self.labels, 2, ['Healthy', 'Rust'], model_version='v1')
+
+            loader = SugarcaneModelLoader({'MODEL_VERSIONS_DIR': versions_dir, 'OPEN_SET_ENABLED': True,
+                                           'OPEN_SET_INDEX_PATH': index_path, 'FEATURE_STORE_ENABLED': False,
+                                           'INFERENCE_BATCHING_ENABLED': False, 'SERVING_WARMUP_BATCH_SIZES': [1]})
+            loader.classes = ['Healthy', 'Rust']
+            loader._load_backend = lambda path, content=None: (EmbeddingBackend(), None)
+            self.assertIsNone(loader._load_open_set(ModelVersion('v2', EmbeddingBackend())))
+
+            loader.reload_model('v1', background=False, publish=False)
+            self.assertEqual(loader.open_set.describe()['model_version'], 'v1')
+            loader.reload_model('v1-head', background=False, publish=False)
+            self.assertIsNotNone(loader.open_set)
+            loader.reload_model('v2', background=False, publish=False)
+            self.assertEqual(loader.model_version, 'v2')
+            self.assertIsNone(loader.open_set)
+
+
+if __name__ == '__main__':
+    unittest.main()
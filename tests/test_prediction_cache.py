@@ -0,0 +1,73 @@
+"""
+Tests for the content-addressed prediction cache
+"""
+import io
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.prediction_cache import PredictionCache, hash_upload, hash_tensor
+
+RESULT = {'success': True, 'predicted_class': 'Healthy', 'confidence': 0.93}
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def test_upload_hash_rewinds_stream(self):
+        stream = io.BytesIO(b'jpeg bytes')
+        key = hash_upload(stream)
+        self.assertEqual(stream.tell(), 0)
+        self.assertEqual(key, hash_upload(b'jpeg bytes'))
+
+    def test_tensor_hash_ignores_float_noise(self):
+        pixels = np.random.default_rng(0).integers(0, 256, (1, 128, 128, 3))
+        image = (pixels / 127.5 - 1.0).astype(np.float32)
+        self.assertEqual(hash_tensor(image), hash_tensor(image + 1e-5))
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_entries=2)
+        cache.put('raw:a', RESULT)
+        cache.put('raw:b', RESULT)
+        cache.get('raw:a')
+        cache.put('raw:c', RESULT)
+        self.assertIsNone(cache.get('raw:b'))
+        self.assertTrue(cache.get('raw:a')['cached'])
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        cache = PredictionCache(ttl_seconds=10)
+        with mock.patch('utils.prediction_cache.time.monotonic', return_value=100.0):
+            cache.put('raw:a', RESULT)
+        with mock.patch('utils.prediction_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('raw:a'))
+        self.assertEqual(cache.get_stats()['expirations'], 1)
+
+    def test_model_version_change_invalidates(self):
+        cache = PredictionCache()
+        cache.set_model_version('v1')
+        cache.put('tensor:x', RESULT)
+        cache.set_model_version('v2')
+        self.assertIsNone(cache.get('tensor:x'))
+
+    def test_results_of_swapped_out_model_are_not_cached(self):
+        cache = PredictionCache()
+        cache.set_model_version('v2')
+        cache.put('raw:a', dict(RESULT, model_version='v1'))
+        self.assertIsNone(cache.get('raw:a'))
+        cache.put('raw:a', dict(RESULT, model_version='v2'))
+        self.assertIsNotNone(cache.get('raw:a'))
+
+    def test_failures_are_not_cached(self):
+        cache = PredictionCache()
+        cache.put('raw:a', {'success': False, 'error': 'boom'})
+        self.assertIsNone(cache.get('raw:a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
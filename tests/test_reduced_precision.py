@@ -0,0 +1,46 @@
+"""
+Tests for reduced-precision model config rewriting
+"""
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.reduced_precision import apply_dtype_policy
+
+
+def policy(name):
+    return {'module': 'keras', 'class_name': 'DTypePolicy', 'config': {'name': name}}
+
+
+class TestApplyDtypePolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {'name': 'sequential', 'layers': [
+            {'class_name': 'InputLayer', 'config': {'dtype': 'float32'}},
+            {'class_name': 'Functional', 'config': {'name': 'mobilenetv2', 'layers': [
+                {'class_name': 'Conv2D', 'config': {'dtype': 'float32'}},
+                {'class_name': 'BatchNormalization', 'config': {'dtype': policy('float32')}}
+            ]}},
+            {'class_name': 'GlobalAveragePooling2D', 'config': {'dtype': policy('float32')}},
+            {'class_name': 'Dense', 'config': {'dtype': 'float32', 'activation': 'softmax'}}
+        ]}
+
+    def test_nested_layers_get_policy_and_head_stays_float32(self):
+        layers = apply_dtype_policy(self.config, 'float16')['layers']
+        self.assertEqual(layers[0]['config']['dtype'], 'float32')
+        nested = layers[1]['config']['layers']
+        self.assertEqual(nested[0]['config']['dtype'], 'float16')
+        self.assertEqual(nested[1]['config']['dtype']['config']['name'], 'float16')
+        self.assertEqual(layers[2]['config']['dtype']['config']['name'], 'float16')
+        self.assertEqual(layers[3]['config']['dtype'], 'float32')
+
+    def test_original_config_is_untouched(self):
+        apply_dtype_policy(self.config, 'bfloat16', keep_output_float32=False)
+        self.assertEqual(self.config['layers'][1]['config']['layers'][0]['config']['dtype'], 'float32')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for adaptive test-time augmentation
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.inference_backends import InferenceBackend
+from utils.model_loader import ModelVersion, SugarcaneModelLoader
+from utils.tta import build_tta_batch
+
+
+class LeftBrightBackend(InferenceBackend):
+    """Class 0 probability is the brightness of the left half relative to the whole image"""
+    name = 'left_bright'
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, batch):
+        self.batch_sizes.append(len(batch))
+        left = batch[:, :, :64].mean(axis=(1, 2, 3)) + 1
+        total = left + batch[:, :, 64:].mean(axis=(1, 2, 3)) + 1
+        p = left / total
+        return np.stack([p, 1 - p], axis=1).astype(np.float32)
+
+
+class TestTTA(unittest.TestCase):
+
+    def test_augmented_views(self):
+        image = np.random.default_rng(0).uniform(-1, 1, (128, 128, 3)).astype(np.float32)
+        batch = build_tta_batch(image)
+        self.assertEqual(batch.shape, (8, 128, 128, 3))
+        np.testing.assert_array_equal(batch[0], image[:, ::-1])
+        np.testing.assert_array_equal(batch[2], np.rot90(image))
+        np.testing.assert_array_equal(batch[4][0, 0], image[0, 0])
+        np.testing.assert_array_equal(batch[7][-1, -1], image[-1, -1])
+
+    def _loader(self, threshold):
+        loader = SugarcaneModelLoader({'INFERENCE_BATCHING_ENABLED': False, 'PREDICTION_CACHE_ENABLED': False,
+                                       'TTA_CONFIDENCE_THRESHOLD': threshold})
+        loader.classes = ['Healthy', 'Rust']
+        backend = LeftBrightBackend()
+        loader.registry.activate(ModelVersion('test', backend))
+        return loader, backend
+
+    def test_only_low_confidence_is_escalated_in_one_batch(self):
+        image = np.full((1, 128, 128, 3), -0.5, dtype=np.float32)
+        image[:, :, :64] = 0.5
+
+        loader, backend = self._loader(threshold=0.5)
+        self.assertFalse(loader.predict(image)['tta'])
+        self.assertEqual(backend.batch_sizes, [1])
+
+        loader, backend = self._loader(threshold=0.99)
+        result = loader.predict(image)
+        self.assertTrue(result['tta'])
+        self.assertEqual(backend.batch_sizes, [1, 8])
+        self.assertLess(result['confidence'], result['single_pass_confidence'])
+        stats = loader.get_inference_stats()['tta']
+        self.assertEqual(stats['escalated_fraction'], 1.0)
+        self.assertGreater(stats['added_ms_p95'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Two-Stage Cascade
+A tiny healthy/diseased gate in front of the full classifier: logistic
+regression on ~15 colour and texture statistics of a 32x32 subsample of the
+preprocessed image (well under a millisecond in NumPy). When the gate says
+Healthy with probability above the threshold, the request is answered
+without running the CNN; everything else goes to the full classifier.
+
+The gate is an .npz trained by scripts/train_healthy_gate.py.
+"""
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GATE_STRIDE = 4  # 128x128 -> 32x32
+
+FEATURE_NAMES = (
+    'mean_r', 'mean_g', 'mean_b', 'std_r', 'std_g', 'std_b',
+    'excess_green_mean', 'excess_green_std', 'green_dominant', 'red_dominant',
+    'dark', 'bright', 'yellowish', 'gradient_x', 'gradient_y'
+)
+
+
+def gate_features(images: np.ndarray) -> np.ndarray:
+    """(N, 128, 128, 3) or (128, 128, 3) images in [-1, 1] -> (N, len(FEATURE_NAMES)) features"""
+    images = np.asarray(images, dtype=np.float32)
+    if images.ndim == 3:
+        images = images[None]
+    rgb = (images[:, ::GATE_STRIDE, ::GATE_STRIDE] + 1.0) * 0.5
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    excess_green = 2 * g - r - b
+    gray = rgb.mean(axis=-1)
+    pixel_axes = (1, 2)
+
+    return np.column_stack([
+        rgb.mean(axis=pixel_axes),
+        rgb.std(axis=pixel_axes),
+        excess_green.mean(axis=pixel_axes),
+        excess_green.std(axis=pixel_axes),
+        ((g > r) & (g > b)).mean(axis=pixel_axes),
+        (r > g).mean(axis=pixel_axes),
+        (rgb.max(axis=-1) < 0.2).mean(axis=pixel_axes),
+        (rgb.min(axis=-1) > 0.85).mean(axis=pixel_axes),
+        ((r > 0.5) & (g > 0.5) & (b < 0.35)).mean(axis=pixel_axes),
+        np.abs(np.diff(gray, axis=2)).mean(axis=pixel_axes),
+        np.abs(np.diff(gray, axis=1)).mean(axis=pixel_axes),
+    ]).astype(np.float32)
+
+
+def _sigmoid(logits: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(logits, -30, 30)))
+
+
+class HealthyGate:
+    """Logistic regression P(Healthy) on standardized gate features"""
+
+    def __init__(self, weights: np.ndarray, bias: float, mean: np.ndarray, scale: np.ndarray,
+                 threshold: float = 0.95):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.threshold = float(threshold)
+
+    @classmethod
+    def train(cls, features: np.ndarray, is_healthy: np.ndarray, epochs: int = 500,
+              learning_rate: float = 0.5, l2: float = 1e-3) -> 'HealthyGate':
+        """Full-batch gradient descent on class-balanced log loss"""
+        features = np.asarray(features, dtype=np.float32)
+        targets = np.asarray(is_healthy, dtype=np.float32)
+        mean = features.mean(axis=0)
+        scale = np.maximum(features.std(axis=0), 1e-6)
+        x = (features - mean) / scale
+
+        positives = max(targets.sum(), 1.0)
+        negatives = max(len(targets) - targets.sum(), 1.0)
+        sample_weights = np.where(targets > 0, 0.5 / positives, 0.5 / negatives)
+
+        weights = np.zeros(x.shape[1], dtype=np.float32)
+        bias = 0.0
+        for _ in range(epochs):
+            error = (_sigmoid(x @ weights + bias) - targets) * sample_weights
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * float(error.sum())
+        return cls(weights, bias, mean, scale)
+
+    @classmethod
+    def from_file(cls, path, threshold: float = None) -> 'HealthyGate':
+        with np.load(path, allow_pickle=False) as data:
+            gate = cls(data['weights'], float(data['bias']), data['mean'], data['scale'],
+                       threshold=threshold if threshold is not None else float(data['threshold']))
+        logger.info(f"Healthy gate loaded, threshold {gate.threshold:.3f}")
+        return gate
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, weights=self.weights, bias=self.bias, mean=self.mean, scale=self.scale,
+                 threshold=self.threshold, feature_names=np.array(FEATURE_NAMES))
+
+    def probability_healthy(self, images: np.ndarray) -> np.ndarray:
+        x = (gate_features(images) - self.mean) / self.scale
+        return _sigmoid(x @ self.weights + self.bias)
+
+
+def choose_threshold(probabilities: np.ndarray, is_healthy: np.ndarray,
+                     max_false_healthy: float = 0.01) -> float:
+    """
+    Lowest threshold at which at most max_false_healthy of the diseased
+    images would be short-circuited as Healthy
+    """
+    diseased = np.sort(np.asarray(probabilities)[~np.asarray(is_healthy, dtype=bool)])
+    if len(diseased) == 0:
+        return 0.5
+    allowed = int(np.floor(max_false_healthy * len(diseased)))
+    # Strictly above the (allowed+1)-th highest diseased score
+    return float(np.nextafter(diseased[len(diseased) - allowed - 1], np.float32(1.0)))
+
+
+class CascadeStats:
+    """Short-circuit fraction and per-stage latency of the cascade"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._gate_ms = deque(maxlen=window)
+        self._full_ms = deque(maxlen=window)
+        self.requests_total = 0
+        self.short_circuited_total = 0
+
+    def record(self, gate_ms: float, full_ms: Optional[float] = None):
+        with self._lock:
+            self.requests_total += 1
+            self._gate_ms.append(gate_ms)
+            if full_ms is None:
+                self.short_circuited_total += 1
+            else:
+                self._full_ms.append(full_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            gate = np.array(self._gate_ms) if self._gate_ms else None
+            full = np.array(self._full_ms) if self._full_ms else None
+            total, short = self.requests_total, self.short_circuited_total
+        return {
+            'requests_total': total,
+            'short_circuited_total': short,
+            'short_circuited_fraction': (short / total) if total else 0.0,
+            'gate_ms_mean': float(gate.mean()) if gate is not None else 0.0,
+            'gate_ms_p95': float(np.percentile(gate, 95)) if gate is not None else 0.0,
+            'full_ms_mean': float(full.mean()) if full is not None else 0.0,
+            'full_ms_p95': float(np.percentile(full, 95)) if full is not None else 0.0
+        }
@@ -0,0 +1,85 @@
+"""
+CPU Thread Budget
+Works out how many cores this container may really use (cgroup v2 cpu.max,
+cgroup v1 CFS quota, CPU affinity) and splits them across model processes,
+so N gunicorn workers do not each start a TensorFlow pool sized for the
+whole host.
+"""
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+_tf_threads_configured = None
+
+
+def _cgroup_cpu_limit(cgroup_root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPU quota in cores, or None when unlimited / not in a cgroup"""
+    try:
+        cpu_max = cgroup_root / 'cpu.max'
+        if cpu_max.exists():
+            quota, period = cpu_max.read_text().split()[:2]
+            if quota != 'max':
+                return int(quota) / int(period)
+            return None
+
+        quota_file = cgroup_root / 'cpu' / 'cpu.cfs_quota_us'
+        period_file = cgroup_root / 'cpu' / 'cpu.cfs_period_us'
+        if quota_file.exists() and period_file.exists():
+            quota = int(quota_file.read_text())
+            if quota > 0:
+                return quota / int(period_file.read_text())
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not read cgroup CPU limit: {e}")
+    return None
+
+
+def available_cpus(cgroup_root: Path = CGROUP_ROOT) -> int:
+    """Cores usable by this process: affinity mask capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    limit = _cgroup_cpu_limit(cgroup_root)
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+
+def resolve_threads(value, processes: int = 1, cpus: int = None) -> int:
+    """
+    Thread setting from config: an integer, or 'auto' = available cores
+    divided by the number of model processes sharing them (at least 1)
+    """
+    if isinstance(value, str) and value.strip().lower() == 'auto':
+        cpus = cpus if cpus is not None else available_cpus()
+        return max(1, cpus // max(1, int(processes)))
+    return max(1, int(value))
+
+
+def configure_tensorflow_threads(intra_op: int, inter_op: int) -> bool:
+    """
+    Set TensorFlow's intra/inter-op pools. Must run before TF executes its
+    first op in this process; later calls are ignored with a warning.
+    """
+    global _tf_threads_configured
+    if _tf_threads_configured == (intra_op, inter_op):
+        return True
+
+    import tensorflow as tf
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        logger.warning(f"TensorFlow thread pools already initialized, keeping existing sizes: {e}")
+        return False
+
+    _tf_threads_configured = (intra_op, inter_op)
+    logger.info(f"TensorFlow threads: intra-op {intra_op}, inter-op {inter_op}")
+    return True
@@ -104,7 +104,7 @@ class AdvancedDiseaseAnalyzer:
     def perform_ai_prediction(self, processed_image: np.ndarray) -> Dict[str, Any]:
         """Perform AI prediction using the CORRECTED model"""
         try:
-            if self.model_loader is None or self.model_loader.model is None:
+            if self.model_loader is None or self.model_loader.backend is None:
                 raise ValueError("Model not loaded")
                 
             # Validate input shape for 128x128 model
@@ -113,7 +113,7 @@ class AdvancedDiseaseAnalyzer:
                 raise ValueError(f"Invalid input shape: {processed_image.shape}, expected: {expected_shape}")
             
             # Make prediction
-            predictions = self.model_loader.model.predict(processed_image, verbose=0)[0]
+            predictions = self.model_loader.predict_probabilities(processed_image)[0]
             
             # Get predicted class
             predicted_class_idx = np.argmax(predictions)
@@ -0,0 +1,233 @@
+"""
+Embedding Feature Store
+Append-only on-disk store of pooled backbone embeddings: a memory-mapped
+float16 matrix (embeddings.f16) plus a JSON-lines index (index.jsonl, one
+line per row: content key, model version, prediction). Rows are keyed by
+the preprocessed-tensor hash, so the same image is stored once.
+
+Several gunicorn workers may append to the same directory: appends take an
+exclusive flock and first pick up rows other processes added. The store
+stops accepting rows at max_rows; only the row count and the key -> row
+map are held in memory, records are streamed from the index on demand.
+Request threads hand embeddings to a FeatureStoreWriter, which appends on
+a background thread so the flock and fsync stay off the request path.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MATRIX_FILE = 'embeddings.f16'
+INDEX_FILE = 'index.jsonl'
+META_FILE = 'meta.json'
+INITIAL_CAPACITY = 1024
+
+
+class FeatureStore:
+    """Memory-mapped float16 embedding matrix with a JSON-lines row index"""
+
+    def __init__(self, directory, dim: int = None, max_rows: int = None):
+        self.directory = Path(directory)
+        self.max_rows = max_rows
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.matrix_path = self.directory / MATRIX_FILE
+        self.index_path = self.directory / INDEX_FILE
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._capacity = 0
+        self._index_offset = 0
+        self._rows = 0
+        self._rows_by_key = {}
+        self._full_logged = False
+
+        meta_path = self.directory / META_FILE
+        if meta_path.exists():
+            self.dim = json.loads(meta_path.read_text())['dim']
+            if dim is not None and dim != self.dim:
+                raise ValueError(f"Feature store at {directory} holds dim {self.dim}, got {dim}")
+        elif dim is not None:
+            self.dim = int(dim)
+            meta_path.write_text(json.dumps({'dim': self.dim, 'dtype': 'float16'}))
+        else:
+            raise ValueError(f"Empty feature store at {directory} needs an embedding dim")
+
+        self.index_path.touch(exist_ok=True)
+        self._sync()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _sync(self):
+        """Read index lines appended since the last sync (possibly by other processes)"""
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partially written line: picked up next time
+                self._index_offset += len(line)
+                record = json.loads(line)
+                if record.get('key') is not None:
+                    self._rows_by_key.setdefault(record['key'], record['row'])
+                self._rows += 1
+        self._map(max(self._rows, 1))
+
+    def _map(self, rows_needed: int):
+        """(Re)map the matrix file, growing it by doubling when needed"""
+        row_bytes = self.dim * 2
+        file_rows = self.matrix_path.stat().st_size // row_bytes if self.matrix_path.exists() else 0
+        capacity = max(file_rows, INITIAL_CAPACITY)
+        while capacity < rows_needed:
+            capacity *= 2
+        if capacity > file_rows:
+            with open(self.matrix_path, 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        if capacity != self._capacity or self._matrix is None:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float16, mode='r+', shape=(capacity, self.dim))
+            self._capacity = capacity
+
+    def append(self, embedding: np.ndarray, key: str = None, metadata: Dict[str, Any] = None) -> Optional[int]:
+        """Store one embedding; returns its row (the existing row if key is already stored),
+        None once the store holds max_rows"""
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if embedding.shape[0] != self.dim:
+            raise ValueError(f"Embedding dim {embedding.shape[0]} != store dim {self.dim}")
+
+        with self._lock, open(self.index_path, 'ab') as index_file:
+            if fcntl is not None:
+                fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                self._sync()
+                if key is not None and key in self._rows_by_key:
+                    return self._rows_by_key[key]
+
+                row = self._rows
+                if self.max_rows is not None and row >= self.max_rows:
+                    if not self._full_logged:
+                        logger.warning(f"Feature store {self.directory} is full ({row} rows); not storing more")
+                        self._full_logged = True
+                    return None
+                self._map(row + 1)
+                self._matrix[row] = embedding.astype(np.float16)
+                self._matrix.flush()
+
+                record = dict(metadata or {}, row=row, key=key, stored_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+                line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+                index_file.write(line)
+                index_file.flush()
+                os.fsync(index_file.fileno())
+
+                self._index_offset += len(line)
+                self._rows += 1
+                if key is not None:
+                    self._rows_by_key[key] = row
+                return row
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(index_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Pick up rows appended by other processes"""
+        with self._lock:
+            self._sync()
+
+    def row_for_key(self, key: str) -> Optional[int]:
+        return self._rows_by_key.get(key)
+
+    def embeddings(self) -> np.ndarray:
+        """Read-only (rows, dim) float16 view of all stored embeddings"""
+        view = self._matrix[:self._rows]
+        view.flags.writeable = False
+        return view
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Stream the index records of the rows synced so far, in row order"""
+        with open(self.index_path, 'rb') as f:
+            for _, line in zip(range(self._rows), f):
+                yield json.loads(line)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'directory': str(self.directory),
+            'rows': self._rows,
+            'max_rows': self.max_rows,
+            'dim': self.dim,
+            'capacity': self._capacity,
+            'size_mb': round(self._capacity * self.dim * 2 / 1e6, 2)
+        }
+
+
+class FeatureStoreWriter:
+    """Appends embeddings to a FeatureStore from a background thread.
+
+    The store is opened lazily with the first embedding's dim. submit() never
+    blocks: when the queue is full the embedding is dropped and counted.
+    """
+
+    def __init__(self, directory, max_rows: int = None, queue_size: int = 256):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.store = None
+        self.failed = False
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, embedding: np.ndarray, key: str = None, metadata: Dict[str, Any] = None) -> bool:
+        """Queue one embedding for storage; False if it was dropped"""
+        if self.failed:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((np.array(embedding, dtype=np.float32), key, metadata))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='feature-store-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            embedding, key, metadata = self._queue.get()
+            try:
+                if not self.failed:
+                    self._append(embedding, key, metadata)
+            finally:
+                self._queue.task_done()
+
+    def _append(self, embedding, key, metadata):
+        try:
+            if self.store is None:
+                self.store = FeatureStore(self.directory, dim=len(embedding), max_rows=self.max_rows)
+            self.store.append(embedding, key=key, metadata=metadata)
+        except Exception as e:
+            logger.warning(f"Feature store disabled: {e}")
+            self.failed = True
+
+    def flush(self):
+        """Block until every queued embedding has been written"""
+        self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.store.get_stats() if self.store else {'directory': str(self.directory)},
+                    queued=self._queue.qsize(), dropped=self.dropped, failed=self.failed)
@@ -0,0 +1,143 @@
+"""
+Inference-Only Model Artifact
+Freezes the Keras model into a constant-folded GraphDef (no optimizer state,
+no training-only ops, variables baked in as constants) and writes a JSON
+manifest next to it with the tensor names, class list and SHA-256 checksums
+(of the artifact and of the source .keras) the loader verifies before using
+the fast path.
+"""
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.inference_backends import INPUT_SHAPE, build_dual_output_model, frozen_model_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 'frozen_graph_v1'
+
+# Grappler passes applied after freezing (same family TF's own converters run)
+GRAPH_OPTIMIZERS = ('constfold', 'arithmetic', 'dependency', 'pruning')
+
+
+def manifest_path(model_path) -> Path:
+    return Path(model_path).with_suffix('.json')
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _optimize_graph(graph_def, frozen_fn):
+    """Constant-fold and prune the frozen graph with grappler"""
+    import tensorflow as tf
+    from tensorflow.core.protobuf import config_pb2, meta_graph_pb2
+    from tensorflow.python.grappler import tf_optimizer
+
+    meta_graph = tf.compat.v1.train.export_meta_graph(graph_def=graph_def, graph=frozen_fn.graph)
+    fetches = meta_graph_pb2.CollectionDef()
+    for tensor in frozen_fn.inputs + frozen_fn.outputs:
+        fetches.node_list.value.append(tensor.name)
+    meta_graph.collection_def['train_op'].CopyFrom(fetches)
+
+    config = config_pb2.ConfigProto()
+    rewrite_options = config.graph_options.rewrite_options
+    rewrite_options.optimizers.extend(GRAPH_OPTIMIZERS)
+    return tf_optimizer.OptimizeGraph(config, meta_graph)
+
+
+def freeze_model(model) -> Tuple[Any, str, str, Optional[str]]:
+    """Keras model -> (GraphDef, input name, probabilities output name, embedding output name or None)"""
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    serving_model = build_dual_output_model(model) or model
+
+    @tf.function(input_signature=[tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name='images')])
+    def serve(images):
+        return serving_model(images, training=False)
+
+    frozen_fn = convert_variables_to_constants_v2(serve.get_concrete_function())
+    graph_def = frozen_fn.graph.as_graph_def()
+    nodes_before = len(graph_def.node)
+    try:
+        graph_def = _optimize_graph(graph_def, frozen_fn)
+    except Exception as e:
+        logger.warning(f"Graph optimization skipped, keeping plain frozen graph: {e}")
+    logger.info(f"Frozen graph: {nodes_before} -> {len(graph_def.node)} nodes")
+    embedding_name = frozen_fn.outputs[1].name if len(frozen_fn.outputs) > 1 else None
+    return graph_def, frozen_fn.inputs[0].name, frozen_fn.outputs[0].name, embedding_name
+
+
+def write_frozen_artifact(model, output_dir, classes: List[str], source_model=None) -> Tuple[Path, Dict[str, Any]]:
+    """Freeze model into output_dir/Final_Model_frozen.pb + .json manifest"""
+    import tensorflow as tf
+
+    graph_def, input_name, output_name, embedding_name = freeze_model(model)
+    data = graph_def.SerializeToString()
+    model_path = frozen_model_path(output_dir)
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    model_path.write_bytes(data)
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'input': input_name,
+        'output': output_name,
+        'embedding_output': embedding_name,
+        'input_shape': [None] + list(INPUT_SHAPE),
+        'classes': list(classes),
+        'sha256': sha256_bytes(data),
+        'size_bytes': len(data),
+        'source_model': Path(source_model).name if source_model else None,
+        'source_sha256': sha256_file(source_model) if source_model else None,
+        'tensorflow_version': tf.__version__,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    manifest_path(model_path).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+    return model_path, manifest
+
+
+def read_manifest(model_path) -> Optional[Dict[str, Any]]:
+    """Manifest for a frozen artifact, or None when missing / unreadable"""
+    path = manifest_path(model_path)
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == MANIFEST_FORMAT else None
+
+
+def validate_artifact(data: bytes, manifest: Dict[str, Any], classes: List[str]) -> Optional[str]:
+    """Reason the artifact must not be used, or None when it checks out"""
+    if sha256_bytes(data) != manifest.get('sha256'):
+        return 'checksum mismatch'
+    if list(manifest.get('classes', [])) != list(classes):
+        return 'class list differs from class_mapping.json'
+    return None
+
+
+def stale_reason(manifest: Dict[str, Any], source_model) -> Optional[str]:
+    """
+    Why the artifact no longer matches the .keras it was exported from
+    (retrained / replaced model), or None. No source file: nothing to compare.
+    """
+    source_model = Path(source_model)
+    if not source_model.exists():
+        return None
+    expected = manifest.get('source_sha256')
+    if not expected:
+        return 'manifest has no source checksum (exported by an older export_frozen.py)'
+    if sha256_file(source_model) != expected:
+        return f'{source_model.name} changed since export'
+    return None
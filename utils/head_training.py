@@ -0,0 +1,99 @@
+"""
+Head-Only Retraining
+Softmax-regression training of the final Dense layer on cached pooled
+embeddings (see utils/feature_store.py). Full-batch Adam in NumPy: with
+1280-dim features and a few thousand samples this runs in seconds on CPU,
+since the backbone is never executed.
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def stratified_split(labels: np.ndarray, val_fraction: float = 0.2,
+                     seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Train / validation index arrays with every class represented in both when possible"""
+    rng = np.random.default_rng(seed)
+    train, val = [], []
+    for label in np.unique(labels):
+        idx = rng.permutation(np.flatnonzero(labels == label))
+        n_val = int(round(len(idx) * val_fraction)) if len(idx) > 1 else 0
+        val.extend(idx[:n_val])
+        train.extend(idx[n_val:])
+    return np.array(sorted(train), dtype=int), np.array(sorted(val), dtype=int)
+
+
+def evaluate_head(kernel: np.ndarray, bias: np.ndarray, features: np.ndarray,
+                  labels: np.ndarray) -> Dict[str, Any]:
+    """Accuracy, cross-entropy and per-class accuracy of a head on labeled features"""
+    if len(labels) == 0:
+        return {'samples': 0, 'accuracy': None, 'loss': None, 'per_class_accuracy': {}}
+    probabilities = softmax(features @ kernel + bias)
+    predicted = probabilities.argmax(axis=1)
+    loss = -np.mean(np.log(probabilities[np.arange(len(labels)), labels] + 1e-12))
+    return {
+        'samples': int(len(labels)),
+        'accuracy': float(np.mean(predicted == labels)),
+        'loss': float(loss),
+        'per_class_accuracy': {
+            int(c): float(np.mean(predicted[labels == c] == c)) for c in np.unique(labels)
+        }
+    }
+
+
+def train_softmax_head(features: np.ndarray, labels: np.ndarray, num_classes: int,
+                       init_kernel: Optional[np.ndarray] = None, init_bias: Optional[np.ndarray] = None,
+                       epochs: int = 300, learning_rate: float = 0.01, l2: float = 1e-4,
+                       class_weighted: bool = True) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Fit kernel (dim, classes) and bias (classes,) by full-batch Adam on the
+    L2-regularized cross-entropy. Warm-starting from the current head keeps
+    the new version close to the serving one when corrections are few.
+    """
+    features = np.asarray(features, dtype=np.float32)
+    labels = np.asarray(labels, dtype=int)
+    dim = features.shape[1]
+
+    kernel = (np.array(init_kernel, dtype=np.float32) if init_kernel is not None
+              else np.zeros((dim, num_classes), dtype=np.float32))
+    bias = (np.array(init_bias, dtype=np.float32) if init_bias is not None
+            else np.zeros(num_classes, dtype=np.float32))
+
+    one_hot = np.eye(num_classes, dtype=np.float32)[labels]
+    if class_weighted:
+        counts = np.bincount(labels, minlength=num_classes).astype(np.float32)
+        weights = (len(labels) / (num_classes * np.maximum(counts, 1)))[labels][:, None]
+    else:
+        weights = np.ones((len(labels), 1), dtype=np.float32)
+    weights /= weights.sum()
+
+    moments = [np.zeros_like(kernel), np.zeros_like(bias)]
+    velocities = [np.zeros_like(kernel), np.zeros_like(bias)]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    history = []
+
+    for step in range(1, epochs + 1):
+        probabilities = softmax(features @ kernel + bias)
+        error = (probabilities - one_hot) * weights
+        grads = [features.T @ error + l2 * kernel, error.sum(axis=0)]
+        for param, grad, m, v in zip((kernel, bias), grads, moments, velocities):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+        if step % 50 == 0 or step == epochs:
+            loss = -np.sum(weights[:, 0] * np.log(probabilities[np.arange(len(labels)), labels] + 1e-12))
+            history.append({'epoch': step, 'loss': float(loss)})
+
+    logger.info(f"Head trained: {epochs} epochs, final loss {history[-1]['loss']:.4f}")
+    return kernel, bias, {'history': history, 'epochs': epochs, 'learning_rate': learning_rate, 'l2': l2}
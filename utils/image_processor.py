@@ -1,9 +1,14 @@
 """
 Image Processor for Sugarcane Disease Detection
 MATCHES Streamlit preprocessing: RGB → 128x128 → normalize [0,1] → scale [-1,1]
+(the two normalization steps are fused into one uint8 lookup table)
 Based on MobileNetV2 preprocessing requirements
 """
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
 import numpy as np
 from PIL import Image
 import io
@@ -14,6 +19,114 @@ logger = logging.getLogger(__name__)
 # Constants
 IMG_SIZE = 128
 
+# uint8 level → MobileNetV2 input, same float32 ops as x / 255.0 then (x - 0.5) * 2.0
+PIXEL_LUT = (np.arange(256, dtype=np.float32) / 255.0 - 0.5) * 2.0
+
+
+def normalize_pixels(pixels, out=None):
+    """
+    RGB pixels → float32 [-1, 1], written into `out` when given.
+    uint8 input is a single table lookup and cannot produce NaN/inf;
+    other dtypes take the arithmetic path and are checked.
+    """
+    pixels = np.asarray(pixels)
+    if pixels.dtype == np.uint8:
+        # mode='clip' writes straight into out (mode='raise' buffers it)
+        return np.take(PIXEL_LUT, pixels, out=out, mode='clip')
+
+    result = (pixels.astype(np.float32) / 255.0 - 0.5) * 2.0
+    if not np.isfinite(result).all():
+        raise ValueError("Image contains NaN or infinite values")
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+# PIL format → extension as listed in Config.ALLOWED_EXTENSIONS (MPO: multi-picture phone JPEGs)
+FORMAT_EXTENSIONS = {'JPEG': 'jpeg', 'MPO': 'jpeg', 'PNG': 'png', 'BMP': 'bmp', 'GIF': 'gif',
+                     'WEBP': 'webp', 'TIFF': 'tiff'}
+# Formats decoded by libjpeg, so draft mode / reduced DCT decode applies
+JPEG_FORMATS = ('JPEG', 'MPO')
+
+VALIDATION_MESSAGES = {
+    'unsupported': ('Unsupported or unreadable image',
+                    'हा फोटो वाचता आला नाही. कृपया JPG किंवा PNG फोटो अपलोड करा.'),
+    'too_large': ('Image dimensions are too large',
+                  'फोटो खूप मोठा आहे. कृपया कॅमेऱ्याने सामान्य आकारात फोटो घ्या.'),
+    'too_small': ('Image is too small',
+                  'फोटो खूप लहान आहे. कृपया पानाचा जवळून स्पष्ट फोटो घ्या.'),
+    # Quality gate (checked in this order - a dark photo also looks blurred)
+    'too_dark': ('Photo is too dark',
+                 'फोटो खूप अंधारा आहे. उजेडात किंवा दिवसा पुन्हा फोटो घ्या.'),
+    'overexposed': ('Photo is overexposed',
+                    'फोटोमध्ये खूप प्रकाश आहे. थेट सूर्यप्रकाश टाळून सावलीत पुन्हा फोटो घ्या.'),
+    'blurry': ('Photo is blurry',
+               'फोटो अस्पष्ट आहे. कॅमेरा स्थिर धरून, पानावर फोकस करून पुन्हा फोटो घ्या.'),
+    'no_leaf': ('Not enough leaf in the photo',
+                'फोटोमध्ये ऊसाचे पान पुरेसे दिसत नाही. पान फ्रेम भरेल इतक्या जवळून फोटो घ्या.')
+}
+
+# ITU-R BT.601 luma weights for the quality gate's grayscale copy
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class ImageValidationError(ValueError):
+    """Upload rejected from its header, before decoding; carries the Marathi message.
+    str() is the fixed user-facing English message; detail is for logs only."""
+
+    def __init__(self, reason: str, detail: str = None):
+        english, self.marathi = VALIDATION_MESSAGES[reason]
+        super().__init__(english)
+        self.reason = reason
+        self.detail = detail
+
+
+class ImageQualityError(ImageValidationError):
+    """Photo decoded fine but is unusable for diagnosis; report has the measured metrics"""
+
+    def __init__(self, reason: str, report: dict):
+        super().__init__(reason)
+        self.report = report
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable read-only file over a bytes-like object, without copying it"""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+
+def open_upload(source):
+    """
+    File object PIL can decode from without materializing another copy:
+    Werkzeug FileStorage -> its spooled stream, bytes-like -> BufferReader,
+    file objects and paths as they are
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BufferReader(source)
+    return getattr(source, 'stream', source)
+
 
 class FarmerFriendlyImageProcessor:
     """Image processor matching your Streamlit preprocessing pipeline"""
@@ -22,73 +135,227 @@ class FarmerFriendlyImageProcessor:
         self.config = config
         self.target_size = (IMG_SIZE, IMG_SIZE)
         self.channels = 3
+        self.fast_decode = self._get_setting('IMAGE_FAST_DECODE', True)
+        margin = max(1, int(self._get_setting('IMAGE_PREDOWNSCALE_MARGIN', 2)))
+        # Smallest size pre-downscaling may go to before the final LANCZOS resize
+        self.predownscale_size = (IMG_SIZE * margin, IMG_SIZE * margin)
+        self.decode_workers = max(1, int(self._get_setting('IMAGE_DECODE_WORKERS', 4)))
+        self._decode_pool = None
+        self._pool_lock = threading.Lock()
+        allowed = {'jpeg' if ext == 'jpg' else ext
+                   for ext in self._get_setting('ALLOWED_EXTENSIONS', {'png', 'jpg', 'jpeg', 'bmp', 'gif'})}
+        Image.init()  # register every plugin so the formats below can be named
+        self.allowed_formats = [fmt for fmt, ext in FORMAT_EXTENSIONS.items()
+                                if ext in allowed and fmt in Image.OPEN]
+        self.max_pixels = int(self._get_setting('IMAGE_MAX_PIXELS', 50_000_000))
+        if Image.MAX_IMAGE_PIXELS:
+            self.max_pixels = min(self.max_pixels, int(Image.MAX_IMAGE_PIXELS))
+        self.max_dimension = int(self._get_setting('IMAGE_MAX_DIMENSION', 16384))
+        self.min_dimension = int(self._get_setting('IMAGE_MIN_DIMENSION', 32))
+        self.quality_check_enabled = self._get_setting('IMAGE_QUALITY_CHECK', False)
+        self.min_sharpness = float(self._get_setting('IMAGE_QUALITY_MIN_SHARPNESS', 15.0))
+        self.min_brightness = float(self._get_setting('IMAGE_QUALITY_MIN_BRIGHTNESS', 40.0))
+        self.max_overexposed = float(self._get_setting('IMAGE_QUALITY_MAX_OVEREXPOSED', 0.5))
+        self.min_leaf_ratio = float(self._get_setting('IMAGE_QUALITY_MIN_LEAF_RATIO', 0.02))
+        self.backend = str(self._get_setting('IMAGE_BACKEND', 'pil')).lower()
+        self._cv2 = None
+        if self.backend == 'opencv':
+            try:
+                import cv2
+                self._cv2 = cv2
+            except ImportError:
+                logger.warning("IMAGE_BACKEND=opencv but cv2 is not installed, using PIL")
+                self.backend = 'pil'
+
+    def _get_setting(self, name, default=None):
+        """Get setting from Flask config dict or Config class"""
+        if isinstance(self.config, dict):
+            return self.config.get(name, default)
+        return getattr(self.config, name, default)
 
-    def process_image_for_prediction(self, image_file):
+    def process_image_for_prediction(self, image_file, out=None, check_quality=False, header=None):
         """
         Complete preprocessing pipeline matching Streamlit logic:
         1. Load & convert to RGB
         2. Resize to 128x128 (LANCZOS)
-        3. Convert to float32 array
-        4. Normalize to [0, 1]
-        5. Scale to [-1, 1] (MobileNetV2 requirement)
-        6. Add batch dimension
+        3. Map uint8 pixels to MobileNetV2 [-1, 1] float32 (PIXEL_LUT)
+        4. Add batch dimension
+
+        `out` is an optional reusable float32 buffer, either (1, 128, 128, 3)
+        or one (128, 128, 3) slot of a batch array; the result is written
+        there and returned as a (1, 128, 128, 3) view.
+
+        With check_quality (and IMAGE_QUALITY_CHECK on), unusable photos
+        raise ImageQualityError instead of returning None, so the caller can
+        skip inference and show the Marathi reason.
+
+        `header` is validate_image_header()'s result when the caller has
+        already validated the upload; it is then not parsed a second time.
         """
         try:
             logger.info("Processing image...")
+            img_array = self._process(image_file, out, check_quality, header)
+            logger.info(f"✅ Image processed successfully: {img_array.shape}")
+            return img_array
+
+        except ImageQualityError as e:
+            logger.info(f"Quality gate: {e}")
+            raise
+
+        except Exception as e:
+            logger.error(f"Image processing error: {str(e)}")
+            traceback.print_exc()
+            return None
+
+    def process_images_for_prediction(self, image_files) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Preprocess many images concurrently on the decode pool (PIL releases
+        the GIL while decoding and resizing). Each result is written straight
+        into its slot of one (N, 128, 128, 3) float32 batch, ready for
+        predict_probabilities(). Returns (batch, errors): errors[i] is None
+        on success, otherwise the reason image i failed (its slot is zeros).
+        """
+        image_files = list(image_files)
+        batch = np.zeros((len(image_files), IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+        errors: List[Optional[str]] = [None] * len(image_files)
+
+        def process_slot(index):
+            try:
+                self._process(image_files[index], batch[index])
+            except Exception as e:
+                batch[index] = 0
+                errors[index] = str(e)
+
+        if len(image_files) == 1:
+            process_slot(0)
+        elif image_files:
+            list(self._get_decode_pool().map(process_slot, range(len(image_files))))
+
+        failed = sum(error is not None for error in errors)
+        logger.info(f"✅ Batch processed: {len(image_files) - failed}/{len(image_files)} images")
+        return batch, errors
 
+    def _get_decode_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._decode_pool is None:
+                self._decode_pool = ThreadPoolExecutor(max_workers=self.decode_workers,
+                                                       thread_name_prefix='image-decode')
+            return self._decode_pool
+
+    def _process(self, image_file, out=None, check_quality=False, header=None):
+        """Steps 1-4; raises on failure"""
+        if header is None:
+            self.validate_image_header(image_file)
+        pixels = self._load_resize_opencv(image_file) if self._cv2 is not None else None
+        if pixels is None:
             # Step 1: Load and validate
             image = self._load_and_convert_rgb(image_file)
             if image is None:
-                return None
+                raise ValueError("Could not read image")
 
             # Step 2: Resize with LANCZOS resampling
-            resized = self._resize_image(image)
+            pixels = np.asarray(self._resize_image(image))
 
-            # Step 3: Convert to NumPy array (float32)
-            img_array = np.array(resized, dtype=np.float32)
-            logger.info(f"Array shape: {img_array.shape}, dtype: {img_array.dtype}")
+        expected_shape = (IMG_SIZE, IMG_SIZE, 3)
+        if pixels.shape != expected_shape:
+            raise ValueError(f"Shape mismatch: expected {expected_shape}, got {pixels.shape}")
 
-            # Step 4: First normalization [0, 255] → [0, 1]
-            img_array = img_array / 255.0
-            logger.info(f"After /255: [{np.min(img_array):.3f}, {np.max(img_array):.3f}]")
+        # Blurry / dark / leafless photo: stop before the model
+        if check_quality and self.quality_check_enabled:
+            report = self.assess_quality(pixels)
+            if not report['usable']:
+                raise ImageQualityError(report['issues'][0], report)
 
-            # Step 5: Second normalization [0, 1] → [-1, 1] (MobileNetV2)
-            img_array = (img_array - 0.5) * 2.0
-            logger.info(f"After MobileNetV2 scaling: [{np.min(img_array):.3f}, {np.max(img_array):.3f}]")
+        # Step 3: uint8 pixels → [-1, 1] in one lookup pass
 
-            # Step 6: Add batch dimension
-            img_array = np.expand_dims(img_array, axis=0)
-            logger.info(f"Final shape: {img_array.shape}")
+        if out is None:
+            out = np.empty((1,) + expected_shape, dtype=np.float32)
+        normalize_pixels(pixels, out=out[0] if out.ndim == 4 else out)
 
-            # Validation
-            expected_shape = (1, IMG_SIZE, IMG_SIZE, 3)
-            if img_array.shape != expected_shape:
-                raise ValueError(f"Shape mismatch: expected {expected_shape}, got {img_array.shape}")
+        # Step 4: Batch dimension (a view of out)
+        return out if out.ndim == 4 else out[None]
 
-            # Check for NaN or infinity
-            if np.isnan(img_array).any():
-                raise ValueError("Image contains NaN values")
-            if not np.isfinite(img_array).all():
-                raise ValueError("Image contains infinite values")
+    def assess_quality(self, pixels: np.ndarray) -> dict:
+        """
+        Blur, exposure and leaf-coverage checks on the resized uint8 RGB
+        pixels (what the model sees), vectorized; well under a millisecond.
+        - sharpness: variance of the 4-neighbour Laplacian of the luma
+        - exposure: mean luma and share of clipped highlights (>= 250)
+        - leaf ratio: share of pixels where green clearly dominates red and blue
+        """
+        luma = pixels.astype(np.float32) @ LUMA_WEIGHTS
+        laplacian = (luma[1:-1, :-2] + luma[1:-1, 2:] + luma[:-2, 1:-1] + luma[2:, 1:-1]
+                     - 4 * luma[1:-1, 1:-1])
+        # Colour and exposure on a 64x64 subsample
+        small = pixels[::2, ::2].astype(np.int16)
+        red, green, blue = small[..., 0], small[..., 1], small[..., 2]
 
-            logger.info("✅ Image processed successfully")
-            return img_array
+        report = {
+            'sharpness': round(float(laplacian.var()), 2),
+            'brightness': round(float(luma.mean()), 2),
+            'overexposed_ratio': round(float(np.count_nonzero(luma[::2, ::2] >= 250) / red.size), 4),
+            'leaf_ratio': round(float(np.count_nonzero((green > red + 8) & (green > blue + 8)) / red.size), 4)
+        }
 
+        issues = []
+        if report['brightness'] < self.min_brightness:
+            issues.append('too_dark')
+        if report['overexposed_ratio'] > self.max_overexposed:
+            issues.append('overexposed')
+        if report['sharpness'] < self.min_sharpness:
+            issues.append('blurry')
+        if report['leaf_ratio'] < self.min_leaf_ratio:
+            issues.append('no_leaf')
+        report['issues'] = issues
+        report['usable'] = not issues
+        return report
+
+    def validate_image_header(self, image_file):
+        """
+        Cheap pre-validation from the image header only (no pixel decode):
+        format must be in ALLOWED_EXTENSIONS, dimensions within
+        IMAGE_MIN_DIMENSION..IMAGE_MAX_DIMENSION and IMAGE_MAX_PIXELS
+        (decompression-bomb guard). Returns (format, (width, height)),
+        raises ImageValidationError. The upload stream is rewound.
+        """
+        source = open_upload(image_file)
+        start = source.tell() if hasattr(source, 'tell') else None
+        try:
+            with Image.open(source, formats=self.allowed_formats) as header:
+                image_format, (width, height) = header.format, header.size
+        except Image.DecompressionBombError as e:
+            raise ImageValidationError('too_large', str(e))
         except Exception as e:
-            logger.error(f"Image processing error: {str(e)}")
-            traceback.print_exc()
-            return None
+            raise ImageValidationError('unsupported', str(e))
+        finally:
+            if start is not None:
+                source.seek(start)
+
+        if width * height > self.max_pixels or max(width, height) > self.max_dimension:
+            raise ImageValidationError('too_large', f"{width}x{height}")
+        if min(width, height) < self.min_dimension:
+            raise ImageValidationError('too_small', f"{width}x{height}")
+        return image_format, (width, height)
 
     def _load_and_convert_rgb(self, image_file):
         """Load image and convert to RGB (Step 1)"""
         try:
-            # Handle different input types
-            if hasattr(image_file, 'read'):
-                image_data = image_file.read()
-                image_file.seek(0)
-                image = Image.open(io.BytesIO(image_data))
-            else:
-                image = Image.open(image_file)
+            # Decode straight from the upload stream / buffer, then rewind it
+            source = open_upload(image_file)
+            start = source.tell() if hasattr(source, 'tell') else None
+            image = Image.open(source)
+
+            # JPEG: let libjpeg scale down in the DCT domain (1/2, 1/4, 1/8)
+            # instead of decoding every pixel of a 12-48 MP photo
+            if self.fast_decode and image.format in JPEG_FORMATS:
+                original_size = image.size
+                image.draft('RGB', self.predownscale_size)
+                if image.size != original_size:
+                    logger.info(f"JPEG draft decode: {original_size} → {image.size}")
+
+            image.load()
+            if start is not None:
+                source.seek(start)
 
             # Force RGB conversion
             if image.mode != 'RGB':
@@ -106,6 +373,7 @@ class FarmerFriendlyImageProcessor:
         """Resize to 128x128 with LANCZOS resampling (Step 2)"""
         try:
             original_size = image.size
+            image = self._reduce(image)
             # LANCZOS resampling preserves edge features for disease detection
             resized = image.resize(self.target_size, Image.Resampling.LANCZOS)
             logger.info(f"✅ Resized: {original_size} → {resized.size}")
@@ -115,6 +383,67 @@ class FarmerFriendlyImageProcessor:
             # Fallback to default resize
             return image.resize(self.target_size)
 
+    def _load_resize_opencv(self, image_file):
+        """
+        Steps 1-2 with OpenCV: cv2.imdecode (JPEG decoded at 1/2, 1/4 or 1/8
+        scale like draft mode), INTER_AREA resize, BGR → RGB in place.
+        Returns None for formats OpenCV cannot decode so PIL takes over.
+        """
+        cv2 = self._cv2
+        source = open_upload(image_file)
+        try:
+            if isinstance(source, BufferReader):
+                encoded = np.frombuffer(source._view, dtype=np.uint8)
+            elif hasattr(source, 'getbuffer'):
+                encoded = np.frombuffer(source.getbuffer(), dtype=np.uint8)
+            elif hasattr(source, 'read'):
+                start = source.tell()
+                encoded = np.frombuffer(source.read(), dtype=np.uint8)
+                source.seek(start)
+            else:
+                encoded = np.fromfile(source, dtype=np.uint8)
+
+            # Keep PIL's orientation handling (EXIF rotation is not applied)
+            flags = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+            factor = self._jpeg_reduce_factor(encoded) if self.fast_decode else 1
+            if factor > 1:
+                flags = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4,
+                         8: cv2.IMREAD_REDUCED_COLOR_8}[factor] | cv2.IMREAD_IGNORE_ORIENTATION
+
+            decoded = cv2.imdecode(encoded, flags)
+            del encoded
+            if decoded is None:
+                return None
+
+            resized = cv2.resize(decoded, self.target_size, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+            logger.info(f"✅ OpenCV decode: {decoded.shape[1::-1]} → {resized.shape[1::-1]}")
+            return resized
+
+        except Exception as e:
+            logger.warning(f"OpenCV decode failed, using PIL: {str(e)}")
+            return None
+
+    def _jpeg_reduce_factor(self, encoded: np.ndarray) -> int:
+        """Largest JPEG scale-down (1, 2, 4, 8) keeping predownscale_size, from the header only"""
+        header = Image.open(BufferReader(encoded))
+        if header.format not in JPEG_FORMATS:
+            return 1
+        factor = 1
+        while factor < 8 and (header.width // (factor * 2) >= self.predownscale_size[0] and
+                              header.height // (factor * 2) >= self.predownscale_size[1]):
+            factor *= 2
+        return factor
+
+    def _reduce(self, image: Image.Image):
+        """Integer box downscale of large non-draft images before LANCZOS"""
+        if not self.fast_decode:
+            return image
+        factor = min(image.width // self.predownscale_size[0], image.height // self.predownscale_size[1])
+        if factor < 2:
+            return image
+        return image.reduce(factor)
+
 
 # Global instance
 _image_processor = None
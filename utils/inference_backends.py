@@ -0,0 +1,369 @@
+"""
+Pluggable Inference Backends
+Keras (compiled tf.function), TFLite (float32 / float16 / int8) and ONNX Runtime
+engines behind one predict_batch() contract: (N, 128, 128, 3) float32 -> (N, classes)
+
+Engines whose model also outputs the pooled backbone embedding additionally
+offer predict_with_embeddings() -> ((N, classes), (N, dim)) from the same pass.
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INPUT_SHAPE = (128, 128, 3)
+
+TFLITE_VARIANTS = ('float32', 'float16', 'int8')
+
+
+class InferenceBackend:
+    """Base class for inference engines"""
+
+    name = 'base'
+    supports_embeddings = False
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (N, 128, 128, 3) float32 batch"""
+        raise NotImplementedError
+
+    def predict_with_embeddings(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(probabilities, pooled embeddings) from one forward pass"""
+        raise NotImplementedError(f"{self.name} model has no embedding output")
+
+    def warm_up(self, batch_sizes: Iterable[int]) -> float:
+        """Run zero batches of the given sizes; returns total warm-up time in ms"""
+        start = time.perf_counter()
+        for size in sorted(set(int(s) for s in batch_sizes)):
+            self.predict_batch(np.zeros((size,) + INPUT_SHAPE, dtype=np.float32))
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"{self.name} warm-up done in {elapsed:.1f}ms")
+        return elapsed
+
+    def describe(self) -> Dict[str, Any]:
+        """Backend details for health/metrics payloads"""
+        return {'backend': self.name}
+
+
+def find_embedding_layer(model):
+    """The GlobalAveragePooling2D layer feeding the classifier head (None if absent)"""
+    for layer in reversed(getattr(model, 'layers', [])):
+        if layer.__class__.__name__ == 'GlobalAveragePooling2D':
+            return layer
+    return None
+
+
+def build_dual_output_model(model):
+    """Same weights, outputs [probabilities, pooled embedding]; None if the model has no pooling layer"""
+    import tensorflow as tf
+
+    layer = find_embedding_layer(model)
+    if layer is None:
+        return None
+    try:
+        return tf.keras.Model(inputs=model.inputs, outputs=[model.outputs[0], layer.output])
+    except Exception as e:
+        logger.warning(f"Could not expose embedding output: {e}")
+        return None
+
+
+def _split_outputs(outputs) -> Tuple[int, Optional[int]]:
+    """
+    Indices of (probabilities, embedding) among converted-model outputs, by
+    width: the pooled embedding (1280) is wider than the class vector
+    """
+    if len(outputs) < 2:
+        return 0, None
+    widths = [int(shape[-1]) if shape is not None and shape[-1] is not None else 0 for shape in outputs]
+    embedding = int(np.argmax(widths))
+    return (1 if embedding == 0 else 0), embedding
+
+
+class KerasBackend(InferenceBackend):
+    """
+    Keras model served through a tf.function with a fixed 128x128x3 input
+    signature, traced once at load time instead of paying model.predict's
+    per-call data adapter and callback setup.
+    """
+
+    name = 'keras'
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        self._tf = tf
+        self._serving_fn = None
+
+        # Probabilities + pooled embedding in one pass when the architecture allows
+        dual_model = build_dual_output_model(model)
+        self.supports_embeddings = dual_model is not None
+        serving_model = dual_model or model
+
+        @tf.function(
+            input_signature=[tf.TensorSpec(shape=(None,) + INPUT_SHAPE, dtype=tf.float32)],
+            reduce_retracing=True
+        )
+        def serve(images):
+            return serving_model(images, training=False)
+
+        try:
+            serve.get_concrete_function()
+            self._serving_fn = serve
+            logger.info("Compiled serving function ready")
+        except Exception as e:
+            self.supports_embeddings = False
+            logger.warning(f"Serving function compile failed, using model.predict: {e}")
+
+    def _run(self, batch: np.ndarray):
+        return self._serving_fn(self._tf.convert_to_tensor(batch, dtype=self._tf.float32))
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        if self._serving_fn is None:
+            return self.model.predict(batch, verbose=0)
+        outputs = self._run(batch)
+        return (outputs[0] if self.supports_embeddings else outputs).numpy()
+
+    def predict_with_embeddings(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.supports_embeddings:
+            return super().predict_with_embeddings(batch)
+        probabilities, embeddings = self._run(batch)
+        return probabilities.numpy(), embeddings.numpy()
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'compiled': self._serving_fn is not None,
+                'embeddings': self.supports_embeddings}
+
+
+class FrozenGraphBackend(InferenceBackend):
+    """
+    Inference-only frozen GraphDef written by scripts/export_frozen.py:
+    weights baked in as constants, no optimizer slots, no Keras layer
+    deserialization. Loaded via import_graph_def and pruned to one
+    input -> output function.
+    """
+
+    name = 'frozen'
+
+    def __init__(self, model_path, input_name: str, output_name: str, model_content: bytes = None,
+                 embedding_name: str = None):
+        import tensorflow as tf
+
+        self.model_path = Path(model_path)
+        self._tf = tf
+        graph_def = tf.compat.v1.GraphDef()
+        graph_def.ParseFromString(model_content if model_content is not None else self.model_path.read_bytes())
+
+        def _import():
+            tf.compat.v1.import_graph_def(graph_def, name='')
+
+        wrapped = tf.compat.v1.wrap_function(_import, [])
+        outputs = [wrapped.graph.as_graph_element(output_name)]
+        if embedding_name:
+            outputs.append(wrapped.graph.as_graph_element(embedding_name))
+        self.supports_embeddings = bool(embedding_name)
+        self._serving_fn = wrapped.prune(wrapped.graph.as_graph_element(input_name), outputs)
+        logger.info(f"Frozen inference graph loaded: {self.model_path.name} ({len(graph_def.node)} nodes)")
+
+    def predict_with_embeddings(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.supports_embeddings:
+            return super().predict_with_embeddings(batch)
+        outputs = self._serving_fn(self._tf.convert_to_tensor(batch, dtype=self._tf.float32))
+        return outputs[0].numpy(), outputs[1].numpy()
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self._serving_fn(self._tf.convert_to_tensor(batch, dtype=self._tf.float32))[0].numpy()
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'model_file': self.model_path.name,
+                'embeddings': self.supports_embeddings}
+
+
+def _get_tflite_interpreter_class():
+    """Prefer the standalone tflite_runtime wheel; fall back to full TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        import tensorflow as tf
+        return tf.lite.Interpreter
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    TFLite interpreter (float32, float16 or dynamic-range int8 artifact).
+    The builtin op resolver applies the XNNPACK delegate by default on CPU.
+    """
+
+    def __init__(self, model_path, variant: str = 'float32', num_threads: int = 2,
+                 model_content: bytes = None):
+        if variant not in TFLITE_VARIANTS:
+            raise ValueError(f"Unknown TFLite variant '{variant}', expected one of {TFLITE_VARIANTS}")
+
+        self.name = f"tflite_{variant}"
+        self.variant = variant
+        self.model_path = Path(model_path)
+        self.num_threads = int(num_threads)
+        # The interpreter is not thread-safe and its input tensor gets resized per batch
+        self._lock = threading.Lock()
+        self._batch_size = None
+
+        interpreter_class = _get_tflite_interpreter_class()
+        if model_content is not None:
+            # Flatbuffer preloaded in the gunicorn master - read in place, shared copy-on-write
+            self.interpreter = interpreter_class(model_content=model_content, num_threads=self.num_threads)
+        else:
+            self.interpreter = interpreter_class(model_path=str(self.model_path), num_threads=self.num_threads)
+        self._input_index = self.interpreter.get_input_details()[0]['index']
+        output_details = self.interpreter.get_output_details()
+        probabilities, embedding = _split_outputs([d['shape'] for d in output_details])
+        self._output_index = output_details[probabilities]['index']
+        self._embedding_index = output_details[embedding]['index'] if embedding is not None else None
+        self.supports_embeddings = self._embedding_index is not None
+        self._resize(1)
+        logger.info(f"TFLite model loaded: {self.model_path.name} ({self.num_threads} threads)")
+
+    def _resize(self, batch_size: int):
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input_index, [batch_size, *INPUT_SHAPE])
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch_size
+
+    def _invoke(self, batch: np.ndarray):
+        self._resize(len(batch))
+        self.interpreter.set_tensor(self._input_index, np.ascontiguousarray(batch, dtype=np.float32))
+        self.interpreter.invoke()
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._invoke(batch)
+            return self.interpreter.get_tensor(self._output_index).copy()
+
+    def predict_with_embeddings(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.supports_embeddings:
+            return super().predict_with_embeddings(batch)
+        with self._lock:
+            self._invoke(batch)
+            return (self.interpreter.get_tensor(self._output_index).copy(),
+                    self.interpreter.get_tensor(self._embedding_index).copy())
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'model_file': self.model_path.name,
+            'num_threads': self.num_threads,
+            'embeddings': self.supports_embeddings
+        }
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    ONNX Runtime session with full graph optimization. The session is created
+    once and reused; InferenceSession.run is safe to call from several threads.
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model_path, intra_op_threads: int = 2, model_content: bytes = None):
+        import onnxruntime as ort
+
+        self.model_path = Path(model_path)
+        self.intra_op_threads = int(intra_op_threads)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(
+            model_content if model_content is not None else str(self.model_path),
+            sess_options=options, providers=['CPUExecutionProvider']
+        )
+        self._input_name = self.session.get_inputs()[0].name
+        outputs = self.session.get_outputs()
+        probabilities, embedding = _split_outputs([
+            [dim if isinstance(dim, int) else None for dim in o.shape] for o in outputs
+        ])
+        self._output_name = outputs[probabilities].name
+        self._embedding_name = outputs[embedding].name if embedding is not None else None
+        self.supports_embeddings = self._embedding_name is not None
+        logger.info(f"ONNX model loaded: {self.model_path.name} ({self.intra_op_threads} intra-op threads)")
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run([self._output_name], {self._input_name: batch})[0]
+
+    def predict_with_embeddings(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.supports_embeddings:
+            return super().predict_with_embeddings(batch)
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        probabilities, embeddings = self.session.run([self._output_name, self._embedding_name],
+                                                     {self._input_name: batch})
+        return probabilities, embeddings
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'model_file': self.model_path.name,
+            'intra_op_threads': self.intra_op_threads,
+            'embeddings': self.supports_embeddings
+        }
+
+
+def tflite_model_path(model_dir, variant: str) -> Path:
+    """Standard artifact name produced by scripts/convert_tflite.py"""
+    return Path(model_dir) / f"Final_Model_{variant}.tflite"
+
+
+def onnx_model_path(model_dir) -> Path:
+    """Standard artifact name produced by scripts/export_onnx.py"""
+    return Path(model_dir) / "Final_Model.onnx"
+
+
+def frozen_model_path(model_dir) -> Path:
+    """Inference-only graph produced by scripts/export_frozen.py (manifest next to it as .json)"""
+    return Path(model_dir) / "Final_Model_frozen.pb"
+
+
+BACKEND_NAMES = ('keras',) + tuple(f"tflite_{v}" for v in TFLITE_VARIANTS) + ('onnx',)
+
+
+def backend_artifact_path(backend_name: str, model_dir) -> Optional[Path]:
+    """Model file a non-Keras backend loads from (None for Keras)"""
+    if backend_name.startswith('tflite_'):
+        return tflite_model_path(model_dir, backend_name[len('tflite_'):])
+    if backend_name == 'onnx':
+        return onnx_model_path(model_dir)
+    return None
+
+
+def create_backend(backend_name: str, keras_model=None, model_dir=None,
+                   num_threads: int = 2, model_content: bytes = None,
+                   model_path=None) -> Optional[InferenceBackend]:
+    """Build the backend selected by INFERENCE_BACKEND (model_path overrides the standard artifact)"""
+    if backend_name == 'keras':
+        if keras_model is None:
+            raise ValueError("Keras backend requires a loaded model")
+        return KerasBackend(keras_model)
+
+    if backend_name.startswith('tflite_'):
+        variant = backend_name[len('tflite_'):]
+        path = Path(model_path) if model_path else tflite_model_path(model_dir, variant)
+        if model_content is None and not path.exists():
+            raise FileNotFoundError(
+                f"TFLite model not found: {path} (run scripts/convert_tflite.py --variant {variant})"
+            )
+        return TFLiteBackend(path, variant=variant, num_threads=num_threads, model_content=model_content)
+
+    if backend_name == 'onnx':
+        path = Path(model_path) if model_path else onnx_model_path(model_dir)
+        if model_content is None and not path.exists():
+            raise FileNotFoundError(f"ONNX model not found: {path} (run scripts/export_onnx.py)")
+        return OnnxRuntimeBackend(path, intra_op_threads=num_threads, model_content=model_content)
+
+    raise ValueError(f"Unknown inference backend: {backend_name}")
@@ -0,0 +1,187 @@
+"""
+Dynamic Micro-Batching Inference Queue
+Coalesces concurrent single-image predictions into one batched forward pass
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFullError(RuntimeError):
+    """Raised when the inference queue cannot accept more requests"""
+
+
+class InferenceBatcher:
+    """
+    In-process batching scheduler in front of the model.
+
+    Requests are queued by submit(); a single worker thread waits for the
+    first request, then keeps collecting until either max_batch_size samples
+    are gathered or max_wait_ms has passed, runs ONE forward pass on the
+    stacked (N, 128, 128, 3) batch and resolves each request's Future with
+    its own probability row.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 8, max_wait_ms: float = 5.0,
+                 max_queue_size: int = 64):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._stop_event = threading.Event()
+        self._worker = None
+
+        # Metrics
+        self._metrics_lock = threading.Lock()
+        self._batch_size_histogram = {}
+        self._batches_total = 0
+        self._requests_total = 0
+        self._rejected_total = 0
+        self._failed_batches = 0
+        self._queue_wait_total = 0.0
+        self._inference_time_total = 0.0
+
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(
+            target=self._run, name='inference-batcher', daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            f"Inference batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait={self.max_wait * 1000:.1f}ms)"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker thread and fail anything still queued"""
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+        while True:
+            try:
+                _, future, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not future.done():
+                future.set_exception(RuntimeError("Inference batcher stopped"))
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, sample: np.ndarray) -> Future:
+        """
+        Queue one preprocessed image of shape (128, 128, 3).
+        Returns a Future resolving to its probability vector.
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((sample, future, time.perf_counter()))
+        except queue.Full:
+            with self._metrics_lock:
+                self._rejected_total += 1
+            raise InferenceQueueFullError(
+                f"Inference queue full ({self._queue.maxsize} pending)"
+            )
+        return future
+
+    def _collect_batch(self) -> List[Tuple[np.ndarray, Future, float]]:
+        """Block for the first request, then fill the batch until full or timed out"""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Worker loop"""
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._process_batch(batch)
+
+    def _process_batch(self, batch: List[Tuple[np.ndarray, Future, float]]):
+        """Run one forward pass and fan the results back out"""
+        started = time.perf_counter()
+        futures = [future for _, future, _ in batch]
+        try:
+            stacked = np.stack([sample for sample, _, _ in batch]).astype(np.float32, copy=False)
+            predictions = self.predict_fn(stacked)
+            # predict_fn may return several aligned outputs, e.g. (probabilities, embeddings)
+            if isinstance(predictions, tuple):
+                predictions = list(zip(*predictions))
+            if len(predictions) != len(batch):
+                raise RuntimeError(
+                    f"Model returned {len(predictions)} rows for batch of {len(batch)}"
+                )
+            for future, row in zip(futures, predictions):
+                if not future.done():
+                    future.set_result(row)
+            failed = False
+        except Exception as e:
+            logger.error(f"Batched inference failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            failed = True
+
+        finished = time.perf_counter()
+        with self._metrics_lock:
+            size = len(batch)
+            self._batch_size_histogram[size] = self._batch_size_histogram.get(size, 0) + 1
+            self._batches_total += 1
+            self._requests_total += size
+            self._failed_batches += int(failed)
+            self._queue_wait_total += sum(started - queued_at for _, _, queued_at in batch)
+            self._inference_time_total += finished - started
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of batching metrics"""
+        with self._metrics_lock:
+            batches = self._batches_total
+            requests = self._requests_total
+            return {
+                'running': self.is_running,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_depth': self.queue_depth,
+                'batches_total': batches,
+                'requests_total': requests,
+                'rejected_total': self._rejected_total,
+                'failed_batches': self._failed_batches,
+                'average_batch_size': (requests / batches) if batches else 0.0,
+                'average_queue_wait_ms': (self._queue_wait_total / requests * 1000) if requests else 0.0,
+                'average_batch_inference_ms': (self._inference_time_total / batches * 1000) if batches else 0.0,
+                'batch_size_histogram': {
+                    str(size): count for size, count in sorted(self._batch_size_histogram.items())
+                }
+            }
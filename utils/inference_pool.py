@@ -0,0 +1,357 @@
+"""
+Inference Process Pool
+Long-lived model processes fed through multiprocessing.shared_memory slots.
+
+The web process writes preprocessed float32 tensors straight into a shared
+input ring of slots and sends only slot indices over the task queue; a model
+process runs the batch and writes probability vectors into a shared output
+ring. No arrays are pickled in either direction. When every slot is taken,
+callers get InferencePoolBusyError (-> HTTP 503) instead of queueing forever.
+
+Each model process has its own task queue and result pipe, so the pool knows
+which tasks a process holds and a killed process cannot leave a shared lock
+held. When a process dies (OOM kill, segfault) its result pipe hits EOF: its
+in-flight requests fail at once, their slots are reclaimed and a replacement
+process is started.
+"""
+import atexit
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from utils.inference_backends import InferenceBackend, INPUT_SHAPE
+from utils.inference_batcher import InferenceQueueFullError
+
+logger = logging.getLogger(__name__)
+
+_SIMPLE_TYPES = (str, int, float, bool, type(None), list, tuple)
+
+
+class InferencePoolBusyError(InferenceQueueFullError):
+    """All shared-memory slots are in use"""
+
+
+def _worker_settings(config) -> Dict[str, Any]:
+    """Picklable copy of the config for the model processes"""
+    items = config.items() if isinstance(config, dict) else (
+        (name, getattr(config, name)) for name in dir(config) if name.isupper()
+    )
+    settings = {}
+    for name, value in items:
+        if not name.isupper():
+            continue
+        if hasattr(value, '__fspath__'):
+            value = str(value)
+        if isinstance(value, _SIMPLE_TYPES):
+            settings[name] = value
+    # Model processes run the engine directly: no nested pool, no batching thread
+    settings['INFERENCE_MODE'] = 'local'
+    settings['INFERENCE_BATCHING_ENABLED'] = False
+    # The parent picks the version (MODEL_PATH); the active-version marker is its business
+    settings['MODEL_FOLLOW_ACTIVE_MARKER'] = False
+    settings['MODEL_VERSION_SYNC_INTERVAL'] = 0
+    return settings
+
+
+def build_worker_backend(settings: Dict[str, Any]) -> InferenceBackend:
+    """Default backend factory: a regular loader running INFERENCE_BACKEND locally"""
+    from utils.model_loader import SugarcaneModelLoader
+
+    loader = SugarcaneModelLoader(settings)
+    if not loader.load_all_components():
+        raise RuntimeError(loader.load_error or "Model loading failed in inference process")
+    return loader.backend
+
+
+def _inference_worker(worker_id: int, settings: Dict[str, Any], backend_factory: Callable,
+                      input_name: str, output_name: str, num_slots: int, num_classes: int,
+                      task_queue, results):
+    """Model process main loop"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    inputs = np.ndarray((num_slots,) + INPUT_SHAPE, dtype=np.float32, buffer=input_shm.buf)
+    outputs = np.ndarray((num_slots, num_classes), dtype=np.float32, buffer=output_shm.buf)
+
+    try:
+        backend = backend_factory(settings)
+        results.send(('ready', worker_id, backend.describe()))
+    except Exception as e:
+        results.send(('failed', worker_id, str(e)))
+        return
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            task_id, slots = task
+            try:
+                outputs[slots] = backend.predict_batch(inputs[slots])
+                results.send(('done', task_id, None))
+            except Exception as e:
+                results.send(('error', task_id, str(e)))
+    finally:
+        del inputs, outputs
+        input_shm.close()
+        output_shm.close()
+
+
+class InferencePool(InferenceBackend):
+    """
+    Pool of model processes behind the InferenceBackend contract, so the
+    batcher and predict() use it exactly like an in-process engine.
+    """
+
+    def __init__(self, config, num_classes: int, num_workers: int = 2, num_slots: int = 16,
+                 acquire_timeout: float = 0.5, backend_factory: Callable = build_worker_backend):
+        self.num_classes = int(num_classes)
+        self.num_workers = max(1, int(num_workers))
+        self.num_slots = max(1, int(num_slots))
+        self.acquire_timeout = float(acquire_timeout)
+        self.backend_factory = backend_factory
+        self.settings = _worker_settings(config)
+        self.result_timeout = float(self.settings.get('INFERENCE_TIMEOUT_SECONDS', 30))
+        self.name = f"process_pool[{self.settings.get('INFERENCE_BACKEND', 'keras')}]"
+
+        self._context = mp.get_context('spawn')
+        self._processes = {}
+        self._task_queues = {}
+        self._connections = {}
+        self._ready = set()
+        self._inflight = {}
+        self._worker_info = {}
+        self._free_slots = queue.Queue()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._collector = None
+        self._stopping = False
+        self._restarts = 0
+        self._input_shm = None
+        self._output_shm = None
+        self._busy_rejections = 0
+
+    def start(self, timeout: float = 300):
+        """Allocate shared memory, spawn model processes and wait until they are loaded"""
+        input_bytes = self.num_slots * int(np.prod(INPUT_SHAPE)) * 4
+        output_bytes = self.num_slots * self.num_classes * 4
+        self._input_shm = shared_memory.SharedMemory(create=True, size=input_bytes)
+        self._output_shm = shared_memory.SharedMemory(create=True, size=output_bytes)
+        self._inputs = np.ndarray((self.num_slots,) + INPUT_SHAPE, dtype=np.float32, buffer=self._input_shm.buf)
+        self._outputs = np.ndarray((self.num_slots, self.num_classes), dtype=np.float32, buffer=self._output_shm.buf)
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+        self._stopping = False
+        atexit.register(self.stop)
+
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+
+        self._wait_for_workers(timeout)
+        self._collector = threading.Thread(target=self._collect_results, name='inference-pool-results', daemon=True)
+        self._collector.start()
+        logger.info(f"Inference pool ready: {self.num_workers} processes, {self.num_slots} shared-memory slots")
+
+    def _spawn(self, worker_id: int):
+        """Start model process worker_id with a fresh task queue and result pipe"""
+        task_queue = self._context.Queue()
+        reader, writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_inference_worker,
+            args=(worker_id, self.settings, self.backend_factory,
+                  self._input_shm.name, self._output_shm.name,
+                  self.num_slots, self.num_classes, task_queue, writer),
+            name=f"inference-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        # Only the child may hold the write end, so its exit shows up as EOF
+        writer.close()
+        with self._pending_lock:
+            self._task_queues[worker_id] = task_queue
+            self._connections[worker_id] = reader
+            self._processes[worker_id] = process
+            self._inflight[worker_id] = set()
+
+    def _wait_for_workers(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while len(self._worker_info) < self.num_workers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.stop()
+                raise TimeoutError("Inference processes did not finish loading in time")
+            connections = {conn: worker_id for worker_id, conn in self._connections.items()
+                           if worker_id not in self._worker_info}
+            for conn in wait(list(connections), timeout=remaining):
+                try:
+                    kind, worker_id, payload = conn.recv()
+                except EOFError:
+                    self.stop()
+                    raise RuntimeError(f"Inference process {connections[conn]} exited while loading")
+                if kind == 'failed':
+                    self.stop()
+                    raise RuntimeError(f"Inference process {worker_id} failed to load: {payload}")
+                self._worker_info[worker_id] = payload
+                self._ready.add(worker_id)
+
+    def _collect_results(self):
+        """Resolve futures as model processes finish, then recycle their slots"""
+        while True:
+            with self._pending_lock:
+                connections = {conn: worker_id for worker_id, conn in self._connections.items()}
+            if self._stopping and not connections:
+                break
+            for conn in wait(list(connections), timeout=1.0):
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self._handle_death(connections[conn])
+                else:
+                    self._handle_result(*message)
+
+    def _handle_result(self, kind: str, task_id: int, error):
+        """Apply one message from a model process"""
+        if kind == 'ready':
+            with self._pending_lock:
+                self._worker_info[task_id] = error
+                self._ready.add(task_id)
+            logger.info(f"Inference process {task_id} ready again")
+            return
+        if kind == 'failed':
+            logger.error(f"Replacement inference process {task_id} failed to load: {error}")
+            return
+        with self._pending_lock:
+            future, slots, worker_id = self._pending.pop(task_id, (None, [], None))
+            if worker_id is not None:
+                self._inflight[worker_id].discard(task_id)
+        if future is not None:
+            if kind == 'done':
+                future.set_result(self._outputs[slots].copy())
+            else:
+                future.set_exception(RuntimeError(error))
+        for slot in slots:
+            self._free_slots.put(slot)
+
+    def _handle_death(self, worker_id: int):
+        """Fail the dead process's in-flight requests, reclaim their slots, start a replacement"""
+        with self._pending_lock:
+            self._connections.pop(worker_id).close()
+            if self._stopping:
+                return  # stop() fails whatever is still pending
+            process = self._processes.pop(worker_id)
+            task_queue = self._task_queues.pop(worker_id)
+            was_ready = worker_id in self._ready
+            self._ready.discard(worker_id)
+            lost = [self._pending.pop(task_id) for task_id in self._inflight.pop(worker_id)
+                    if task_id in self._pending]
+        process.join(1)
+        message = f"Inference process {worker_id} died (exit code {process.exitcode})"
+        logger.error(f"{message}; failing {len(lost)} in-flight request(s)")
+        for future, slots, _ in lost:
+            if not future.done():
+                future.set_exception(RuntimeError(message))
+            for slot in slots:
+                self._free_slots.put(slot)
+        task_queue.cancel_join_thread()
+        task_queue.close()
+        # A process that never finished loading is not restarted (no crash loop)
+        if was_ready and not self._stopping:
+            self._restarts += 1
+            self._spawn(worker_id)
+
+    def _acquire_slots(self, count: int) -> List[int]:
+        """Back-pressure: wait briefly for free slots, otherwise reject"""
+        slots = []
+        try:
+            for _ in range(count):
+                slots.append(self._free_slots.get(timeout=self.acquire_timeout))
+        except queue.Empty:
+            for slot in slots:
+                self._free_slots.put(slot)
+            self._busy_rejections += 1
+            raise InferencePoolBusyError(f"All {self.num_slots} inference slots are busy")
+        return slots
+
+    def predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        if len(batch) > self.num_slots:
+            return np.concatenate([
+                self.predict_batch(batch[start:start + self.num_slots])
+                for start in range(0, len(batch), self.num_slots)
+            ])
+
+        slots = self._acquire_slots(len(batch))
+        self._inputs[slots] = batch
+        future = Future()
+        task_id = next(self._task_ids)
+        with self._pending_lock:
+            # Least-loaded live process
+            worker_id = min(self._ready, key=lambda w: len(self._inflight[w]), default=None)
+            if worker_id is not None:
+                self._pending[task_id] = (future, slots, worker_id)
+                self._inflight[worker_id].add(task_id)
+                self._task_queues[worker_id].put((task_id, slots))
+        if worker_id is None:
+            for slot in slots:
+                self._free_slots.put(slot)
+            raise InferencePoolBusyError("No inference process is running")
+        return future.result(timeout=self.result_timeout)
+
+    @property
+    def free_slots(self) -> int:
+        return self._free_slots.qsize()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'processes_alive': sum(p.is_alive() for p in list(self._processes.values())),
+            'num_workers': self.num_workers,
+            'restarts': self._restarts,
+            'num_slots': self.num_slots,
+            'free_slots': self.free_slots,
+            'busy_rejections': self._busy_rejections,
+            'workers': self._worker_info
+        }
+
+    def stop(self):
+        """Stop model processes and release shared memory (idempotent)"""
+        if not self._processes and self._input_shm is None:
+            return
+        self._stopping = True
+        with self._pending_lock:
+            processes, task_queues = list(self._processes.values()), list(self._task_queues.values())
+            self._processes, self._task_queues = {}, {}
+            self._ready.clear()
+        for task_queue in task_queues:
+            task_queue.put(None)
+        for process in processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        if self._collector is not None:
+            self._collector.join(5)
+            self._collector = None
+        with self._pending_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            for future, _, _ in self._pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("Inference pool stopped"))
+            self._pending.clear()
+        # Views into the segments must go before the segments can be closed
+        self._inputs = self._outputs = None
+        for shm in (self._input_shm, self._output_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._input_shm = self._output_shm = None
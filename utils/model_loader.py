@@ -4,14 +4,108 @@ Works even if config.py is missing attributes
 """
 import os
 import json
+import hashlib
 import logging
-import tensorflow as tf
+import threading
+import time
+import uuid
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Set
+
+from utils.inference_backends import create_backend, backend_artifact_path, frozen_model_path, FrozenGraphBackend
+from utils.inference_batcher import InferenceBatcher, InferenceQueueFullError
+from utils.prediction_cache import PredictionCache, hash_tensor
+from utils.tta import TTAStats, build_tta_batch
+from utils.cpu_threads import available_cpus, configure_tensorflow_threads, resolve_threads
+from utils.frozen_model import read_manifest, stale_reason, validate_artifact
+from utils.reduced_precision import to_reduced_precision
+from utils.feature_store import FeatureStoreWriter
+from utils.open_set import OpenSetRejector, REJECTION_MESSAGE
+from utils.cascade import CascadeStats, HealthyGate
 
 logger = logging.getLogger(__name__)
 
+# Loader lifecycle states (TensorFlow is only imported once loading starts)
+STATE_IDLE = 'idle'
+STATE_LOADING = 'loading'
+STATE_READY = 'ready'
+STATE_FAILED = 'failed'
+
+# Class the cascade gate can answer on its own
+HEALTHY_CLASS = 'Healthy'
+
+
+class ModelVersion:
+    """One loaded model version: its inference backend plus load metadata"""
+
+    def __init__(self, version: str, backend, keras_model=None, source: str = None,
+                 load_time: float = None):
+        self.version = version
+        self.backend = backend
+        self.keras_model = keras_model
+        self.source = source
+        self.load_time = load_time
+        self.warmup_ms = None
+        self.warmed_up = False
+        self.smoke_test = None
+        self.activated_at = None
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'backend': self.backend.name if self.backend else None,
+            'source': self.source,
+            'load_time_s': round(self.load_time, 3) if self.load_time is not None else None,
+            'warmup_ms': round(self.warmup_ms, 1) if self.warmup_ms is not None else None,
+            'smoke_test': self.smoke_test,
+            'activated_at': self.activated_at
+        }
+
+
+class ModelRegistry:
+    """
+    Holds recently loaded model versions and the active one. Activation is a
+    single reference swap: requests that already grabbed the old backend
+    finish on it, new requests see the new one.
+    """
+
+    def __init__(self, max_versions: int = 2):
+        self.max_versions = max(1, int(max_versions))
+        self._versions = []
+        self._active = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> Optional[ModelVersion]:
+        return self._active
+
+    def get(self, version: str) -> Optional[ModelVersion]:
+        with self._lock:
+            return next((v for v in self._versions if v.version == version), None)
+
+    def activate(self, model_version: ModelVersion, retire_after: float = 30.0):
+        """Make model_version active and retire versions beyond max_versions"""
+        with self._lock:
+            self._versions = [v for v in self._versions if v.version != model_version.version]
+            self._versions.append(model_version)
+            model_version.activated_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+            self._active = model_version
+            retired = self._versions[:-self.max_versions]
+            self._versions = self._versions[-self.max_versions:]
+
+        for old in retired:
+            # Out-of-process engines hold resources; stop them once in-flight work is done
+            stop = getattr(old.backend, 'stop', None)
+            if callable(stop):
+                timer = threading.Timer(retire_after, stop)
+                timer.daemon = True
+                timer.start()
+
+    def list_versions(self):
+        with self._lock:
+            return [dict(v.describe(), active=v is self._active) for v in self._versions]
+
 
 class SugarcaneModelLoader:
     """Model loader with FALLBACK PATH SUPPORT"""
@@ -19,11 +113,39 @@ class SugarcaneModelLoader:
     def __init__(self, config):
         """Initialize with fallback paths"""
         self.config = config
-        self.model = None
+        self.registry = ModelRegistry(self._get_setting('MODEL_REGISTRY_MAX_VERSIONS', 2))
         self.classes = []
         self.disease_solutions = {}
         self.class_mapping = {}
         self.model_metadata = {}
+        self.batcher = None
+        self.prediction_cache = None
+        if self._get_setting('PREDICTION_CACHE_ENABLED', True):
+            self.prediction_cache = PredictionCache(
+                max_entries=self._get_setting('PREDICTION_CACHE_MAX_ENTRIES', 2048),
+                ttl_seconds=self._get_setting('PREDICTION_CACHE_TTL_SECONDS', 3600)
+            )
+
+        self.tta_stats = TTAStats()
+        self.feature_store = None
+        self.open_set = None
+        self.healthy_gate = None
+        self.cascade_stats = CascadeStats()
+
+        # Readiness tracking for background loading
+        self.state = STATE_IDLE
+        self.load_error = None
+        self.load_time = None
+        self.reload_status = {'state': 'idle'}
+        self._load_thread = None
+        self._reload_lock = threading.Lock()
+        # Cross-worker hot swap: id of the last active-version marker applied here
+        self._applied_marker = None
+        self._sync_thread = None
+
+        # gunicorn --preload: data + model bytes read once in the master
+        self._data_loaded = False
+        self._preloaded_model_content = None
 
         # Get BASE_DIR with fallback
         self.base_dir = self._get_base_dir()
@@ -35,11 +157,17 @@ class SugarcaneModelLoader:
         # Fallback: get from __file__
         return Path(__file__).parent.parent
 
+    def _get_setting(self, name, default=None):
+        """Get setting from Flask config dict or Config class"""
+        if isinstance(self.config, dict):
+            return self.config.get(name, default)
+        return getattr(self.config, name, default)
+
     def _get_path(self, attr_name, default_subpath):
         """Get path with fallback"""
         # Try to get from config
-        if hasattr(self.config, attr_name):
-            path = getattr(self.config, attr_name)
+        path = self._get_setting(attr_name)
+        if path is not None:
             if isinstance(path, str):
                 return Path(path)
             return path
@@ -49,26 +177,402 @@ class SugarcaneModelLoader:
         logger.warning(f"Using fallback path for {attr_name}: {fallback}")
         return fallback
 
+    @property
+    def is_ready(self) -> bool:
+        return self.state == STATE_READY
+
+    # The active model version supplies backend / Keras model / version label
+    @property
+    def backend(self):
+        active = self.registry.active
+        return active.backend if active else None
+
+    @property
+    def model(self):
+        active = self.registry.active
+        return active.keras_model if active else None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        active = self.registry.active
+        return active.version if active else None
+
+    @property
+    def warmed_up(self) -> bool:
+        active = self.registry.active
+        return bool(active and active.warmed_up)
+
+    @property
+    def warmup_ms(self) -> Optional[float]:
+        active = self.registry.active
+        return active.warmup_ms if active else None
+
     def load_all_components(self) -> bool:
         """Load model with fallback path support"""
+        self.state = STATE_LOADING
+        self.load_error = None
+        started = time.perf_counter()
         try:
             logger.info("Starting: Loading disease detection system...")
+            success = self._load_components()
+        except Exception as e:
+            logger.error(f"Loading error: {str(e)}")
+            self.load_error = str(e)
+            success = False
 
-            if not self._load_disease_data():
-                return False
+        self.load_time = time.perf_counter() - started
+        self.state = STATE_READY if success else STATE_FAILED
+        if success:
+            logger.info(f"Success: {len(self.classes)} disease types loaded in {self.load_time:.1f}s!")
+        elif self.load_error is None:
+            self.load_error = 'Model loading failed (see logs)'
+        return success
 
-            if not self._load_model_with_fallbacks():
-                return False
+    def _load_components(self) -> bool:
+        """Data, backend, validation, warm-up, batcher - in that order"""
+        if not self._data_loaded and not self._load_disease_data():
+            return False
 
-            if not self._validate_components():
-                return False
+        model_path, version_name, marker = self._startup_artifact()
+        if version_name is not None:
+            candidate = self._load_version(model_path, version=version_name)
+        else:
+            candidate = self._load_version(model_path, model_content=self._preloaded_model_content)
+        if candidate is None or not self._validate_components(candidate):
+            return False
+        if marker:
+            self._applied_marker = marker.get('id')
 
-            logger.info(f"Success: {len(self.classes)} disease types loaded!")
-            return True
+        self._activate(candidate)
+        self.open_set = self._load_open_set(candidate)
+        self._load_healthy_gate()
+        self._start_batcher()
+        self._start_version_sync()
+        return True
+
+    def _startup_artifact(self) -> Tuple[Path, Optional[str], Optional[Dict[str, Any]]]:
+        """(model file, version name, marker) to load at start-up: a worker (re)started after
+        a hot swap serves the published version; pool model processes are pinned to MODEL_PATH"""
+        marker = self._read_marker() if self._get_setting('MODEL_FOLLOW_ACTIVE_MARKER', True) else None
+        version_dir = self._marker_version_dir(marker)
+        if version_dir is not None:
+            return self._serving_artifact(version_dir), version_dir.name, marker
+        return self._serving_artifact(), None, marker
 
+    def _load_healthy_gate(self):
+        """Cheap first cascade stage (optional)"""
+        gate_path = self._get_path('CASCADE_GATE_PATH', 'models/healthy_gate.npz')
+        if not self._get_setting('CASCADE_ENABLED', False):
+            return
+        if HEALTHY_CLASS not in self.classes or not gate_path.exists():
+            logger.warning(f"Cascade disabled: needs a '{HEALTHY_CLASS}' class and {gate_path}")
+            return
+        if self.open_set is not None:
+            logger.warning("Cascade disabled: the open-set check needs every upload to run the full model")
+            return
+        try:
+            self.healthy_gate = HealthyGate.from_file(
+                gate_path, threshold=self._get_setting('CASCADE_HEALTHY_THRESHOLD')
+            )
         except Exception as e:
-            logger.error(f"Loading error: {str(e)}")
+            logger.warning(f"Cascade disabled: {e}")
+
+    def _load_open_set(self, candidate: ModelVersion) -> Optional[OpenSetRejector]:
+        """Reference index for the non-sugarcane check (needs a backend with embeddings
+        and an index built from the same backbone)"""
+        index_path = self._get_path('OPEN_SET_INDEX_PATH', 'models/open_set_index.npz')
+        if not self._get_setting('OPEN_SET_ENABLED', False) or not index_path.exists():
+            return None
+        if not candidate.backend.supports_embeddings:
+            logger.warning("Open-set check disabled: backend does not expose embeddings")
+            return None
+        try:
+            rejector = OpenSetRejector.from_file(
+                index_path, len(self.classes),
+                mode=self._get_setting('OPEN_SET_MODE'),
+                k=self._get_setting('OPEN_SET_K'),
+                threshold=self._get_setting('OPEN_SET_MIN_SIMILARITY')
+            )
+        except Exception as e:
+            logger.warning(f"Open-set check disabled: {e}")
+            return None
+        built_with = rejector.model_version
+        if built_with is not None and built_with not in self._backbone_versions(candidate.version):
+            logger.warning(f"Open-set check disabled: index was built with model {built_with}, "
+                           f"serving {candidate.version} (rebuild it with scripts/build_open_set_index.py)")
+            return None
+        return rejector
+
+    def _backbone_versions(self, version: str) -> Set[str]:
+        """version plus the versions it was head-retrained from (same backbone, same embeddings)"""
+        versions_dir = self._get_path('MODEL_VERSIONS_DIR', 'models/versions')
+        versions = set()
+        while version and version not in versions:
+            versions.add(version)
+            metadata_path = versions_dir / Path(version).name / 'metadata.json'
+            try:
+                metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                break
+            version = metadata.get('base_model_version')
+        return versions
+
+    def _load_version(self, model_path, version: str = None, model_content: bytes = None) -> Optional[ModelVersion]:
+        """Build, version-stamp and warm up a backend for model_path (not yet active)"""
+        started = time.perf_counter()
+        backend, keras_model = self._load_backend(model_path, model_content)
+        if backend is None:
+            return None
+
+        source = getattr(backend, 'model_path', None) or model_path
+        if version is None:
+            try:
+                version = self._compute_model_version(source)
+            except Exception as e:
+                logger.warning(f"Could not compute model version: {e}")
+                version = Path(source).stem
+
+        candidate = ModelVersion(version, backend, keras_model, source=str(source),
+                                 load_time=time.perf_counter() - started)
+        self._warm_up(candidate)
+        return candidate
+
+    def _activate(self, candidate: ModelVersion):
+        """Atomically make candidate the serving model"""
+        self.registry.activate(candidate, retire_after=self._get_setting('INFERENCE_TIMEOUT_SECONDS', 30))
+        if self.prediction_cache is not None:
+            self.prediction_cache.set_model_version(candidate.version)
+        logger.info(f"Active model version: {candidate.version} ({candidate.backend.name})")
+
+    def reload_model(self, version_name: str = None, background: bool = True,
+                     publish: bool = True) -> Dict[str, Any]:
+        """
+        Hot swap in this worker: load a model version next to the serving one,
+        warm it up, smoke-test it and only then make it active. version_name is
+        a directory under MODEL_VERSIONS_DIR; None re-reads the configured model.
+        With publish, a successful swap is written to the active-version marker
+        and the other gunicorn workers follow within MODEL_VERSION_SYNC_INTERVAL.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return {'accepted': False, 'error': 'A reload is already in progress', **self.reload_status}
+
+        if version_name is not None:
+            version_dir = self._get_path('MODEL_VERSIONS_DIR', 'models/versions') / version_name
+            if not version_dir.is_dir() or Path(version_name).name != version_name:
+                self._reload_lock.release()
+                return {'accepted': False, 'error': f'Unknown model version: {version_name}'}
+            model_path = self._serving_artifact(version_dir)
+        else:
+            model_path = self._serving_artifact()
+
+        self.reload_status = {'state': STATE_LOADING, 'requested': version_name or str(model_path),
+                              'started_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        if background:
+            threading.Thread(target=self._reload, args=(model_path, version_name, publish),
+                             name='model-reload', daemon=True).start()
+        else:
+            self._reload(model_path, version_name, publish)
+        return {'accepted': True, **self.reload_status}
+
+    def _reload(self, model_path: Path, version_name: str = None, publish: bool = False):
+        """Body of reload_model(); always releases the reload lock"""
+        started = time.perf_counter()
+        try:
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"Model file not found: {model_path}")
+            candidate = self._load_version(model_path, version=version_name)
+            if candidate is None:
+                raise RuntimeError("Model loading failed (see logs)")
+
+            try:
+                candidate.smoke_test = self._smoke_test(candidate)
+            except Exception:
+                stop = getattr(candidate.backend, 'stop', None)
+                if callable(stop):
+                    stop()
+                raise
+
+            open_set = self._load_open_set(candidate)
+            previous = self.model_version
+            self._activate(candidate)
+            self.open_set = open_set
+            if self.state != STATE_READY:
+                self.state = STATE_READY
+                self.load_error = None
+                self._start_batcher()
+            self.reload_status = dict(self.reload_status, state='done', previous_version=previous,
+                                      model_version=candidate.version,
+                                      duration_s=round(time.perf_counter() - started, 3))
+            logger.info(f"Model hot-swapped: {previous} -> {candidate.version}")
+            if publish:
+                self._publish_marker(version_name)
+        except Exception as e:
+            logger.error(f"Model reload failed: {str(e)}")
+            self.reload_status = dict(self.reload_status, state=STATE_FAILED, error=str(e),
+                                      duration_s=round(time.perf_counter() - started, 3))
+        finally:
+            self._reload_lock.release()
+
+    def _smoke_test(self, candidate: ModelVersion) -> Dict[str, Any]:
+        """
+        Gate a candidate before activation: probe batch must give one finite
+        probability row per class summing to ~1. Top-1 agreement with the
+        serving version is reported and enforced when MODEL_RELOAD_MIN_AGREEMENT is set.
+        """
+        from utils.model_parity import load_sample_batch, compare_predictions
+
+        probe = load_sample_batch(self._get_setting('MODEL_RELOAD_SAMPLE_DIR'), 8)
+        output = np.asarray(candidate.backend.predict_batch(probe))
+        expected_shape = (len(probe), len(self.classes))
+        if output.shape != expected_shape:
+            raise ValueError(f"Smoke test: output shape {output.shape}, expected {expected_shape}")
+        if not np.all(np.isfinite(output)):
+            raise ValueError("Smoke test: non-finite probabilities")
+        if not np.allclose(output.sum(axis=1), 1.0, atol=1e-2):
+            raise ValueError("Smoke test: probabilities do not sum to 1")
+
+        report = {'passed': True, 'probe_samples': int(len(probe))}
+        active = self.registry.active
+        if active is not None:
+            parity = compare_predictions(np.asarray(active.backend.predict_batch(probe)), output)
+            report['parity_vs_active'] = dict(parity, active_version=active.version)
+            min_agreement = self._get_setting('MODEL_RELOAD_MIN_AGREEMENT')
+            if min_agreement is not None and parity['top1_agreement'] < float(min_agreement):
+                raise ValueError(f"Smoke test: top-1 agreement {parity['top1_agreement']:.2%} "
+                                 f"below MODEL_RELOAD_MIN_AGREEMENT {float(min_agreement):.2%}")
+        return report
+
+    def _marker_path(self) -> Path:
+        """Active-version marker shared by all workers (models/versions/active.json)"""
+        marker = self._get_setting('MODEL_ACTIVE_MARKER')
+        if marker:
+            return Path(marker)
+        return self._get_path('MODEL_VERSIONS_DIR', 'models/versions') / 'active.json'
+
+    def _read_marker(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._marker_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable active-version marker: {e}")
+            return None
+
+    def _marker_version_dir(self, marker: Optional[Dict[str, Any]]) -> Optional[Path]:
+        """Version directory named by the marker (None: configured model)"""
+        version_name = (marker or {}).get('version')
+        if not version_name:
+            return None
+        version_dir = self._get_path('MODEL_VERSIONS_DIR', 'models/versions') / version_name
+        if Path(version_name).name != version_name or not version_dir.is_dir():
+            logger.warning(f"Active-version marker names unknown version: {version_name}")
+            return None
+        return version_dir
+
+    def _publish_marker(self, version_name: Optional[str]):
+        """Atomically record the version this worker swapped to, for the other workers"""
+        marker = {'id': uuid.uuid4().hex, 'version': version_name,
+                  'published_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'pid': os.getpid()}
+        path = self._marker_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(marker, f)
+            os.replace(tmp_path, path)
+            self._applied_marker = marker['id']
+            self.reload_status = dict(self.reload_status, published=True)
+        except Exception as e:
+            logger.error(f"Could not publish active model version (other workers keep theirs): {e}")
+            self.reload_status = dict(self.reload_status, published=False, publish_error=str(e))
+
+    def sync_active_version(self) -> bool:
+        """Apply a marker published by another worker; True if a swap was attempted"""
+        marker = self._read_marker()
+        if not marker or marker.get('id') == self._applied_marker:
             return False
+        version_name = marker.get('version')
+        result = self.reload_model(version_name, background=False, publish=False)
+        if result.get('accepted') or 'in progress' not in result.get('error', ''):
+            # Applied, failed or unknown version: do not retry the same marker forever
+            self._applied_marker = marker.get('id')
+        logger.info(f"Active-version marker {marker.get('id')} ({version_name or 'configured model'}): "
+                    f"{self.reload_status.get('state')}")
+        return bool(result.get('accepted'))
+
+    def _start_version_sync(self):
+        """Poll the active-version marker so a reload received by one worker reaches all"""
+        interval = float(self._get_setting('MODEL_VERSION_SYNC_INTERVAL', 5) or 0)
+        if interval <= 0 or (self._sync_thread is not None and self._sync_thread.is_alive()):
+            return
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.sync_active_version()
+                except Exception as e:
+                    logger.error(f"Model version sync error: {e}")
+
+        self._sync_thread = threading.Thread(target=poll, name='model-version-sync', daemon=True)
+        self._sync_thread.start()
+
+    def get_model_versions(self) -> Dict[str, Any]:
+        """Loaded versions, what is on disk and the last reload outcome"""
+        versions_dir = self._get_path('MODEL_VERSIONS_DIR', 'models/versions')
+        available = sorted(p.name for p in versions_dir.iterdir() if p.is_dir()) if versions_dir.is_dir() else []
+        return {
+            'active_version': self.model_version,
+            'loaded': self.registry.list_versions(),
+            'available': available,
+            'published': self._read_marker(),
+            'reload': self.reload_status
+        }
+
+    def load_in_background(self) -> threading.Thread:
+        """Load everything on a daemon thread so the app can serve immediately"""
+        if self._load_thread is not None and self._load_thread.is_alive():
+            return self._load_thread
+
+        self.state = STATE_LOADING
+        self._load_thread = threading.Thread(
+            target=self.load_all_components, name='model-loader', daemon=True
+        )
+        self._load_thread.start()
+        logger.info("Model loading started in background")
+        return self._load_thread
+
+    def preload(self) -> bool:
+        """
+        Master-process preload for gunicorn preload_app: read the class mapping,
+        disease solutions and (for TFLite/ONNX/frozen graph) the model file into memory so
+        forked workers share those pages copy-on-write. Neither TensorFlow nor
+        any thread is started here - that happens in load_after_fork().
+        """
+        if not self._load_disease_data():
+            return False
+
+        backend_name = self._get_setting('INFERENCE_BACKEND', 'keras')
+        artifact = backend_artifact_path(backend_name, self._get_path('MODEL_DIR', 'models'))
+        if artifact is None:
+            artifact = self._frozen_artifact_path(self._get_path('MODEL_PATH', 'models/Final_Model.keras'))
+        if artifact is not None and artifact.exists():
+            self._preloaded_model_content = artifact.read_bytes()
+            logger.info(f"Preloaded {artifact.name} ({len(self._preloaded_model_content) / 1e6:.1f} MB) in master")
+        else:
+            logger.info("Keras backend: model weights load post-fork (file pages shared via OS cache)")
+        return True
+
+    def load_after_fork(self, background: bool = True):
+        """Worker-side half of preload: build the runtime, warm up, start threads"""
+        # Threads do not survive fork(); drop any handle inherited from the master
+        self._load_thread = None
+        self._sync_thread = None
+        self.batcher = None
+        if background:
+            return self.load_in_background()
+        return self.load_all_components()
 
     def _load_disease_data(self) -> bool:
         """Load disease data with FALLBACK PATHS"""
@@ -109,70 +613,211 @@ class SugarcaneModelLoader:
                 logger.warning(f"Solutions file not found: {solutions_path}")
                 self.disease_solutions = {}
 
+            self._data_loaded = True
             return True
 
         except Exception as e:
             logger.error(f"Data loading error: {str(e)}")
             return False
 
-    def _load_model_with_fallbacks(self) -> bool:
-        """Load model with FALLBACK PATH"""
+    def _serving_artifact(self, version_dir=None) -> Path:
+        """Model file the selected backend loads - from MODEL_DIR/MODEL_PATH or a version directory"""
+        backend_name = self._get_setting('INFERENCE_BACKEND', 'keras')
+        model_dir = Path(version_dir) if version_dir else self._get_path('MODEL_DIR', 'models')
+        artifact = backend_artifact_path(backend_name, model_dir)
+        if artifact is not None:
+            return artifact
+        if version_dir:
+            return Path(version_dir) / 'Final_Model.keras'
+        return self._get_path('MODEL_PATH', 'models/Final_Model.keras')
+
+    def _load_backend(self, model_path, model_content: bytes = None):
+        """Load the inference engine selected by INFERENCE_BACKEND -> (backend, keras_model)"""
+        backend_name = self._get_setting('INFERENCE_BACKEND', 'keras')
+        if self._get_setting('INFERENCE_MODE', 'local') == 'process_pool':
+            return self._start_inference_pool(model_path), None
+
+        try:
+            keras_model = None
+            if backend_name == 'keras':
+                frozen = self._load_frozen_backend(model_path, model_content)
+                if frozen is not None:
+                    return frozen, None
+                keras_model = self._load_model_with_fallbacks(model_path)
+                if keras_model is None:
+                    return None, None
+                keras_model = to_reduced_precision(keras_model, self._get_setting('MODEL_WEIGHT_DTYPE', 'float32'))
+
+            backend = create_backend(
+                backend_name,
+                keras_model=keras_model,
+                num_threads=self._get_backend_threads(backend_name),
+                model_content=model_content,
+                model_path=model_path
+            )
+            logger.info(f"Inference backend: {backend.name}")
+            return backend, keras_model
+        except Exception as e:
+            logger.error(f"Backend loading error ({backend_name}): {str(e)}")
+            return None, None
+
+    def _frozen_artifact_path(self, model_path) -> Optional[Path]:
+        """Inference-only artifact next to the Keras model, if preferred and present"""
+        if not self._get_setting('MODEL_PREFER_FROZEN', True):
+            return None
+        # The frozen graph holds float32 constants; reduced precision needs the Keras path
+        if self._get_setting('MODEL_WEIGHT_DTYPE', 'float32') != 'float32':
+            return None
+        path = frozen_model_path(Path(model_path).parent)
+        if not path.exists():
+            return None
+        # Never serve a graph frozen from an older Final_Model.keras
+        manifest = read_manifest(path)
+        problem = stale_reason(manifest, model_path) if manifest is not None else None
+        if problem:
+            logger.warning(f"Ignoring {path.name}: {problem}; re-run scripts/export_frozen.py")
+            return None
+        return path
+
+    def _load_frozen_backend(self, model_path, model_content: bytes = None):
+        """Fast path: verified frozen graph instead of deserializing the .keras file"""
+        path = self._frozen_artifact_path(model_path)
+        if path is None:
+            return None
+
+        manifest = read_manifest(path)
+        if manifest is None:
+            logger.warning(f"Ignoring {path.name}: manifest missing or invalid")
+            return None
+        try:
+            data = model_content if model_content is not None else path.read_bytes()
+            problem = validate_artifact(data, manifest, self.classes)
+            if problem:
+                logger.warning(f"Ignoring {path.name}: {problem}")
+                return None
+
+            self._init_tensorflow()
+            backend = FrozenGraphBackend(path, manifest['input'], manifest['output'], model_content=data,
+                                         embedding_name=manifest.get('embedding_output'))
+            logger.info(f"Inference backend: {backend.name} (fast path)")
+            return backend
+        except Exception as e:
+            logger.warning(f"Frozen graph loading failed, falling back to Keras model: {e}")
+            return None
+
+    def _init_tensorflow(self):
+        """Import TensorFlow quietly and size its thread pools before first use"""
+        os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+        import tensorflow as tf
+        configure_tensorflow_threads(*self._get_tf_threads())
+        return tf
+
+    def _start_inference_pool(self, model_path):
+        """Delegate inference to long-lived model processes (shared-memory hand-off)"""
+        from utils.inference_pool import InferencePool, _worker_settings
+
+        model_path = Path(model_path)
+        try:
+            pool = InferencePool(
+                dict(_worker_settings(self.config), MODEL_PATH=str(model_path), MODEL_DIR=str(model_path.parent),
+                     MODEL_PROCESS_COUNT=self._model_process_count()),
+                num_classes=len(self.classes),
+                num_workers=self._get_setting('INFERENCE_POOL_WORKERS', 2),
+                num_slots=self._get_setting('INFERENCE_POOL_SLOTS', 16),
+                acquire_timeout=self._get_setting('INFERENCE_POOL_ACQUIRE_TIMEOUT', 0.5)
+            )
+            pool.start(timeout=self._get_setting('INFERENCE_POOL_START_TIMEOUT', 300))
+            logger.info(f"Inference backend: {pool.name}")
+            return pool
+        except Exception as e:
+            logger.error(f"Inference pool error: {str(e)}")
+            return None
+
+    def _model_process_count(self) -> int:
+        """Processes on this host that each run a model and share the CPU"""
+        count = self._get_setting('MODEL_PROCESS_COUNT')
+        if count:
+            return int(count)
+        count = self._get_setting('WEB_WORKERS', 1)
+        if self._get_setting('INFERENCE_MODE', 'local') == 'process_pool':
+            count *= self._get_setting('INFERENCE_POOL_WORKERS', 2)
+        return max(1, count)
+
+    def _get_tf_threads(self) -> Tuple[int, int]:
+        """(intra-op, inter-op) thread counts for this model process"""
+        processes = self._model_process_count()
+        return (resolve_threads(self._get_setting('TF_INTRA_OP_THREADS', 'auto'), processes),
+                resolve_threads(self._get_setting('TF_INTER_OP_THREADS', 1), processes))
+
+    def _get_backend_threads(self, backend_name: str) -> int:
+        """Thread count for the selected non-Keras engine"""
+        if backend_name == 'onnx':
+            return self._get_setting('ONNX_INTRA_OP_THREADS', 2)
+        return self._get_setting('TFLITE_NUM_THREADS', 2)
+
+    def _load_model_with_fallbacks(self, model_path=None):
+        """Load Keras model with FALLBACK PATH - returns the model or None"""
         try:
             logger.info("Loading AI model...")
 
             # Get model path with fallback
-            model_path = self._get_path(
-                'MODEL_PATH',
-                'models/Final_Model.keras'
-            )
+            if model_path is None:
+                model_path = self._get_path(
+                    'MODEL_PATH',
+                    'models/Final_Model.keras'
+                )
 
             if not os.path.exists(model_path):
                 logger.error(f"Model file not found: {model_path}")
-                return False
+                return None
 
-            os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+            tf = self._init_tensorflow()
 
             # Try loading
             try:
-                self.model = tf.keras.models.load_model(model_path)
+                model = tf.keras.models.load_model(model_path)
                 logger.info("Model loaded successfully!")
-                return True
+                return model
             except Exception as e1:
                 logger.warning(f"Primary loading failed: {e1}")
 
                 try:
-                    self.model = self._create_model_architecture()
-                    self.model.load_weights(model_path)
+                    model = self._create_model_architecture()
+                    model.load_weights(model_path)
                     logger.info("Model loaded via architecture + weights!")
-                    return True
+                    return model
                 except Exception as e2:
                     logger.warning(f"Architecture method failed: {e2}")
 
                     try:
-                        self.model = tf.keras.models.load_model(model_path, compile=False)
-                        self.model.compile(
+                        model = tf.keras.models.load_model(model_path, compile=False)
+                        model.compile(
                             optimizer='adam',
                             loss='categorical_crossentropy',
                             metrics=['accuracy']
                         )
                         logger.info("Model loaded via recompile!")
-                        return True
+                        return model
                     except Exception as e3:
                         logger.error(f"All loading methods failed")
-                        return False
+                        return None
 
         except Exception as e:
             logger.error(f"Model loading error: {str(e)}")
-            return False
+            return None
 
     def _create_model_architecture(self):
         """Create model architecture"""
         try:
+            import tensorflow as tf
+
             input_shape = (128, 128, 3)
+            # weights=None: load_weights() overwrites every layer anyway, and
+            # fetching ImageNet weights needs network access at start-up
             base_model = tf.keras.applications.MobileNetV2(
                 input_shape=input_shape,
                 include_top=False,
-                weights='imagenet'
+                weights=None
             )
             base_model.trainable = False
 
@@ -194,9 +839,9 @@ class SugarcaneModelLoader:
             logger.error(f"Architecture error: {str(e)}")
             return None
 
-    def _validate_components(self) -> bool:
+    def _validate_components(self, candidate: ModelVersion) -> bool:
         """Validate components"""
-        if self.model is None:
+        if candidate.backend is None:
             logger.error("Model not loaded")
             return False
         if not self.classes:
@@ -204,10 +849,153 @@ class SugarcaneModelLoader:
             return False
         return True
 
+    def _warm_up(self, candidate: ModelVersion):
+        """Run warm-up batches of the common sizes so the first request is fast"""
+        try:
+            candidate.warmup_ms = candidate.backend.warm_up(self._get_setting('SERVING_WARMUP_BATCH_SIZES', [1]))
+            candidate.warmed_up = True
+        except Exception as e:
+            logger.warning(f"Warm-up failed: {e}")
+
+    def _compute_model_version(self, model_file) -> str:
+        """Model file name + short content hash, e.g. Final_Model-3f2a9c1b7d4e"""
+        model_file = Path(model_file)
+        digest = hashlib.sha256()
+        with open(model_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return f"{model_file.stem}-{digest.hexdigest()[:12]}"
+
+    def get_readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Readiness = model loaded + warm-up inference done + inference queue
+        below READINESS_MAX_QUEUE_DEPTH. Returns (ready, details).
+        """
+        max_depth = self._get_setting('READINESS_MAX_QUEUE_DEPTH', 32)
+        queue_depth = self.batcher.queue_depth if self.batcher else 0
+        checks = {
+            'model_loaded': self.state == STATE_READY and self.backend is not None,
+            'warmed_up': self.warmed_up,
+            'queue_below_threshold': queue_depth < max_depth
+        }
+        return all(checks.values()), {
+            'state': self.state,
+            'checks': checks,
+            'queue_depth': queue_depth,
+            'max_queue_depth': max_depth,
+            'load_time_s': round(self.load_time, 3) if self.load_time is not None else None,
+            'warmup_ms': round(self.warmup_ms, 1) if self.warmup_ms is not None else None,
+            'model_version': self.model_version,
+            'backend': self.backend.name if self.backend else None,
+            'error': self.load_error
+        }
+
+    def _start_batcher(self):
+        """Start the micro-batching queue in front of the model (if enabled)"""
+        if not self._get_setting('INFERENCE_BATCHING_ENABLED', True):
+            logger.info("Inference batching disabled")
+            return
+
+        if self.batcher is not None:
+            self.batcher.stop()
+
+        self.batcher = InferenceBatcher(
+            self._serve_batch,
+            max_batch_size=self._get_setting('INFERENCE_BATCH_MAX_SIZE', 8),
+            max_wait_ms=self._get_setting('INFERENCE_BATCH_MAX_WAIT_MS', 5),
+            max_queue_size=self._get_setting('INFERENCE_QUEUE_MAX_SIZE', 64)
+        )
+        self.batcher.start()
+
+    def _predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Run one forward pass on a (N, 128, 128, 3) batch"""
+        return self.backend.predict_batch(batch)
+
+    def _serve_batch(self, batch: np.ndarray):
+        """Forward pass for request traffic: probabilities, plus embeddings when they are being stored"""
+        backend = self.backend
+        if self._embeddings_wanted(backend):
+            return backend.predict_with_embeddings(batch)
+        return backend.predict_batch(batch)
+
+    def _embeddings_wanted(self, backend) -> bool:
+        return (backend is not None and backend.supports_embeddings
+                and (self.open_set is not None or self._feature_store_wanted()))
+
+    def _feature_store_wanted(self) -> bool:
+        return ((self.feature_store is None or not self.feature_store.failed)
+                and self._get_setting('FEATURE_STORE_ENABLED', False))
+
+    def predict_probabilities(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (N, 128, 128, 3) batch via the serving path"""
+        return self._predict_batch(batch)
+
+    def predict_with_embeddings(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(probabilities, pooled backbone embeddings) for a batch from one forward pass"""
+        return self.backend.predict_with_embeddings(batch)
+
+    def _run_inference(self, processed_image: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Probability vector (and embedding, if produced) for a single (1, 128, 128, 3) image"""
+        if self.batcher is not None and self.batcher.is_running:
+            future = self.batcher.submit(processed_image[0])
+            output = future.result(timeout=self._get_setting('INFERENCE_TIMEOUT_SECONDS', 30))
+        else:
+            output = self._serve_batch(processed_image)
+            output = tuple(part[0] for part in output) if isinstance(output, tuple) else output[0]
+        if isinstance(output, tuple):
+            return output[0], output[1]
+        return output, None
+
+    def _store_embedding(self, embedding: np.ndarray, key: Optional[str], result: Dict[str, Any]) -> bool:
+        """Queue a processed image's embedding for the background store writer; False if dropped"""
+        if self.feature_store is None:
+            self.feature_store = FeatureStoreWriter(
+                self._get_path('FEATURE_STORE_DIR', 'data/feature_store'),
+                max_rows=self._get_setting('FEATURE_STORE_MAX_ROWS', None)
+            )
+        return self.feature_store.submit(embedding, key=key, metadata={
+            'model_version': result.get('model_version'),
+            'predicted_class': result.get('predicted_class'),
+            'confidence': round(result.get('confidence', 0.0), 4)
+        })
+
+    def get_inference_stats(self) -> Dict[str, Any]:
+        """Inference metrics for monitoring"""
+        return {
+            'model_loaded': self.backend is not None,
+            'state': self.state,
+            'backend': self.backend.describe() if self.backend else None,
+            'batching': self.batcher.get_metrics() if self.batcher else {'running': False},
+            'feature_store': self.feature_store.get_stats() if self.feature_store else None,
+            'open_set': self.open_set.describe() if self.open_set else None,
+            'cascade': (dict(self.cascade_stats.get_stats(), threshold=self.healthy_gate.threshold)
+                        if self.healthy_gate else None),
+            'threads': dict(zip(('tf_intra_op', 'tf_inter_op'), self._get_tf_threads()),
+                            available_cpus=available_cpus(), model_processes=self._model_process_count()),
+            'tta': dict(self.tta_stats.get_stats(), enabled=self._get_setting('TTA_ENABLED', True),
+                        confidence_threshold=self._get_setting('TTA_CONFIDENCE_THRESHOLD', 0.7)),
+            'prediction_cache': self.prediction_cache.get_stats() if self.prediction_cache else None
+        }
+
+    def get_cached_prediction(self, upload_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached result for a raw-upload hash (see prediction_cache.hash_upload)"""
+        if self.prediction_cache is None or not self.is_ready:
+            return None
+        return self.prediction_cache.get(upload_key)
+
+    def cache_prediction(self, upload_key: Optional[str], result: Dict[str, Any]):
+        """Remember a result under its raw-upload hash"""
+        if self.prediction_cache is not None:
+            self.prediction_cache.put(upload_key, result)
+
     def predict(self, processed_image: np.ndarray) -> Optional[Dict[str, Any]]:
-        """Make prediction"""
-        if self.model is None:
+        """Make prediction (served from the tensor-hash cache when possible).
+        The result is labelled with the version active at request start and is
+        not cached if a hot swap happened while it was computed."""
+        active = self.registry.active
+        if active is None:
             return None
+        model_version = active.version
 
         try:
             expected_shape = (1, 128, 128, 3)
@@ -215,24 +1003,135 @@ class SugarcaneModelLoader:
                 logger.error(f"Invalid shape: {processed_image.shape}")
                 return None
 
-            predictions = self.model.predict(processed_image, verbose=0)[0]
-            predicted_idx = np.argmax(predictions)
-            confidence = float(predictions[predicted_idx])
-            predicted_class = self.classes[predicted_idx]
-
-            return {
-                'success': True,
-                'predicted_class': predicted_class,
-                'confidence': confidence,
-                'all_predictions': predictions.tolist(),
-                'class_probabilities': {
-                    self.classes[i]: float(predictions[i])
-                    for i in range(len(self.classes))
-                }
-            }
+            tensor_key = None
+            if self.prediction_cache is not None or self._embeddings_wanted(self.backend):
+                tensor_key = hash_tensor(processed_image)
+            if self.prediction_cache is not None:
+                cached = self.prediction_cache.get(tensor_key)
+                if cached is not None:
+                    return cached
+
+            result = self._predict_uncached(processed_image, tensor_key, model_version)
+            if self.prediction_cache is not None and self.model_version == model_version:
+                self.prediction_cache.put(tensor_key, result)
+            return result
+        except InferenceQueueFullError as e:
+            logger.warning(f"Inference busy: {e}")
+            return {'success': False, 'error': str(e), 'busy': True}
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
+    def _predict_uncached(self, processed_image: np.ndarray, tensor_key: str = None,
+                          model_version: str = None) -> Dict[str, Any]:
+        """Cascade: confident Healthy from the gate short-circuits, the rest runs the full classifier.
+        With the open-set check on nothing short-circuits: the check needs the CNN embedding."""
+        gate = self.healthy_gate
+        if gate is None or self.open_set is not None:
+            return self._predict_full(processed_image, tensor_key, model_version)
+
+        started = time.perf_counter()
+        healthy_probability = float(gate.probability_healthy(processed_image)[0])
+        gate_ms = (time.perf_counter() - started) * 1000
+        cascade = {'gate_healthy_probability': round(healthy_probability, 4), 'gate_ms': round(gate_ms, 3)}
+
+        if healthy_probability >= gate.threshold:
+            self.cascade_stats.record(gate_ms)
+            return self._gate_result(healthy_probability, dict(cascade, stage='gate'), model_version)
+
+        started = time.perf_counter()
+        result = self._predict_full(processed_image, tensor_key, model_version)
+        full_ms = (time.perf_counter() - started) * 1000
+        self.cascade_stats.record(gate_ms, full_ms)
+        result['cascade'] = dict(cascade, stage='full', full_ms=round(full_ms, 3))
+        return result
+
+    def _gate_result(self, healthy_probability: float, cascade: Dict[str, Any],
+                     model_version: str = None) -> Dict[str, Any]:
+        """Healthy prediction answered by the gate alone; the other classes share the remaining
+        probability evenly (probability_source says so)"""
+        predictions = np.full(len(self.classes), (1.0 - healthy_probability) / max(len(self.classes) - 1, 1))
+        predictions[self.classes.index(HEALTHY_CLASS)] = healthy_probability
+        return {
+            'success': True,
+            'model_version': model_version or self.model_version,
+            'predicted_class': HEALTHY_CLASS,
+            'confidence': healthy_probability,
+            'all_predictions': predictions.tolist(),
+            'class_probabilities': dict(zip(self.classes, predictions.tolist())),
+            'tta': False,
+            'single_pass_confidence': healthy_probability,
+            'probability_source': 'healthy_gate',
+            'cascade': cascade
+        }
+
+    def _predict_full(self, processed_image: np.ndarray, tensor_key: str = None,
+                      model_version: str = None) -> Dict[str, Any]:
+        """Run inference and build the prediction result"""
+        model_version = model_version or self.model_version
+        predictions, embedding = self._run_inference(processed_image)
+        if embedding is not None and self.open_set is not None:
+            rejection = self._check_open_set(embedding, model_version)
+            if rejection is not None:
+                return rejection
+
+        tta_used = False
+        single_pass_confidence = float(np.max(predictions))
+
+        if (self._get_setting('TTA_ENABLED', True)
+                and single_pass_confidence < self._get_setting('TTA_CONFIDENCE_THRESHOLD', 0.7)):
+            predictions = self._predict_with_tta(processed_image[0], predictions)
+            tta_used = True
+        else:
+            self.tta_stats.record(False)
+
+        predicted_idx = np.argmax(predictions)
+        confidence = float(predictions[predicted_idx])
+        predicted_class = self.classes[predicted_idx]
+
+        result = {
+            'success': True,
+            'model_version': model_version,
+            'predicted_class': predicted_class,
+            'confidence': confidence,
+            'all_predictions': predictions.tolist(),
+            'class_probabilities': {
+                self.classes[i]: float(predictions[i])
+                for i in range(len(self.classes))
+            },
+            'tta': tta_used,
+            'single_pass_confidence': single_pass_confidence
+        }
+        if embedding is not None and self._feature_store_wanted():
+            result['embedding_stored'] = self._store_embedding(embedding, tensor_key, result)
+        return result
+
+    def _check_open_set(self, embedding: np.ndarray, model_version: str = None) -> Optional[Dict[str, Any]]:
+        """Failure result for a non-sugarcane image, None when it may be diagnosed"""
+        try:
+            rejection = self.open_set.check(embedding)
+        except Exception as e:
+            logger.warning(f"Open-set check disabled: {e}")
+            self.open_set = None
+            return None
+        if rejection is None:
+            return None
+        logger.info(f"Open-set rejection: similarity {rejection['score']} < {rejection['threshold']}")
+        return {
+            'success': False,
+            'error': REJECTION_MESSAGE['english'],
+            'message': dict(REJECTION_MESSAGE),
+            'model_version': model_version or self.model_version,
+            'open_set': rejection
+        }
+
+    def _predict_with_tta(self, image: np.ndarray, first_pass: np.ndarray) -> np.ndarray:
+        """Low-confidence escalation: one batched pass over augmented views, averaged with the first pass"""
+        started = time.perf_counter()
+        augmented = self._predict_batch(build_tta_batch(image))
+        averaged = (augmented.sum(axis=0) + first_pass) / (len(augmented) + 1)
+        self.tta_stats.record(True, (time.perf_counter() - started) * 1000)
+        return averaged
+
     def get_disease_info(self, disease_name: str) -> Dict[str, Any]:
         """Get complete disease information"""
         disease_info = self.disease_solutions.get(disease_name, {}).copy()
@@ -252,8 +1151,8 @@ def get_model_loader(config=None):
         _model_loader = SugarcaneModelLoader(config)
     return _model_loader
 
-def initialize_model_and_data(config=None):
-    """Initialize model and data"""
+def initialize_model_and_data(config=None, background=False):
+    """Initialize model and data (optionally on a background thread)"""
     if config is None:
         try:
             from flask import current_app
@@ -263,5 +1162,15 @@ def initialize_model_and_data(config=None):
 
     loader = get_model_loader(config)
     if loader:
+        if background:
+            loader.load_in_background()
+            return True
         return loader.load_all_components()
     return False
+
+def preload_model_and_data(config):
+    """Preload shared data in the gunicorn master (see gunicorn.conf.py)"""
+    loader = get_model_loader(config)
+    if loader:
+        return loader.preload()
+    return False
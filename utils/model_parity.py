@@ -0,0 +1,103 @@
+"""
+Model Parity Helpers
+Shared by the offline converters/benchmarks to compare an inference path
+against the reference Keras model on a sample of leaf photos
+"""
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp', '.gif'}
+
+
+def find_sample_images(sample_dir, limit: int = None) -> List[Path]:
+    """All image files under sample_dir (sorted, optionally limited)"""
+    paths = sorted(p for p in Path(sample_dir).rglob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    return paths[:limit] if limit else paths
+
+
+def load_sample_batch(sample_dir, count: int, processor=None) -> np.ndarray:
+    """
+    Preprocess up to `count` photos from sample_dir into a (N, 128, 128, 3) batch.
+    Falls back to synthetic inputs when no folder is given or it has no images.
+    """
+    if sample_dir:
+        if processor is None:
+            from config import Config
+            from utils.image_processor import FarmerFriendlyImageProcessor
+            processor = FarmerFriendlyImageProcessor(Config)
+
+        paths = find_sample_images(sample_dir, count)
+        batch, errors = processor.process_images_for_prediction(str(path) for path in paths)
+        usable = [index for index, error in enumerate(errors) if error is None]
+        if usable:
+            return batch if len(usable) == len(batch) else batch[usable]
+        logger.warning(f"No usable images in {sample_dir}, using synthetic samples")
+
+    logger.warning("Parity on synthetic inputs only - pass a sample folder of real leaf photos")
+    rng = np.random.default_rng(0)
+    return rng.uniform(-1, 1, size=(count, 128, 128, 3)).astype(np.float32)
+
+
+def load_labeled_samples(sample_dir, classes: List[str], per_class: int = None,
+                         processor=None) -> Tuple[np.ndarray, np.ndarray, List[Path]]:
+    """
+    Labeled sample in class-folder layout (sample_dir/<class name>/*.jpg) ->
+    (N, 128, 128, 3) batch, class indices, image paths. Folders whose name
+    is not in classes are skipped.
+    """
+    if processor is None:
+        from config import Config
+        from utils.image_processor import FarmerFriendlyImageProcessor
+        processor = FarmerFriendlyImageProcessor(Config)
+
+    labels, paths = [], []
+    for class_dir in sorted(p for p in Path(sample_dir).iterdir() if p.is_dir()):
+        if class_dir.name not in classes:
+            logger.warning(f"Skipping folder {class_dir.name}: not a known class")
+            continue
+        for path in find_sample_images(class_dir, per_class):
+            labels.append(classes.index(class_dir.name))
+            paths.append(path)
+
+    batch, errors = processor.process_images_for_prediction(str(path) for path in paths)
+    usable = [index for index, error in enumerate(errors) if error is None]
+    if not usable:
+        raise ValueError(f"No labeled images found under {sample_dir}")
+    return batch[usable], np.array(labels)[usable], [paths[index] for index in usable]
+
+
+def accuracy(probabilities: np.ndarray, labels: np.ndarray) -> float:
+    """Top-1 accuracy of (N, classes) probabilities against class indices"""
+    return float(np.mean(probabilities.argmax(axis=1) == labels))
+
+
+def run_in_batches(predict_fn: Callable[[np.ndarray], np.ndarray], samples: np.ndarray,
+                   batch_size: int = 8) -> np.ndarray:
+    """Run predict_fn over samples in fixed-size chunks"""
+    return np.concatenate([
+        predict_fn(samples[start:start + batch_size])
+        for start in range(0, len(samples), batch_size)
+    ])
+
+
+def compare_predictions(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, Any]:
+    """Top-1 agreement and probability deltas between two (N, classes) outputs"""
+    deltas = np.abs(reference - candidate)
+    return {
+        'samples': int(len(reference)),
+        'top1_agreement': float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1))),
+        'max_probability_delta': float(deltas.max()) if deltas.size else 0.0,
+        'mean_probability_delta': float(deltas.mean()) if deltas.size else 0.0
+    }
+
+
+def format_parity(name: str, report: Dict[str, Any]) -> str:
+    """One-line human readable parity summary"""
+    return (f"{name}: top-1 agreement {report['top1_agreement']:.2%}, "
+            f"max probability delta {report['max_probability_delta']:.4f} "
+            f"over {report['samples']} samples")
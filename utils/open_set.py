@@ -0,0 +1,164 @@
+"""
+Open-Set Rejection
+Flags uploads that are not sugarcane leaves (selfies, animals, documents) by
+comparing the image's pooled backbone embedding with an in-memory index of
+reference embeddings from the known classes: cosine similarity to the k
+nearest references (or to the class centroids) below a calibrated threshold
+means out-of-distribution. One matrix product per batch, a few ms at most.
+
+The index is an .npz built by scripts/build_open_set_index.py. It records the
+model version its embeddings came from; the loader only uses it with a model
+that shares that backbone.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OPEN_SET_MODES = ('knn', 'centroid')
+
+REJECTION_MESSAGE = {
+    'marathi': 'हा फोटो ऊसाच्या पानाचा दिसत नाही. कृपया ऊसाच्या पानाचा जवळून स्पष्ट फोटो घ्या.',
+    'english': 'This photo does not look like a sugarcane leaf. Please take a clear close-up photo of a sugarcane leaf.'
+}
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def class_centroids(embeddings: np.ndarray, labels: np.ndarray, num_classes: int) -> np.ndarray:
+    """Normalized mean direction per class (zero row for classes without references)"""
+    normalized = l2_normalize(embeddings)
+    centroids = np.zeros((num_classes, normalized.shape[1]), dtype=np.float32)
+    np.add.at(centroids, labels, normalized)
+    return l2_normalize(centroids)
+
+
+def _top_k_mean(similarities: np.ndarray, k: int) -> np.ndarray:
+    k = max(1, min(k, similarities.shape[1]))
+    return np.partition(similarities, -k, axis=1)[:, -k:].mean(axis=1)
+
+
+def knn_similarity(queries: np.ndarray, references: np.ndarray, k: int) -> np.ndarray:
+    """Mean cosine similarity of each (normalized) query to its k most similar references"""
+    return _top_k_mean(queries @ references.T, k)
+
+
+def calibrate_threshold(references: np.ndarray, labels: np.ndarray, num_classes: int,
+                        mode: str = 'knn', k: int = 5, percentile: float = 1.0,
+                        chunk_size: int = 1024) -> float:
+    """
+    Threshold = given percentile of in-distribution scores, computed
+    leave-one-out over the references themselves
+    """
+    references = l2_normalize(references)
+    if mode == 'centroid':
+        scores = (references @ class_centroids(references, labels, num_classes).T).max(axis=1)
+        return float(np.percentile(scores, percentile))
+
+    scores = []
+    for start in range(0, len(references), chunk_size):
+        similarities = references[start:start + chunk_size] @ references.T
+        rows = np.arange(len(similarities))
+        similarities[rows, rows + start] = -np.inf
+        scores.append(_top_k_mean(similarities, min(k, len(references) - 1)))
+    return float(np.percentile(np.concatenate(scores), percentile))
+
+
+class OpenSetRejector:
+    """Cosine-similarity out-of-distribution check on backbone embeddings"""
+
+    def __init__(self, references: np.ndarray, labels: np.ndarray, num_classes: int,
+                 threshold: float, mode: str = 'knn', k: int = 5, model_version: str = None):
+        if mode not in OPEN_SET_MODES:
+            raise ValueError(f"Unknown open-set mode '{mode}', expected one of {OPEN_SET_MODES}")
+        self.mode = mode
+        self.k = int(k)
+        self.threshold = float(threshold)
+        self.model_version = model_version
+        self.references = np.ascontiguousarray(l2_normalize(references))
+        self.labels = np.asarray(labels, dtype=int)
+        self.centroids = class_centroids(self.references, self.labels, num_classes)
+        self.dim = self.references.shape[1]
+        self._stats_lock = threading.Lock()
+        self._check_ms = deque(maxlen=1000)
+        self.checked_total = 0
+        self.rejected_total = 0
+
+    @classmethod
+    def from_file(cls, path, num_classes: int, mode: str = None, k: int = None,
+                  threshold: float = None) -> 'OpenSetRejector':
+        """Load an index written by save(); explicit arguments override stored settings"""
+        with np.load(path, allow_pickle=False) as data:
+            mode = mode or str(data['mode'])
+            stored_threshold = data['threshold_centroid'] if mode == 'centroid' else data['threshold_knn']
+            model_version = str(data['model_version']) if 'model_version' in data.files else 'None'
+            rejector = cls(data['embeddings'].astype(np.float32), data['labels'], num_classes,
+                           threshold=threshold if threshold is not None else float(stored_threshold),
+                           mode=mode, k=k or int(data['k']),
+                           model_version=None if model_version == 'None' else model_version)
+        logger.info(f"Open-set index loaded: {len(rejector.references)} references, "
+                    f"{rejector.mode}, threshold {rejector.threshold:.3f}, model {rejector.model_version}")
+        return rejector
+
+    @staticmethod
+    def save(path, embeddings: np.ndarray, labels: np.ndarray, num_classes: int, classes: List[str],
+             k: int = 5, percentile: float = 1.0, mode: str = 'knn', model_version: str = None) -> Dict[str, Any]:
+        """Write an index with thresholds calibrated for both modes"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        labels = np.asarray(labels, dtype=int)
+        thresholds = {
+            f"threshold_{m}": calibrate_threshold(embeddings, labels, num_classes, m, k, percentile)
+            for m in OPEN_SET_MODES
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, embeddings=embeddings.astype(np.float16), labels=labels, k=k, mode=mode,
+                 classes=np.array(classes), model_version=str(model_version), percentile=percentile,
+                 **thresholds)
+        return thresholds
+
+    def scores(self, embeddings: np.ndarray) -> np.ndarray:
+        """In-distribution score per embedding (higher = more like the references)"""
+        queries = l2_normalize(np.atleast_2d(embeddings))
+        if self.mode == 'centroid':
+            return (queries @ self.centroids.T).max(axis=1)
+        return knn_similarity(queries, self.references, self.k)
+
+    def check(self, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Rejection details for one embedding, or None when it is in-distribution"""
+        started = time.perf_counter()
+        score = float(self.scores(embedding)[0])
+        rejected = score < self.threshold
+        with self._stats_lock:
+            self.checked_total += 1
+            self.rejected_total += int(rejected)
+            self._check_ms.append((time.perf_counter() - started) * 1000)
+        if not rejected:
+            return None
+        return {'score': round(score, 4), 'threshold': round(self.threshold, 4), 'mode': self.mode}
+
+    def describe(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            check_ms = np.array(self._check_ms) if self._check_ms else None
+            checked, rejected = self.checked_total, self.rejected_total
+        return {
+            'mode': self.mode,
+            'k': self.k,
+            'threshold': self.threshold,
+            'model_version': self.model_version,
+            'references': int(len(self.references)),
+            'dim': int(self.dim),
+            'checked_total': checked,
+            'rejected_total': rejected,
+            'check_ms_mean': float(check_ms.mean()) if check_ms is not None else 0.0,
+            'check_ms_p95': float(np.percentile(check_ms, 95)) if check_ms is not None else 0.0
+        }
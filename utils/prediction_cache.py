@@ -0,0 +1,120 @@
+"""
+Content-Addressed Prediction Cache
+LRU + TTL cache of prediction results keyed by a hash of the raw upload
+bytes and, separately, by a hash of the preprocessed 128x128 tensor so
+re-encoded copies of the same photo also hit. Cleared whenever the model
+version changes.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 256 * 1024
+
+
+def hash_upload(image_file) -> Optional[str]:
+    """Hash raw upload bytes from a file-like object (rewinds it) or bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(image_file, (bytes, bytearray, memoryview)):
+        digest.update(image_file)
+        return 'raw:' + digest.hexdigest()
+
+    stream = getattr(image_file, 'stream', image_file)
+    if not hasattr(stream, 'read') or not hasattr(stream, 'seek'):
+        return None
+    start = stream.tell()
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(start)
+    return 'raw:' + digest.hexdigest()
+
+
+def hash_tensor(processed_image: np.ndarray) -> str:
+    """
+    Hash the preprocessed [-1, 1] tensor after quantizing back to 8-bit
+    levels, so tiny float differences between decoders do not change the key.
+    """
+    quantized = np.rint((processed_image + 1.0) * 127.5).astype(np.uint8)
+    return 'tensor:' + hashlib.blake2b(quantized.tobytes(), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits_raw': 0, 'hits_tensor': 0, 'misses': 0,
+                       'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def set_model_version(self, version):
+        """Drop every entry if the model changed"""
+        with self._lock:
+            if version != self.model_version:
+                if self._entries:
+                    logger.info(f"Prediction cache invalidated ({self.model_version} -> {version})")
+                    self._stats['invalidations'] += 1
+                self._entries.clear()
+                self.model_version = version
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            stored_at, value = entry
+            if now - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits_tensor' if key.startswith('tensor:') else 'hits_raw'] += 1
+        result = dict(value)
+        result['cached'] = True
+        return result
+
+    def put(self, key: Optional[str], value: Dict[str, Any]):
+        if key is None or not value or not value.get('success'):
+            return
+        with self._lock:
+            # Computed by a model that has been swapped out since: never serve it
+            version = value.get('model_version')
+            if self.model_version is not None and version is not None and version != self.model_version:
+                return
+            self._entries[key] = (time.monotonic(), dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits_raw'] + stats['hits_tensor'] + stats['misses']
+        stats.update({
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'model_version': self.model_version,
+            'hit_rate': ((stats['hits_raw'] + stats['hits_tensor']) / lookups) if lookups else 0.0
+        })
+        return stats
@@ -0,0 +1,82 @@
+"""
+Reduced-Precision Weight Storage
+Rebuilds the Keras model from its config under a float16 / bfloat16 dtype
+policy and copies the float32 weights in (cast on assignment), halving the
+weight memory each worker holds. The classifier head stays float32 so the
+softmax is computed at full precision.
+"""
+import copy
+import logging
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_DTYPES = ('float32', 'float16', 'bfloat16')
+
+# CPU flags with native bfloat16 arithmetic; elsewhere TF emulates it
+_BF16_CPU_FLAGS = ('avx512_bf16', 'amx_bf16')
+
+
+def cpu_supports_bfloat16() -> bool:
+    try:
+        flags = Path('/proc/cpuinfo').read_text()
+    except OSError:
+        return False
+    return any(flag in flags for flag in _BF16_CPU_FLAGS)
+
+
+def _set_layer_dtype(layer_config: Dict[str, Any], dtype: str):
+    """Set a layer's dtype, whether stored as a name or a serialized policy"""
+    current = layer_config.get('dtype')
+    if isinstance(current, dict) and isinstance(current.get('config'), dict):
+        current['config']['name'] = dtype
+    else:
+        layer_config['dtype'] = dtype
+
+
+def apply_dtype_policy(model_config: Dict[str, Any], dtype: str, keep_output_float32: bool = True) -> Dict[str, Any]:
+    """
+    Copy of a Keras model config with every layer (including layers of nested
+    models) set to dtype. Input layers keep float32 inputs; with
+    keep_output_float32 the last top-level layer stays float32.
+    """
+    model_config = copy.deepcopy(model_config)
+
+    def visit(layers):
+        for layer in layers:
+            config = layer.get('config', {})
+            if layer.get('class_name') != 'InputLayer' and 'dtype' in config:
+                _set_layer_dtype(config, dtype)
+            if isinstance(config.get('layers'), list):
+                visit(config['layers'])
+
+    layers = model_config.get('layers', [])
+    visit(layers)
+    if keep_output_float32 and layers:
+        _set_layer_dtype(layers[-1].setdefault('config', {}), 'float32')
+    return model_config
+
+
+def weight_bytes(model) -> int:
+    """Bytes held by the model's weight variables"""
+    import tensorflow as tf
+    return sum(int(np.prod(w.shape)) * tf.as_dtype(w.dtype).size for w in model.weights)
+
+
+def to_reduced_precision(model, dtype: str):
+    """float32 Keras model -> same architecture with weights stored as dtype"""
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"Unknown weight dtype '{dtype}', expected one of {WEIGHT_DTYPES}")
+    if dtype == 'float32':
+        return model
+    if dtype == 'bfloat16' and not cpu_supports_bfloat16():
+        logger.warning("CPU has no native bfloat16 support: weights are stored compactly but math is emulated")
+
+    reduced = model.__class__.from_config(apply_dtype_policy(model.get_config(), dtype))
+    reduced.set_weights(model.get_weights())
+    logger.info(f"Weights stored as {dtype}: {weight_bytes(model) / 1e6:.1f} MB -> "
+                f"{weight_bytes(reduced) / 1e6:.1f} MB")
+    return reduced
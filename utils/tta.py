@@ -0,0 +1,72 @@
+"""
+Adaptive Test-Time Augmentation
+Only predictions below a confidence threshold are escalated: the already
+preprocessed 128x128 image is expanded into flips, rotations and zoomed
+crops in one vectorized NumPy step, run as a single batch, and the
+probabilities are averaged with the first pass.
+"""
+import threading
+from collections import deque
+from typing import Any, Dict
+
+import numpy as np
+
+# Corner/center crops cover 7/8 of the side and are scaled back up to full size
+CROP_FRACTION = 0.875
+
+
+def _crop_indices(size: int, fraction: float = CROP_FRACTION):
+    """Nearest-neighbour source rows/cols for scaling a crop back to size"""
+    crop = int(round(size * fraction))
+    return crop, (np.arange(size) * crop // size)
+
+
+def build_tta_batch(image: np.ndarray) -> np.ndarray:
+    """
+    (H, W, C) image -> (8, H, W, C) batch: horizontal/vertical flip,
+    90/270 degree rotations and four corner crops. The first-pass view
+    itself is not repeated.
+    """
+    size = image.shape[0]
+    crop, idx = _crop_indices(size)
+    offset = size - crop
+    rows, cols = idx[:, None], idx[None, :]
+    corners = [(0, 0), (0, offset), (offset, 0), (offset, offset)]
+
+    batch = np.empty((8,) + image.shape, dtype=np.float32)
+    batch[0] = image[:, ::-1]
+    batch[1] = image[::-1]
+    batch[2] = np.rot90(image, 1)
+    batch[3] = np.rot90(image, 3)
+    for i, (y, x) in enumerate(corners, start=4):
+        batch[i] = image[y + rows, x + cols]
+    return batch
+
+
+class TTAStats:
+    """Escalation fraction and added latency of the TTA pass"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._added_ms = deque(maxlen=window)
+        self.requests_total = 0
+        self.escalated_total = 0
+
+    def record(self, escalated: bool, added_ms: float = 0.0):
+        with self._lock:
+            self.requests_total += 1
+            if escalated:
+                self.escalated_total += 1
+                self._added_ms.append(added_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            added = np.array(self._added_ms) if self._added_ms else None
+            total, escalated = self.requests_total, self.escalated_total
+        return {
+            'requests_total': total,
+            'escalated_total': escalated,
+            'escalated_fraction': (escalated / total) if total else 0.0,
+            'added_ms_mean': float(added.mean()) if added is not None else 0.0,
+            'added_ms_p95': float(np.percentile(added, 95)) if added is not None else 0.0
+        }